@@ -0,0 +1,587 @@
+import os
+import abc
+import sys
+import json
+import time
+import asyncio
+import logging
+import signal
+import platform
+import argparse
+import statistics
+import subprocess
+import multiprocessing
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QMainWindow, QApplication
+from pyqt_ipc import CreateIPC
+from pyqt_ipc.task import TaskIterator
+from pyqt_ipc.codec import Codec
+from pyqt_ipc.transport import PipeQueue
+from pyqt_ipc.logger import logger
+
+
+KB = 1024
+MB = 1024 * KB
+
+
+def echo(value):
+    return value
+
+
+def tick():
+    return 1
+
+
+def blob(size):
+    return bytes(size)
+
+
+def array(size):
+    import numpy
+    return numpy.zeros(size, dtype=numpy.uint8)
+
+
+def produce(q, message, count):
+    for _ in range(count):
+        q.put(message)
+    q.put(None)
+
+
+def wait(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+async def async_wait(seconds):
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+def analyse(value):
+    import numpy
+    return float(numpy.arange(value).sum())
+
+
+def spin(rounds):
+    # 纯Python循环, 执行期间持有GIL
+    total = 0
+    for i in range(rounds):
+        total += i * i
+    return total
+
+
+class BenchmarkMeta(type(QMainWindow), abc.ABCMeta):
+    """
+    Qt窗口与抽象基类的元类合并, 使Benchmark可声明抽象方法
+    """
+
+
+class Benchmark(QMainWindow, metaclass=BenchmarkMeta):
+    """
+    基准测试窗口基类, 子类须实现begin, 测试结束后调用finish写入结果并退出事件循环
+    """
+
+    def __init__(self, **options):
+        super(Benchmark, self).__init__()
+        self.result = None
+        self.ipcMain, self.ipcRenderer = CreateIPC(self, **options)
+
+    @abc.abstractmethod
+    def begin(self):
+        """
+        开始测试, 在事件循环启动后调用
+        """
+
+    def finish(self, result):
+
+        self.result = result
+        self.close()
+        QApplication.quit()
+
+
+class LatencyBenchmark(Benchmark):
+    """
+    start -> 回调 端到端延迟
+    """
+
+    def __init__(self, rounds=500, warmup=20, transport="queue"):
+        super(LatencyBenchmark, self).__init__(transport=transport)
+        self._rounds = rounds
+        self._warmup = warmup
+        self._count = 0
+        self._t0 = 0.0
+        self.samples = []
+
+        self.ipcMain.registry("echo", echo)
+        self.ipcRenderer.on("echo", self._on_echo)
+
+    def begin(self):
+        self._t0 = time.perf_counter()
+        self.ipcMain.start("echo", self._count)
+
+    def _on_echo(self, _):
+        elapsed = time.perf_counter() - self._t0
+        self._count += 1
+        if self._count > self._warmup:
+            self.samples.append(elapsed * 1000)
+
+        if self._count >= self._rounds + self._warmup:
+            self.finish(summary(self.samples))
+            return
+
+        self.begin()
+
+
+class ThroughputBenchmark(Benchmark):
+    """
+    TaskIterator紧循环下每秒回调的结果数
+    """
+
+    def __init__(self, cycles=20000, batch=False, transport="queue"):
+        super(ThroughputBenchmark, self).__init__(batch=batch, transport=transport)
+        self._cycles = cycles
+        self._count = 0
+        self._t0 = 0.0
+
+        self.ipcMain.registry("tick", TaskIterator(tick, cycles=cycles))
+        self.ipcRenderer.on("tick", self._on_tick)
+
+    def begin(self):
+        self._t0 = time.perf_counter()
+        self.ipcMain.start("tick")
+
+    def _on_tick(self, _):
+        self._count += 1
+        if self._count >= self._cycles:
+            elapsed = time.perf_counter() - self._t0
+            self.finish({"results": self._count, "seconds": elapsed, "results_per_s": self._count / elapsed})
+
+
+class PayloadBenchmark(Benchmark):
+    """
+    不同结果大小下的往返耗时与吞吐量
+    """
+
+    def __init__(self, sizes, shm=False, transport="queue", kind="bytes"):
+        super(PayloadBenchmark, self).__init__(shm_threshold=64 * KB if shm else None, transport=transport)
+        self._sizes = list(sizes)
+        self._size = None
+        self._rounds = 0
+        self._t0 = 0.0
+        self._samples = []
+        self._results = {}
+
+        self.ipcMain.registry("blob", array if kind == "ndarray" else blob)
+        self.ipcRenderer.on("blob", self._on_blob)
+
+    def begin(self):
+        if self._size is not None:
+            samples = self._samples
+            self._results[str(self._size)] = dict(
+                summary(samples), mb_per_s=self._size / MB / (statistics.median(samples) / 1000)
+            )
+
+        if not self._sizes:
+            self.finish(self._results)
+            return
+
+        self._size = self._sizes.pop(0)
+        self._rounds = max(3, min(200, 200 * MB // self._size))
+        self._samples = []
+        self._next()
+
+    def _next(self):
+        self._t0 = time.perf_counter()
+        self.ipcMain.start("blob", self._size)
+
+    def _on_blob(self, data):
+        self._samples.append((time.perf_counter() - self._t0) * 1000)
+        if hasattr(data, "release"):
+            data.release()
+
+        if len(self._samples) >= self._rounds:
+            self.begin()
+        else:
+            self._next()
+
+
+class ChannelBenchmark(Benchmark):
+    """
+    传输层对比(不经由任务管理进程与Qt回调): 子进程向队列写入结果消息, 当前进程读出;
+    分别测试小消息吞吐量、大ndarray及可压缩文本的传输速率
+    """
+
+    def __init__(self, messages=100000, sizes=(MB, 10 * MB), rounds=20):
+        QMainWindow.__init__(self)
+        self.result = None
+        self._messages = messages
+        self._sizes = sizes
+        self._rounds = rounds
+
+    def begin(self):
+        import numpy
+
+        small = ("tick", 1, "result", (1,), None)
+        text = ("text", 1, "result", ("PyQt-IPC benchmark line\n" * (MB // 24),), None)
+        queues = {
+            "queue": multiprocessing.Queue,
+            "pipe": PipeQueue,
+            "pipe-zlib": lambda: PipeQueue(Codec(compress=64 * KB))
+        }
+        result = {}
+        for name, make in queues.items():
+            result[name] = {
+                "small_msgs_per_s": self._messages / self._transfer(make(), small, self._messages),
+                "text_mb_per_s": self._rounds * len(text[3][0]) / MB / self._transfer(make(), text, self._rounds)
+            }
+            for size in self._sizes:
+                message = ("blob", 1, "result", (numpy.zeros(size, dtype=numpy.uint8),), None)
+                seconds = self._transfer(make(), message, self._rounds)
+                result[name][f"ndarray_{size // MB}mb_mb_per_s"] = self._rounds * size / MB / seconds
+
+        self.finish(result)
+
+    @staticmethod
+    def _transfer(q, message, count):
+        proc = multiprocessing.Process(target=produce, args=(q, message, count))
+        t0 = time.perf_counter()
+        proc.start()
+        while q.get() is not None:
+            pass
+        seconds = time.perf_counter() - t0
+        proc.join()
+        return seconds
+
+
+class ConcurrencyBenchmark(Benchmark):
+    """
+    同时运行N个等待型调用的总耗时, 效率为单次等待时间与总耗时之比
+    """
+
+    def __init__(self, levels, seconds=0.2):
+        super(ConcurrencyBenchmark, self).__init__()
+        self._phases = [(kind, n) for kind in ("thread", "asyncio") for n in levels]
+        self._seconds = seconds
+        self._phase = None
+        self._pending = 0
+        self._t0 = 0.0
+        self._results = {"thread": {}, "asyncio": {}}
+
+        max_level = max(levels)
+        self.ipcMain.registry("wait", wait, concurrency=max_level)
+        self.ipcMain.registry("async_wait", async_wait, concurrency=max_level)
+        self.ipcRenderer.on("wait", self._on_done)
+        self.ipcRenderer.on("async_wait", self._on_done)
+
+    def begin(self):
+        if not self._phases:
+            self.finish(self._results)
+            return
+
+        self._phase = self._phases.pop(0)
+        kind, n = self._phase
+        self._pending = n
+        self._t0 = time.perf_counter()
+        task_name = "wait" if kind == "thread" else "async_wait"
+        for _ in range(n):
+            self.ipcMain.start(task_name, self._seconds)
+
+    def _on_done(self, _):
+        self._pending -= 1
+        if self._pending:
+            return
+
+        kind, n = self._phase
+        elapsed = time.perf_counter() - self._t0
+        self._results[kind][str(n)] = {"makespan_ms": elapsed * 1000, "efficiency": self._seconds / elapsed}
+        QTimer.singleShot(0, self.begin)
+
+
+class MapBenchmark(Benchmark):
+    """
+    批量执行(map): 空任务下每个输入的额外耗时(线程/进程池), 以及CPU密集型任务进程池相对线程执行的加速比
+    """
+
+    def __init__(self, items=100000, jobs=None, rounds=500000):
+        super(MapBenchmark, self).__init__()
+        jobs = jobs or 4 * (os.cpu_count() or 1)
+        # 首个阶段预热进程池, 不计入结果
+        self._phases = [
+            (None, "echo_process", list(range(jobs))),
+            ("thread", "echo", list(range(items))),
+            ("process", "echo_process", list(range(items))),
+            ("thread", "spin", [rounds] * jobs),
+            ("process", "spin_process", [rounds] * jobs)
+        ]
+        self._jobs = jobs
+        self._phase = None
+        self._pending = 0
+        self._t0 = 0.0
+        self._overhead = {}
+        self._seconds = {}
+
+        self.ipcMain.registry("echo", echo)
+        self.ipcMain.registry("echo_process", echo, executor="process")
+        self.ipcMain.registry("spin", spin)
+        self.ipcMain.registry("spin_process", spin, executor="process")
+        for task_name in ("echo", "echo_process", "spin", "spin_process"):
+            self.ipcRenderer.on(task_name, self._on_result)
+
+    def begin(self):
+        if not self._phases:
+            thread, process = self._seconds["thread"], self._seconds["process"]
+            self.finish({
+                "overhead": self._overhead,
+                "cpu_bound": {"jobs": self._jobs, "thread_s": thread, "process_s": process, "speedup": thread / process}
+            })
+            return
+
+        self._phase = self._phases.pop(0)
+        _, task_name, inputs = self._phase
+        self._pending = len(inputs)
+        self._t0 = time.perf_counter()
+        self.ipcMain.map(task_name, inputs)
+
+    def _on_result(self, _):
+        self._pending -= 1
+        if self._pending:
+            return
+
+        elapsed = time.perf_counter() - self._t0
+        executor, task_name, inputs = self._phase
+        if task_name.startswith("echo") and executor:
+            self._overhead[executor] = {
+                "items": len(inputs), "seconds": elapsed, "us_per_item": elapsed * 1e6 / len(inputs)
+            }
+        elif executor:
+            self._seconds[executor] = elapsed
+        QTimer.singleShot(0, self.begin)
+
+
+class StallBenchmark(Benchmark):
+    """
+    大量结果回调期间界面事件循环的卡顿: 以1ms定时器的实际间隔衡量; work为每次回调模拟的渲染耗时, 单位: ms
+    """
+
+    def __init__(self, cycles=20000, batch=False, frame_budget=None, work=0):
+        super(StallBenchmark, self).__init__(batch=batch, frame_budget=frame_budget)
+        self._cycles = cycles
+        self._work = work / 1000
+        self._count = 0
+        self._last = None
+        self._gaps = []
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._on_timer)
+        self.ipcMain.registry("tick", TaskIterator(tick, cycles=cycles))
+        self.ipcRenderer.on("tick", self._on_tick)
+
+    def begin(self):
+        self._timer.start(1)
+        self.ipcMain.start("tick")
+
+    def _on_timer(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            self._gaps.append((now - self._last) * 1000)
+        self._last = now
+
+    def _on_tick(self, _):
+        deadline = time.perf_counter() + self._work
+        while time.perf_counter() < deadline:
+            pass
+        self._count += 1
+        if self._count >= self._cycles:
+            # 计入结束前最后一次卡顿
+            self._on_timer()
+            self._timer.stop()
+            self.finish(summary(self._gaps or [0.0]))
+
+
+class StartupBenchmark(Benchmark):
+    """
+    冷启动: 任务管理进程就绪耗时及首次调用耗时
+    """
+
+    def __init__(self, warm=True):
+        t0 = time.perf_counter()
+        options = {"preload": ["numpy"], "prefork": True} if warm else {}
+        super(StartupBenchmark, self).__init__(executor="process", **options)
+        self.ipcMain.wait_ready()
+        self._create_time = time.perf_counter() - t0
+
+        self.ipcMain.registry("analyse", analyse)
+        self.ipcRenderer.on("analyse", self._on_result)
+
+    def begin(self):
+        self.ipcMain.start("analyse", 1000)
+
+    def _on_result(self, _):
+        # 首次调用耗时在监听回调之后记录
+        QTimer.singleShot(0, self._report)
+
+    def _report(self):
+        stats = self.ipcMain.startup_stats
+        self.finish({
+            "create_ms": self._create_time * 1000,
+            "startup_ms": stats["startup"] * 1000,
+            "preload_ms": stats["preload"] * 1000,
+            "pool_ms": stats.get("pool", 0) * 1000,
+            "first_task_ms": stats["first_task"]["analyse"] * 1000
+        })
+
+
+def summary(samples):
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+        "max_ms": max(samples)
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def scenarios(quick=False):
+    """
+    场景名称 -> (测试窗口, 参数)
+    """
+    sizes = [KB, 10 * KB, 100 * KB, MB, 10 * MB] + ([] if quick else [100 * MB])
+    cycles = 5000 if quick else 20000
+    levels = [10, 100] if quick else [10, 100, 1000]
+    return {
+        "latency": (LatencyBenchmark, {"rounds": 200 if quick else 500}),
+        "latency-pipe": (LatencyBenchmark, {"rounds": 200 if quick else 500, "transport": "pipe"}),
+        "throughput": (ThroughputBenchmark, {"cycles": cycles}),
+        "throughput-pipe": (ThroughputBenchmark, {"cycles": cycles, "transport": "pipe"}),
+        "throughput-batch": (ThroughputBenchmark, {"cycles": cycles, "batch": True}),
+        "throughput-batch-pipe": (ThroughputBenchmark, {"cycles": cycles, "batch": True, "transport": "pipe"}),
+        "payload": (PayloadBenchmark, {"sizes": sizes}),
+        "payload-pipe": (PayloadBenchmark, {"sizes": sizes, "transport": "pipe"}),
+        "payload-ndarray": (PayloadBenchmark, {"sizes": sizes, "kind": "ndarray"}),
+        "payload-ndarray-pipe": (PayloadBenchmark, {"sizes": sizes, "kind": "ndarray", "transport": "pipe"}),
+        "payload-shm": (PayloadBenchmark, {"sizes": sizes, "shm": True}),
+        "channel": (ChannelBenchmark, {"messages": 20000 if quick else 100000}),
+        "concurrency": (ConcurrencyBenchmark, {"levels": levels}),
+        "map": (MapBenchmark, {"items": 20000 if quick else 100000, "rounds": 100000 if quick else 500000}),
+        "stall": (StallBenchmark, {"cycles": cycles}),
+        "stall-batch": (StallBenchmark, {"cycles": cycles, "batch": True}),
+        "stall-render": (StallBenchmark, {"cycles": cycles // 10, "batch": True, "work": 1}),
+        "stall-budget": (StallBenchmark, {"cycles": cycles // 10, "batch": True, "work": 1, "frame_budget": 8}),
+        "startup": (StartupBenchmark, {}),
+        "startup-cold": (StartupBenchmark, {"warm": False})
+    }
+
+
+def run_scenario(name, quick=False):
+    """
+    在当前进程内运行单个场景
+    """
+    window_cls, kwargs = scenarios(quick)[name]
+    app = QApplication.instance() or QApplication(sys.argv)
+    bench = window_cls(**kwargs)
+    QTimer.singleShot(0, bench.begin)
+    app.exec_()
+    return bench.result
+
+
+def revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def rounded(value):
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, dict):
+        return {k: rounded(v) for k, v in value.items()}
+
+    return value
+
+
+def report(name, result):
+    print(f"{name}: {json.dumps(rounded(result), ensure_ascii=False)}")
+
+
+def run_isolated(command, timeout):
+    """
+    以独立进程组运行单个场景, 超时后连同任务管理进程一并结束
+    """
+    proc = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True
+    )
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+        proc.communicate()
+        return {"error": f"timeout after {timeout}s"}
+
+    lines = stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": (stderr.strip().splitlines() or [f"exit code {proc.returncode}"])[-1]}
+
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyQt-IPC 基准测试")
+    parser.add_argument("names", nargs="*", help="运行的场景, 默认全部")
+    parser.add_argument("--json", help="结果输出的JSON文件路径")
+    parser.add_argument("--quick", action="store_true", help="缩小规模, 适用于CI")
+    parser.add_argument("--timeout", type=int, default=300, help="单个场景的超时时间, 单位: s")
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.quick)))
+        return
+
+    names = args.names or list(scenarios(args.quick))
+    unknown = [name for name in names if name not in scenarios(args.quick)]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        # 每个场景以独立进程运行, 避免工作进程池、内存占用等在场景间相互影响
+        command = [sys.executable, os.path.abspath(__file__), "--scenario", name] + (["--quick"] if args.quick else [])
+        results[name] = run_isolated(command, args.timeout)
+        report(name, results[name])
+
+    if args.json:
+        output = {
+            "meta": {
+                "revision": revision(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "quick": args.quick
+            },
+            "results": results
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,14 @@
+from typing import Optional, Callable, Sequence, Union
+
 from PyQt5.QtWidgets import QMainWindow
 
 from .main import IPCMain
+from .task import EXECUTORS
+from .transport import TRANSPORTS
+from .codec import Codec
+from .supervisor import RestartPolicy
 from .renderer import IPCRenderer
-from .logger import logger
+from .logger import logger, parse_level
 
 
 __all__ = [
@@ -11,18 +17,127 @@ __all__ = [
 
 def CreateIPC(
     window: QMainWindow,
-    interval: int = 200
+    interval: int = 200,
+    batch: bool = False,
+    batch_interval: int = 16,
+    executor: str = "thread",
+    pool_size: Optional[int] = None,
+    shm_threshold: Optional[int] = None,
+    max_running: Optional[int] = None,
+    preload: Optional[Sequence[str]] = None,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+    prefork: bool = False,
+    metrics: bool = False,
+    metrics_interval: Optional[int] = None,
+    frame_budget: Optional[int] = None,
+    result_queue_size: Optional[int] = None,
+    share: Optional[IPCMain] = None,
+    transport: str = "queue",
+    codec: Optional[Codec] = None,
+    supervise: Union[bool, RestartPolicy] = False,
+    log_level: Optional[Union[int, str]] = None
 ) -> (IPCMain, IPCRenderer):
     """
     IPC对象生成器
     :param window: QMainWindow对象,也可以是loadUi返回的对象
-    :param interval: 监听渲染结果的间隔时间, 单位: ms
+    :param interval: 监听线程单次阻塞等待结果的最长时间(超时后检查退出标志), 单位: ms
+    :param batch: 是否开启批量模式, 开启后一次取空结果队列并批量回调, 适用于高频任务
+    :param batch_interval: 批量模式下两次批量回调的最小间隔, 默认约为一帧, 单位: ms
+    :param executor: 任务默认执行方式, thread: 线程执行; process: 工作进程池执行, 可在注册任务时单独指定
+    :param pool_size: 工作进程池大小, 默认为CPU核数, 首个process任务注册时创建
+    :param shm_threshold: 大结果共享内存传递阈值, 单位: 字节; bytes类对象或ndarray结果不小于该值时经由共享内存传递,
+                          监听收到的是只读的SharedBuffer, 默认为None即不使用共享内存
+    :param max_running: 全局同时运行的调用数上限, 超出的调用按优先级排队, 默认为None即不限制
+    :param preload: 任务管理进程(及工作进程)启动时预先导入的模块名列表, 如["numpy", "pandas"]
+    :param initializer: 任务管理进程(及工作进程)启动时执行的初始化函数, 如加载模型
+    :param initargs: 初始化函数的位置参数
+    :param prefork: 是否在启动时即拉起工作进程池, 而非首个process任务注册时; 可配合ipcMain.wait_ready在窗口显示前完成预热
+    :param metrics: 是否开启指标统计(排队、执行、传递及回调耗时, 结果大小), 通过ipcMain.metrics获取
+    :param metrics_interval: 定时发出指标快照的间隔, 传入后自动开启指标统计, 通过ipcMain.metrics_snapshot信号接收, 单位: ms
+    :param frame_budget: 每帧执行监听回调的时间预算, 传入后结果回调先入队, 每帧(batch_interval)最多执行该时长, 剩余的留待下一帧,
+                         避免结果洪峰阻塞界面, 通过ipcMain.backlog获取积压统计, 默认为None即结果到达即回调, 单位: ms
+    :param result_queue_size: 结果事件的在途上限(结果队列中及渲染进程内尚未处理的结果事件数), 渲染进程跟不上时任务管理进程按各任务
+                              注册时的overflow策略阻塞任务或丢弃结果, 内存不再随积压增长; 默认为None即不限制
+    :param share: 共享另一个CreateIPC返回的ipcMain的任务管理进程, 默认为None即拉起独立的任务管理进程;
+                  共享时interval、batch及任务管理进程相关参数(pool_size、shm_threshold、max_running、preload、initializer、
+                  initargs、prefork、metrics、result_queue_size、transport、codec)以被共享者为准
+    :param transport: 任务/结果的传输方式, queue: multiprocessing.Queue(经由后台发送线程);
+                      pipe: 管道直接写入, 不经由后台发送线程, 小消息吞吐更高, 大的ndarray/bytearray带外传递
+    :param codec: 管道传输的编解码器, Codec实例, 可配置带外传递阈值及zlib压缩, 仅transport为pipe时生效, 默认为None即Codec()
+    :param supervise: 是否监督任务管理进程, True或RestartPolicy实例; 开启后任务管理进程退出(如C扩展段错误、被OOM结束)或心跳超时时,
+                      运行中的调用以失败结束并回调IPCRenderer.on_failure, 随后按策略重新拉起并重新注册任务, 默认为False即不监督;
+                      共享时以被共享者为准
+    :param log_level: 日志等级, logging的等级数值或其名称(如"WARNING"), 同时作用于渲染进程与任务管理进程; 低于该等级的日志不做格式化,
+                      默认为None即DEBUG; 日志对象为模块级共享, 多次CreateIPC时以最后一次传入的为准, 共享时任务管理进程以被共享者为准
     :return: ipcMain -> 任务IPC对象; ipcRenderer -> 渲染IPC对象
     """
     if not isinstance(interval, int):
         logger.error("interval参数必须为整数, 将使用默认值作为interval参数!")
         interval = 200
-    ipcMain = IPCMain(window, interval)
+    if not isinstance(batch_interval, int):
+        logger.error("batch_interval参数必须为整数, 将使用默认值作为batch_interval参数!")
+        batch_interval = 16
+    if executor not in EXECUTORS:
+        logger.error(f"executor参数必须为{'/'.join(EXECUTORS)}之一, 将使用默认值作为executor参数!")
+        executor = "thread"
+    if pool_size is not None and (not isinstance(pool_size, int) or pool_size < 1):
+        logger.error("pool_size参数必须为正整数, 将使用默认值作为pool_size参数!")
+        pool_size = None
+    if shm_threshold is not None and (not isinstance(shm_threshold, int) or shm_threshold < 1):
+        logger.error("shm_threshold参数必须为正整数, 将不使用共享内存传递结果!")
+        shm_threshold = None
+    if max_running is not None and (not isinstance(max_running, int) or max_running < 1):
+        logger.error("max_running参数必须为正整数, 将不限制同时运行的调用数!")
+        max_running = None
+    if preload is not None and (isinstance(preload, str) or not all(isinstance(x, str) for x in preload)):
+        logger.error("preload参数必须为模块名列表, 将不预导入模块!")
+        preload = None
+    if initializer is not None and not callable(initializer):
+        logger.error("initializer参数必须为可调用的, 将不执行初始化函数!")
+        initializer = None
+    if not isinstance(initargs, tuple):
+        logger.error("initargs参数必须为元组, 将使用默认值作为initargs参数!")
+        initargs = ()
+    if metrics_interval is not None and (not isinstance(metrics_interval, int) or metrics_interval < 1):
+        logger.error("metrics_interval参数必须为正整数, 将不定时发出指标快照!")
+        metrics_interval = None
+    if frame_budget is not None and (not isinstance(frame_budget, int) or frame_budget < 1):
+        logger.error("frame_budget参数必须为正整数, 将不分帧执行回调!")
+        frame_budget = None
+    if result_queue_size is not None and (not isinstance(result_queue_size, int) or result_queue_size < 1):
+        logger.error("result_queue_size参数必须为正整数, 将不限制结果在途数!")
+        result_queue_size = None
+    if transport not in TRANSPORTS:
+        logger.error(f"transport参数必须为{'/'.join(TRANSPORTS)}之一, 将使用默认值作为transport参数!")
+        transport = "queue"
+    if codec is not None and not isinstance(codec, Codec):
+        logger.error("codec参数必须为Codec实例, 将使用默认的编解码器!")
+        codec = None
+    if codec is not None and transport != "pipe":
+        logger.warning("codec参数仅在transport为pipe时生效")
+    if supervise is True:
+        supervise = RestartPolicy()
+    if supervise is False:
+        supervise = None
+    if supervise is not None and not isinstance(supervise, RestartPolicy):
+        logger.error("supervise参数必须为布尔值或RestartPolicy实例, 将不监督任务管理进程!")
+        supervise = None
+    if log_level is not None:
+        level = parse_level(log_level)
+        if level is None:
+            logger.error("log_level参数必须为logging的等级数值或名称, 将使用默认的日志等级!")
+        else:
+            logger.setLevel(level)
+        log_level = level
+    if share is not None and not isinstance(share, IPCMain):
+        logger.error("share参数必须为CreateIPC返回的ipcMain, 将拉起独立的任务管理进程!")
+        share = None
+    ipcMain = IPCMain(
+        window, interval, batch, batch_interval, executor, pool_size, shm_threshold, max_running,
+        preload, initializer, initargs, prefork, bool(metrics or metrics_interval), metrics_interval,
+        frame_budget, result_queue_size, share, transport, codec, supervise, log_level
+    )
     ipcRenderer = IPCRenderer(ipcMain)
     ipcMain.bind_quit()
     ipcMain.run()
@@ -0,0 +1,44 @@
+import asyncio
+import inspect
+from threading import Thread
+
+from .logger import logger
+
+
+__all__ = [
+    "EventLoopThread",
+    "is_async"
+]
+
+def is_async(func):
+    """
+    任务函数是否为协程函数(async def)或异步生成器函数
+    :param func: 任务函数
+    :return: bool
+    """
+    return inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+
+class EventLoopThread:
+    """
+    任务管理进程内运行asyncio事件循环的线程, 所有异步任务以协程共享该循环
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        t = Thread(target=self._run)
+        t.daemon = True
+        t.start()
+        logger.debug("异步任务事件循环已启动")
+
+    def submit(self, coro):
+        """
+        提交协程至事件循环
+        :param coro: 协程
+        :return: concurrent.futures.Future -> 取消该Future即取消对应的asyncio.Task
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _run(self):
+
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
@@ -0,0 +1,120 @@
+import time
+import pickle
+from collections import OrderedDict
+
+from .logger import logger
+
+
+__all__ = [
+    "ResultCache"
+]
+
+class ResultCache:
+    """
+    任务结果缓存(LRU), 以任务参数为键, 缓存一次调用的全部结果
+    """
+
+    def __init__(self, maxsize=128, ttl=None, max_bytes=None):
+        """
+        :param maxsize: 最多缓存的调用数
+        :param ttl: 缓存有效期, 为None时不过期, 单位: s
+        :param max_bytes: 缓存结果的总字节数上限(按pickle后的大小估算), 为None时不统计
+        """
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(args, kwargs):
+        """
+        根据任务参数生成缓存键
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: 缓存键, 参数无法作为键时为None
+        """
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            try:
+                key = pickle.dumps(key)
+            except Exception:
+                return None
+
+        return key
+
+    def get(self, key):
+        """
+        获取缓存
+        :param key: 缓存键
+        :return: list | None -> 该次调用的全部结果, 未命中时为None
+        """
+        entry = self._entries.get(key)
+        if entry is not None and self._ttl is not None and time.monotonic() - entry[1] > self._ttl:
+            self._pop(key)
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[0]
+
+    def put(self, key, results):
+        """
+        写入缓存
+        :param key: 缓存键
+        :param results: 该次调用的全部结果
+        :return: None
+        """
+        size = 0
+        if self._max_bytes is not None:
+            try:
+                size = len(pickle.dumps(results))
+            except Exception:
+                return
+            if size > self._max_bytes:
+                logger.debug("结果大小%s字节超过缓存上限, 不予缓存", size)
+                return
+
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (results, time.monotonic(), size)
+        self._bytes += size
+
+        while len(self._entries) > self._maxsize or (self._max_bytes is not None and self._bytes > self._max_bytes):
+            self._pop(next(iter(self._entries)))
+
+    def invalidate(self, key=None):
+        """
+        使缓存失效
+        :param key: 缓存键, 为None时清空所有缓存
+        :return: None
+        """
+        if key is None:
+            self._entries.clear()
+            self._bytes = 0
+        elif key in self._entries:
+            self._pop(key)
+
+    def info(self):
+        """
+        缓存统计
+        :return: dict
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._entries),
+            "bytes": self._bytes
+        }
+
+    def _pop(self, key):
+
+        self._bytes -= self._entries.pop(key)[2]
@@ -0,0 +1,93 @@
+import time
+from threading import Event
+from contextvars import ContextVar
+
+from .exception import CancelledException
+
+
+__all__ = [
+    "CancelToken",
+    "current_token"
+]
+
+# 线程各自拥有独立的上下文, 异步任务则在各自asyncio.Task的上下文中绑定
+_token = ContextVar("token", default=None)
+
+# 工作进程内等待取消信号时检查共享内存的间隔, 单位: s
+_WAIT_POLL = 0.01
+
+class CancelToken:
+    """
+    任务取消令牌, 任务函数可通过current_token()获取并主动检查, 实现协作式取消
+    """
+
+    def __init__(self):
+        self._event = Event()
+
+    def cancel(self):
+        """
+        发出取消信号
+        :return: None
+        """
+        self._event.set()
+
+    @property
+    def cancelled(self):
+
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        等待取消信号
+        :param timeout: 最长等待时间, 为None时一直等待, 单位: s
+        :return: bool -> 是否已取消
+        """
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        """
+        已取消时抛出CancelledException, 任务将静默结束且不回传结果
+        :return: None
+        """
+        if self.cancelled:
+            raise CancelledException("任务已被取消")
+
+class SharedCancelToken(CancelToken):
+    """
+    工作进程内使用的取消令牌, 取消信号由任务管理进程写入共享内存
+    """
+
+    def __init__(self, shared_value, job_id):
+        super(SharedCancelToken, self).__init__()
+        self._shared_value = shared_value
+        self._job_id = job_id
+
+    @property
+    def cancelled(self):
+
+        return self._shared_value.value == self._job_id
+
+    def wait(self, timeout=None):
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.cancelled:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(_WAIT_POLL)
+
+        return True
+
+def current_token():
+    """
+    获取当前正在执行的任务的取消令牌, 需在任务函数内调用
+    :return: CancelToken | None -> 不在任务内调用时为None
+    """
+    return _token.get()
+
+def bind_token(token):
+    """
+    绑定当前线程(或协程)正在执行的任务的取消令牌
+    :param token: CancelToken | None
+    :return: None
+    """
+    _token.set(token)
@@ -0,0 +1,470 @@
+import time
+import atexit
+import itertools
+from queue import Empty
+from multiprocessing import Process, Queue, Pipe, Semaphore
+
+import psutil
+from PyQt5.QtCore import pyqtSignal, QThread, QTimer
+
+from .task import TaskManager, EVENT_RESULT, EVENT_RESULTS
+from .transport import PipeQueue
+from .supervisor import Supervisor
+from .shm import discard_result
+from .logger import logger
+
+
+__all__ = [
+    "Channel",
+    "discard_results"
+]
+
+def discard_results(message):
+    """
+    渲染端: 丢弃不再回调的结果事件, 释放其中的共享内存(生产端已不再追踪, 只能由接收端释放)
+    :param message: 任务回传的事件
+    :return: None
+    """
+    event, values = message[2], message[3]
+    if event == EVENT_RESULT:
+        discard_result(values)
+    elif event == EVENT_RESULTS:
+        for item in values:
+            discard_result(item)
+
+class WatchThread(QThread):
+    """
+    Watch结果线程
+    阻塞等待结果队列, 结果到达即刻发出信号; 收到退出哨兵或退出标志为False时结束
+    批量模式下一次取空结果队列并以列表形式发出, 两次发出间隔不小于batch_interval
+    """
+    signal = pyqtSignal(tuple)
+    batch_signal = pyqtSignal(list)
+
+    def __init__(self, result_q, interval, run_flag=True, batch_interval=None):
+        super(WatchThread, self).__init__()
+        self._result_q = result_q
+        self._interval = interval
+        self._run_flag = run_flag
+        self._batch_interval = batch_interval
+        self._last_emit = 0.0
+
+    def run(self):
+
+        while self._run_flag:
+            try:
+                result = self._result_q.get(timeout=self._interval)
+            except Empty:
+                continue
+
+            if result is None:
+                break
+
+            if self._batch_interval is None:
+                self.signal.emit(result)
+            elif not self._emit_batch(result):
+                break
+
+    def _emit_batch(self, first):
+        """
+        取空结果队列并批量发出
+        :param first: 已取出的第一个结果
+        :return: bool -> 是否继续监听
+        """
+        wait = self._batch_interval - (time.perf_counter() - self._last_emit)
+        if wait > 0:
+            time.sleep(wait)
+
+        batch = [first]
+        go_on = True
+        while True:
+            try:
+                result = self._result_q.get_nowait()
+            except Empty:
+                break
+            if result is None:
+                go_on = False
+                break
+            batch.append(result)
+
+        self.batch_signal.emit(batch)
+        self._last_emit = time.perf_counter()
+        return go_on
+
+    def stop(self):
+        """
+        停止监听, 通过哨兵唤醒阻塞中的get; 管道传输时由本进程直接唤醒, 不向结果管道写入
+        :return: None
+        """
+        self._run_flag = False
+        if isinstance(self._result_q, PipeQueue):
+            self._result_q.wake()
+        else:
+            self._result_q.put(None)
+
+    @property
+    def run_flag(self):
+
+        return self._run_flag
+
+    @run_flag.setter
+    def run_flag(self, newValue):
+
+        self._run_flag = newValue
+
+class Channel:
+    """
+    一个任务管理进程及其独占的任务/结果队列, 每个CreateIPC默认各自拥有一个;
+    也可由多个IPCMain共享, 此时后加入者的任务名称在任务管理进程内带上其编号, 结果按该编号路由回对应的IPCMain
+    受监督时任务管理进程故障后以新的队列重新拉起, 各IPCMain重新注册其任务; 重启期间下发的指令暂存, 重新注册后依次下发
+    """
+
+    def __init__(self, interval, batch_interval, manager_options, transport="queue", codec=None, supervise=None):
+        """
+        :param interval: 监听线程单次阻塞等待结果的最长时间, 单位: s
+        :param batch_interval: 批量模式下两次批量回调的最小间隔, 为None时不开启批量模式, 单位: s
+        :param manager_options: 任务管理进程选项, 见TaskManager.run_ever
+        :param transport: 任务/结果队列的传输方式, queue: multiprocessing.Queue; pipe: PipeQueue
+        :param codec: 管道传输的编解码器, 为None时使用默认的Codec
+        :param supervise: 监督与重启策略RestartPolicy, 为None时不监督
+        """
+        self._interval = interval
+        self._batch_interval = batch_interval
+        self._options = manager_options
+        self._transport = transport
+        self._codec = codec
+        self._open()
+        self._owners = {}
+        self._owner_ids = itertools.count(1)
+        self._proc = None
+        self._watch_thread = None
+        self._ready_conn = None
+        self._spawned_at = None
+        self._startup_stats = None
+        self._policy = supervise
+        self._supervisor = Supervisor(supervise, self._on_failure) if supervise is not None else None
+        self._heartbeat_conn = None
+        self._generation = 0
+        self._recovering = False
+        self._given_up = False
+        self._closed = False
+        self._pending = []
+        self._retired = []
+
+    def _open(self):
+        """
+        创建任务/结果队列及在途额度; 重启时重新创建, 已结束的任务管理进程可能持有旧队列的锁或留下半条消息
+        :return: None
+        """
+        result_queue_size = self._options["result_queue_size"]
+        self._credits = Semaphore(result_queue_size) if result_queue_size else None
+        self._manager_options = dict(self._options, credits=self._credits)
+        if self._transport == "pipe":
+            self._task_q = PipeQueue(self._codec)
+            self._result_q = PipeQueue(self._codec)
+        else:
+            self._task_q = Queue()
+            self._result_q = Queue()
+
+    def attach(self, owner):
+        """
+        加入共享该任务管理进程
+        :param owner: IPCMain
+        :return: int | None -> 归属编号, 首个加入者为None, 其任务名称不做改写
+        """
+        owner_id = next(self._owner_ids) if self._owners else None
+        self._owners[owner_id] = owner
+        return owner_id
+
+    def detach(self, owner_id):
+        """
+        退出共享, 最后一个加入者退出时关闭任务管理进程
+        :param owner_id: 归属编号
+        :return: None
+        """
+        self._owners.pop(owner_id, None)
+        if not self._owners:
+            self.close()
+
+    def put(self, command):
+        """
+        下发指令至任务管理进程
+        :param command: 指令元组
+        :return: None
+        """
+        if self._given_up:
+            return
+
+        if self._recovering:
+            self._pending.append(command)
+            return
+
+        try:
+            self._task_q.put(command)
+        except OSError:
+            # 任务管理进程已退出而监督者尚未察觉, 其调用将在故障处理时以失败结束
+            if self._supervisor is None:
+                raise
+
+    def run(self):
+        """
+        任务管理进程启动
+        :return: None
+        """
+        self._spawn()
+        atexit.register(self.__kill_proc)
+
+    def _spawn(self):
+        """
+        拉起任务管理进程及监听线程, 受监督时一并开始监督
+        :return: None
+        """
+        # 任务管理进程需要拉起工作进程池, 故不能为守护进程, 改由退出时主动结束
+        self._ready_conn, ready_conn = Pipe(duplex=False)
+        options = self._manager_options
+        heartbeat_conn = None
+        if self._supervisor is not None:
+            self._heartbeat_conn, heartbeat_conn = Pipe(duplex=False)
+            options = dict(options, heartbeat=(heartbeat_conn, self._policy.heartbeat))
+        self._spawned_at = time.time()
+        self._startup_stats = None
+        self._proc = Process(
+            target=TaskManager.run_ever, args=(self._task_q, self._result_q, ready_conn), kwargs=options
+        )
+        self._proc.start()
+        ready_conn.close()
+        if heartbeat_conn is not None:
+            heartbeat_conn.close()
+
+        # 故障前已发出但尚未送达的事件属于已结束的调用, 按代次丢弃
+        self._generation += 1
+        generation = self._generation
+        self._watch_thread = WatchThread(self._result_q, self._interval, batch_interval=self._batch_interval)
+        self._watch_thread.signal.connect(lambda message: self._route(message, generation))
+        self._watch_thread.batch_signal.connect(lambda messages: self._route_batch(messages, generation))
+        self._watch_thread.start()
+        if self._supervisor is not None:
+            self._supervisor.watch(self._proc, self._heartbeat_conn)
+
+    def _stop_watch(self):
+        """
+        停止监听线程
+        :return: None
+        """
+        if self._watch_thread is not None:
+            self._watch_thread.stop()
+            self._watch_thread.wait(int(self._interval * 1000))
+            self._watch_thread = None
+
+    def _on_failure(self, reason, exitcode):
+        """
+        任务管理进程故障: 结束其残留的进程, 通知各IPCMain其运行中的调用已失败, 按重启策略延时重新拉起
+        :param reason: exited: 进程已退出; unresponsive: 心跳超时
+        :param exitcode: 进程退出码, 无响应时为None
+        :return: None
+        """
+        self._recovering = True
+        self._generation += 1
+        # 已结束的进程可能持有旧结果队列的锁, 不再写入退出哨兵, 监听线程在单次等待超时后自行结束, 结束前保留其引用
+        self._watch_thread.run_flag = False
+        self._retired = [thread for thread in self._retired if thread.isRunning()] + [self._watch_thread]
+        self._watch_thread = None
+        for q in (self._task_q, self._result_q):
+            if not isinstance(q, PipeQueue):
+                q.cancel_join_thread()
+        self.__kill_proc()
+
+        delay = self._supervisor.next_restart()
+        info = {
+            "reason": reason, "exitcode": exitcode, "restarts": self._supervisor.restarts,
+            "recovering": delay is not None
+        }
+        for owner in list(self._owners.values()):
+            owner._on_manager_failure(info)
+
+        if delay is None:
+            self._given_up = True
+            self._pending.clear()
+            logger.error(
+                f"任务管理进程{self._policy.window}s内已重启{self._policy.max_restarts}次, 不再重启, 之后的任务指令将被忽略!"
+            )
+            return
+
+        logger.warning(f"{delay * 1000:.0f}ms后重启任务管理进程(第{self._supervisor.restarts}次)")
+        QTimer.singleShot(int(delay * 1000), self._respawn)
+
+    def _respawn(self):
+        """
+        以新的队列重新拉起任务管理进程, 各IPCMain按注册顺序重新注册任务后, 依次下发重启期间暂存的指令
+        :return: None
+        """
+        if self._closed:
+            return
+
+        self._open()
+        self._spawn()
+        self._recovering = False
+        for owner in list(self._owners.values()):
+            owner._reregister()
+
+        pending, self._pending = self._pending, []
+        for command in pending:
+            self._task_q.put(command)
+        logger.info("任务管理进程已重新拉起并完成任务重新注册")
+
+    def close(self):
+        """
+        停止监听并关闭任务管理进程
+        :return: None
+        """
+        self._closed = True
+        if self._supervisor is not None:
+            self._supervisor.stop()
+        self._stop_watch()
+        for thread in self._retired:
+            thread.wait(int(self._interval * 1000))
+        self._retired = []
+
+        if self._proc is not None and self._proc.is_alive():
+            self._task_q.put(("stop-all",))
+        self.__kill_proc()
+
+    def wait_ready(self, timeout=None):
+        """
+        等待任务管理进程(及prefork的工作进程池)预热完成
+        :param timeout: 最长等待时间, 为None时一直等待, 单位: s
+        :return: bool -> 是否已就绪
+        """
+        if self._startup_stats is not None:
+            return True
+
+        if self._ready_conn is None or not self._ready_conn.poll(timeout):
+            return False
+
+        try:
+            stats = self._ready_conn.recv()
+        except EOFError:
+            logger.error("任务管理进程在就绪前退出!")
+            return False
+        stats["startup"] = stats.pop("ready_at") - self._spawned_at
+        self._startup_stats = stats
+        logger.info("任务管理进程已就绪, 启动耗时: %.1fms", stats["startup"] * 1000)
+        return True
+
+    @property
+    def alive(self):
+        """
+        任务管理进程是否可用, 超出重启次数上限后为False
+        :return: bool
+        """
+        return not self._given_up and not self._closed
+
+    @property
+    def startup_stats(self):
+
+        return self._startup_stats
+
+    @property
+    def batch_interval(self):
+
+        return self._batch_interval
+
+    @property
+    def credits(self):
+
+        return self._credits
+
+    @property
+    def manager_options(self):
+
+        return self._manager_options
+
+    def _route(self, message, generation):
+        """
+        将单个事件路由至其任务所属的IPCMain, 还原任务名称
+        :param message: 任务回传的事件
+        :param generation: 发出该事件的任务管理进程代次, 非当前代次时丢弃
+        :return: None
+        """
+        if generation != self._generation:
+            discard_results(message)
+            return
+
+        owner, message = self._owner_of(message)
+        if owner is not None:
+            owner._on_message(message)
+        else:
+            self._release_orphans([message])
+
+    def _route_batch(self, messages, generation):
+        """
+        将一批事件按所属的IPCMain拆分后路由, 各自保持到达顺序
+        :param messages: 该批次的事件列表
+        :param generation: 发出该批事件的任务管理进程代次, 非当前代次时丢弃
+        :return: None
+        """
+        if generation != self._generation:
+            for message in messages:
+                discard_results(message)
+            return
+
+        if len(self._owners) == 1 and None in self._owners:
+            self._owners[None]._on_batch(messages)
+            return
+
+        batches = {}
+        orphans = []
+        for message in messages:
+            owner, message = self._owner_of(message)
+            if owner is not None:
+                batches.setdefault(owner, []).append(message)
+            else:
+                orphans.append(message)
+
+        self._release_orphans(orphans)
+        for owner, batch in batches.items():
+            owner._on_batch(batch)
+
+    def _release_orphans(self, messages):
+        """
+        丢弃已退出共享的IPCMain的结果事件, 释放其共享内存并归还占用的在途额度
+        :param messages: 无归属的事件列表
+        :return: None
+        """
+        for message in messages:
+            discard_results(message)
+            if self._credits is not None and message[2] in (EVENT_RESULT, EVENT_RESULTS):
+                self._credits.release()
+
+    def _owner_of(self, message):
+        """
+        事件所属的IPCMain
+        :param message: 任务回传的事件
+        :return: (IPCMain | None, message) -> 所属的IPCMain(已退出共享时为None), 还原任务名称后的事件
+        """
+        task_name = message[0]
+        if not isinstance(task_name, tuple):
+            return self._owners.get(None), message
+
+        owner_id, task_name = task_name
+        return self._owners.get(owner_id), (task_name,) + message[1:]
+
+    def __kill_proc(self):
+        """
+        任务管理进程关闭
+        :return: None
+        """
+        if self._proc is None:
+            return
+
+        try:
+            process = psutil.Process(self._proc.pid)
+            for child in process.children(recursive=True):
+                child.kill()
+
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+        self._proc.join()
+        self._proc = None
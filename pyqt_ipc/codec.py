@@ -0,0 +1,91 @@
+import zlib
+import struct
+import pickle
+
+
+__all__ = [
+    "Codec"
+]
+
+# 帧标记位: 带有带外缓冲区; 负载经zlib压缩; 负载以单独的帧发送
+_OUT_OF_BAND = 0x01
+_ZLIB = 0x02
+_SPLIT = 0x04
+
+# 负载不小于该值时以单独的帧发送, 避免与帧头拼接时拷贝大块内存, 单位: 字节
+_SPLIT_SIZE = 64 * 1024
+
+class Codec:
+    """
+    管道传输的编解码器, 每条消息编码为若干帧:
+    首帧为pickle(protocol 5)负载+(带外缓冲区的大小与数量)+1字节标记, 小消息只有这一帧, 解码时直接反序列化而不切片(pickle忽略负载之后的字节);
+    ndarray、bytearray等支持带外传递的大缓冲区不拷贝进pickle负载, 以单独的帧原样发送, 接收端直接读入可写的bytearray;
+    开启压缩时较大的负载(如长文本)经zlib压缩, 压缩收益不足时原样发送
+    可继承并重写encode/decode以替换序列化方式
+    """
+
+    def __init__(self, out_of_band=64 * 1024, compress=None, level=1):
+        """
+        :param out_of_band: 缓冲区不小于该值时带外传递, 为None时不使用带外传递, 单位: 字节
+        :param compress: 负载不小于该值时尝试zlib压缩, 为None时不压缩, 单位: 字节
+        :param level: zlib压缩等级
+        """
+        self._out_of_band = out_of_band
+        self._compress = compress
+        self._level = level
+
+    def encode(self, obj):
+        """
+        编码一条消息
+        :param obj: 消息
+        :return: list -> 依次发送的帧(bytes类对象)
+        """
+        buffers = []
+        callback = None
+        if self._out_of_band is not None:
+            # 返回真值时该缓冲区仍在pickle负载内传递
+            callback = lambda buffer: buffer.raw().nbytes < self._out_of_band or buffers.append(buffer.raw())
+        payload = pickle.dumps(obj, 5, buffer_callback=callback)
+
+        if not buffers and self._compress is None and len(payload) < _SPLIT_SIZE:
+            return [payload + b"\x00"]
+
+        flags = 0
+        trailer = b""
+        if buffers:
+            flags |= _OUT_OF_BAND
+            trailer = struct.pack(f"<{len(buffers)}QH", *(buffer.nbytes for buffer in buffers), len(buffers))
+        if self._compress is not None and len(payload) >= self._compress:
+            packed = zlib.compress(payload, self._level)
+            if len(packed) < len(payload) * 0.9:
+                flags |= _ZLIB
+                payload = packed
+
+        if len(payload) >= _SPLIT_SIZE:
+            return [trailer + bytes((flags | _SPLIT,)), payload] + buffers
+
+        return [payload + trailer + bytes((flags,))] + buffers
+
+    def decode(self, first, read):
+        """
+        解码一条消息
+        :param first: 首帧
+        :param read: 读取后续帧的函数, read()读取下一帧, read(size)将下一帧读入大小为size的bytearray
+        :return: 消息
+        """
+        flags = first[-1]
+        if not flags:
+            return pickle.loads(first)
+
+        end = len(first) - 1
+        sizes = ()
+        if flags & _OUT_OF_BAND:
+            count, = struct.unpack_from("<H", first, end - 2)
+            end -= 2 + 8 * count
+            sizes = struct.unpack_from(f"<{count}Q", first, end)
+
+        payload = read() if flags & _SPLIT else memoryview(first)[:end]
+        if flags & _ZLIB:
+            payload = zlib.decompress(payload)
+
+        return pickle.loads(payload, buffers=[read(size) for size in sizes])
@@ -0,0 +1,103 @@
+import time
+import heapq
+import itertools
+
+from PyQt5.QtCore import QObject, QTimer
+
+from .logger import logger
+
+
+__all__ = [
+    "FrameDispatcher"
+]
+
+class FrameDispatcher(QObject):
+    """
+    渲染端的分帧回调分发器: 监听回调先入队, 每帧最多占用budget毫秒依次执行, 剩余的留待下一帧,
+    期间不主动处理Qt事件, 由事件循环正常处理绘制与输入; 优先级高的回调先执行, 同一优先级内按入队顺序执行
+    """
+
+    def __init__(self, budget, frame_interval, on_drain=None):
+        """
+        :param budget: 每帧执行回调的时间预算, 单位: ms
+        :param frame_interval: 帧间隔, 单位: ms
+        :param on_drain: 每帧执行结束后的回调
+        """
+        super(FrameDispatcher, self).__init__()
+        self._budget = budget / 1000
+        self._frame_interval = frame_interval / 1000
+        self._heap = []
+        self._seq = itertools.count()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._drain)
+        self._dispatched = 0
+        self._slices = 0
+        self._overruns = 0
+        self._max_pending = 0
+        self._max_slice = 0.0
+        self._on_drain = on_drain
+
+    def post(self, priority, func, *args):
+        """
+        回调入队, 空闲时在下一次事件循环中开始执行
+        :param priority: 优先级, 数值越大越先执行
+        :param func: 回调
+        :param args: 回调参数
+        :return: None
+        """
+        heapq.heappush(self._heap, (-priority, next(self._seq), time.perf_counter(), func, args))
+        self._max_pending = max(self._max_pending, len(self._heap))
+        if not self._timer.isActive():
+            self._timer.start(0)
+
+    @property
+    def pending(self):
+
+        return len(self._heap)
+
+    def backlog(self):
+        """
+        积压统计
+        :return: dict -> pending: 待执行的回调数; lag_ms: 最早入队的待执行回调已等待的时间; max_pending: 历史最大积压;
+                         dispatched: 已执行的回调数; slices: 执行的帧数; overruns: 超出预算的帧数(单个回调耗时超过预算时发生);
+                         max_slice_ms: 单帧最长执行时间
+        """
+        oldest = min((item[2] for item in self._heap), default=None)
+        return {
+            "pending": len(self._heap),
+            "lag_ms": (time.perf_counter() - oldest) * 1000 if oldest is not None else 0.0,
+            "max_pending": self._max_pending,
+            "dispatched": self._dispatched,
+            "slices": self._slices,
+            "overruns": self._overruns,
+            "max_slice_ms": self._max_slice * 1000
+        }
+
+    def _drain(self):
+        """
+        在预算内执行排队中的回调, 超出预算后等到下一帧继续
+        :return: None
+        """
+        t0 = time.perf_counter()
+        deadline = t0 + self._budget
+        while self._heap:
+            func, args = heapq.heappop(self._heap)[3:]
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("监听回调执行出错")
+            self._dispatched += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        elapsed = time.perf_counter() - t0
+        self._slices += 1
+        self._max_slice = max(self._max_slice, elapsed)
+        if elapsed > self._budget * 1.5:
+            self._overruns += 1
+
+        if self._heap:
+            self._timer.start(max(0, round((self._frame_interval - elapsed) * 1000)))
+        if self._on_drain is not None:
+            self._on_drain()
@@ -0,0 +1,43 @@
+import traceback as tb
+
+
+__all__ = [
+    "TaskError"
+]
+
+class TaskError:
+    """
+    任务执行错误, 在任务管理进程(或工作进程)内捕获异常时生成, 经由错误事件回传至渲染进程;
+    只携带异常的类型名、信息与格式化后的调用栈, 不依赖异常本身能否被pickle
+    """
+
+    def __init__(self, type, message, traceback="", timeout=False, attempts=1):
+        """
+        :param type: 异常类型名, 超时为TimeoutError
+        :param message: 异常信息
+        :param traceback: 格式化后的调用栈, 进程池执行时为工作进程内的调用栈
+        :param timeout: 是否因超时结束
+        :param attempts: 已执行的次数(含重试)
+        """
+        self.type = type
+        self.message = message
+        self.traceback = traceback
+        self.timeout = timeout
+        self.attempts = attempts
+
+    @classmethod
+    def from_exception(cls, e):
+        """
+        由异常生成
+        :param e: 异常
+        :return: TaskError
+        """
+        return cls(type(e).__name__, str(e), "".join(tb.format_exception(type(e), e, e.__traceback__)))
+
+    def __str__(self):
+
+        return f"{self.type}: {self.message}"
+
+    def __repr__(self):
+
+        return f"TaskError({self.type!r}, {self.message!r}, timeout={self.timeout}, attempts={self.attempts})"
@@ -1,7 +1,9 @@
 __all__ = [
     "RegistryException",
     "ProcessException",
-    "OperationException"
+    "OperationException",
+    "TaskException",
+    "CancelledException"
 ]
 
 class IPCException(Exception):
@@ -30,4 +32,17 @@ class OperationException(IPCException):
 
     def __init__(self, msg):
 
-        self._msg = f"操作错误，{msg}"
\ No newline at end of file
+        self._msg = f"操作错误，{msg}"
+
+class TaskException(IPCException):
+
+    def __init__(self, msg, error=None):
+
+        self._msg = f"任务执行错误，{msg}"
+        self.error = error
+
+class CancelledException(IPCException):
+
+    def __init__(self, msg):
+
+        self._msg = f"取消，{msg}"
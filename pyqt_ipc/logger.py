@@ -1,4 +1,6 @@
 import logging
+from queue import SimpleQueue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
 
@@ -28,4 +30,66 @@ class Logger:
         return self._logger
 
 
-logger = Logger(logging.DEBUG).proto
\ No newline at end of file
+class _LocalQueueHandler(QueueHandler):
+    """
+    同一进程内的队列处理器, 日志记录原样入队, 格式化与输出均由监听线程执行
+    """
+
+    def prepare(self, record):
+
+        return record
+
+
+def parse_level(level):
+    """
+    解析日志等级
+    :param level: logging的等级数值或其名称(如"WARNING", 不区分大小写)
+    :return: int | None -> 无法识别时为None
+    """
+    if isinstance(level, bool):
+        return None
+    if isinstance(level, int):
+        return level
+    if isinstance(level, str):
+        value = logging.getLevelName(level.upper())
+        if isinstance(value, int):
+            return value
+
+    return None
+
+
+def log_in_background():
+    """
+    任务管理进程: 日志改为经由队列在后台线程格式化并输出, 任务线程记录日志时只入队, 不阻塞于格式化与写入
+    :return: QueueListener | None -> 已开启时为None
+    """
+    handlers = logger.handlers[:]
+    if not handlers or any(isinstance(handler, QueueHandler) for handler in handlers):
+        return None
+
+    global _listener
+    _listener = QueueListener(SimpleQueue(), *handlers, respect_handler_level=True)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(_LocalQueueHandler(_listener.queue))
+    _listener.start()
+    return _listener
+
+
+def log_directly():
+    """
+    工作进程: 由任务管理进程fork而来时不含监听线程, 恢复为直接输出日志
+    :return: None
+    """
+    if _listener is None:
+        return
+    for handler in logger.handlers[:]:
+        if isinstance(handler, _LocalQueueHandler):
+            logger.removeHandler(handler)
+    for handler in _listener.handlers:
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
+
+
+_listener: Optional[QueueListener] = None
+logger = Logger(logging.DEBUG).proto
@@ -1,11 +1,24 @@
 import time
 import inspect
-from multiprocessing import Process, Queue
+import logging
+import itertools
 
-import psutil
-from PyQt5.QtCore import pyqtSignal, QThread
+from PyQt5.QtCore import QTimer, QObject
+from PyQt5.QtWidgets import QApplication
 
-from .task import TaskManager, TaskIterator
+from .task import (
+    TaskIterator, EXECUTORS, OVERFLOWS, EVENT_START, EVENT_RESULT, EVENT_RESULTS, EVENT_DONE, EVENT_DROPPED,
+    EVENT_PROGRESS, EVENT_ERROR, EVENT_REJECTED
+)
+from .pipeline import Pipeline
+from .projection import Projection
+from .channel import Channel, discard_results
+from .timer import Interval, Cron
+from .shm import attach_result, share_args, discard_result, SharedBuffer
+from .cache import ResultCache
+from .aio import is_async
+from .metrics import Metrics, MetricsReporter
+from .dispatcher import FrameDispatcher
 from .logger import logger
 
 
@@ -13,111 +26,423 @@ __all__ = [
     "IPCMain"
 ]
 
-task_q = Queue()
-result_q = Queue()
+class IPCMain:
 
-class WatchThread(QThread):
-    """
-    Watch结果线程
-    """
-    signal = pyqtSignal(tuple)
+    def __init__(
+        self, window, interval, batch=False, batch_interval=16, executor="thread",
+        pool_size=None, shm_threshold=None, max_running=None,
+        preload=None, initializer=None, initargs=(), prefork=False, metrics=False, metrics_interval=None,
+        frame_budget=None, result_queue_size=None, share=None, transport="queue", codec=None, supervise=None,
+        log_level=None
+    ):
 
-    def __init__(self, interval, run_flag=True):
-        super(WatchThread, self).__init__()
-        self._interval = interval
-        self._run_flag = run_flag
+        self._window = window
+        self._executor = executor
+        if share is None:
+            self._channel = Channel(interval / 1000, batch_interval / 1000 if batch else None, {
+                "pool_size": pool_size, "shm_threshold": shm_threshold, "max_running": max_running,
+                "preload": preload, "initializer": initializer, "initargs": initargs, "prefork": prefork,
+                "metrics": metrics, "result_queue_size": result_queue_size, "log_level": log_level
+            }, transport, codec, supervise)
+        else:
+            self._channel = share.channel
+        self._owner_id = self._channel.attach(self)
+        self._closed = False
+        self._task_datasets = {}
+        self._listen_tasks = {}
+        self._invocations = {}
+        self._invocation_listens = {}
+        self._progress_listens = {}
+        self._error_listens = {}
+        self._projections = {}
+        self._failure_listens = []
+        self._invocation_ids = itertools.count(1)
+        self._current_invocation = None
+        self._first_latency = {}
+        self._metrics = Metrics() if metrics else None
+        self._metrics_reporter = MetricsReporter(self.metrics, metrics_interval) if metrics and metrics_interval else None
+        self._dispatcher = FrameDispatcher(frame_budget, batch_interval, self._release_credits) if frame_budget else None
+        self._latest_pending = {}
+        self._held_credits = 0
+        self._dropped = {}
 
-    def run(self):
+    def registry(
+        self, task_name, task, executor=None, concurrency=1, priority=0, cache=None, overflow="block", backlog=None,
+        timeout=None, retries=0, backoff=0.1
+    ):
+        """
+        注册/更新任务
+        :param task_name: 任务名称
+        :param task: 任务实体, 可以是async def函数或异步生成器函数, 异步任务以协程在任务管理进程的事件循环中执行;
+                     也可以是任务函数的可导入路径(如"myapp.tasks:read_file"), 由任务管理进程及工作进程各自解析一次,
+                     避免序列化闭包、绑定方法及其所属对象
+        :param executor: 执行方式, thread: 任务管理进程内的线程执行, 适用于IO密集型任务;
+                         process: 工作进程池执行, 适用于CPU密集型任务, 任务函数及其参数、返回值需可被pickle;
+                         为None时使用CreateIPC传入的默认执行方式; 异步任务忽略该参数
+        :param concurrency: 同一任务同时运行的调用数上限, 超出上限的调用排队等待
+        :param priority: 调度优先级, 数值越大越先执行(如界面交互任务高于后台预取任务), 同一优先级内各任务轮转执行
+        :param cache: 结果缓存, True或ResultCache实例; 适用于纯函数任务, 相同参数再次启动时直接回调缓存的结果,
+                      不再经由任务管理进程, 可通过invalidate使缓存失效
+        :param overflow: 结果积压超出backlog时的溢出策略, 需在CreateIPC时传入result_queue_size;
+                         block: 阻塞任务直至渲染进程跟上; drop_oldest: 丢弃最早的未发送结果; drop_newest: 丢弃新产出的结果;
+                         latest: 只保留最新的一个结果; 被丢弃的结果数可通过dropped获取
+        :param backlog: 任务管理进程内该任务待发送结果的上限, 为None时与result_queue_size相同
+        :param timeout: 单次执行任务函数的最长时间, 超时以超时错误结束调用并立即释放并发名额, 为None时不限制, 单位: s;
+                        进程池执行时强制结束其工作进程, 异步任务被取消, 线程执行的任务函数无法被强制结束, 其后续结果被丢弃
+        :param retries: 执行出错后的重试次数, 已回传过结果的执行及超时不重试
+        :param backoff: 首次重试前的等待时间, 之后每次翻倍, 单位: s
+        :return: None
+        """
+        if isinstance(self._task_datasets.get(task_name, {}).get("task"), Pipeline):
+            logger.error(f"[{task_name}]: 注册失败, 该名称已注册为流水线, 本次注册被忽略!")
+            return
 
-        while True:
-            if not self._run_flag:
-                break
+        if isinstance(getattr(self._task_proto(task), "__self__", None), QObject):
+            logger.error(
+                f"[{task_name}]: 注册失败, Qt对象无法跨进程传递, 任务不能是Qt对象的方法, "
+                f"请改用静态方法、模块级函数或可导入路径注册, 本次注册被忽略!"
+            )
+            return
 
-            if result_q.empty():
-                time.sleep(self._interval)
-                continue
+        executor = executor or self._executor
+        if executor not in EXECUTORS:
+            logger.error(f"[{task_name}]: 注册失败, executor参数必须为{'/'.join(EXECUTORS)}之一, 本次注册被忽略!")
+            return
 
-            result = result_q.get()
-            self.signal.emit(result)
+        if not isinstance(concurrency, int) or concurrency < 1:
+            logger.error(f"[{task_name}]: 注册失败, concurrency参数必须为正整数, 本次注册被忽略!")
+            return
 
-    @property
-    def run_flag(self):
+        if not isinstance(priority, int):
+            logger.error(f"[{task_name}]: 注册失败, priority参数必须为整数, 本次注册被忽略!")
+            return
+
+        if cache is True:
+            cache = ResultCache()
+        if cache is not None and not isinstance(cache, ResultCache):
+            logger.error(f"[{task_name}]: 注册失败, cache参数必须为True或ResultCache实例, 本次注册被忽略!")
+            return
 
-        return self._run_flag
+        if overflow not in OVERFLOWS:
+            logger.error(f"[{task_name}]: 注册失败, overflow参数必须为{'/'.join(OVERFLOWS)}之一, 本次注册被忽略!")
+            return
 
-    @run_flag.setter
-    def run_flag(self, newValue):
+        if backlog is not None and (not isinstance(backlog, int) or backlog < 1):
+            logger.error(f"[{task_name}]: 注册失败, backlog参数必须为正整数, 本次注册被忽略!")
+            return
 
-        self._run_flag = newValue
+        if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+            logger.error(f"[{task_name}]: 注册失败, timeout参数必须为正数, 本次注册被忽略!")
+            return
 
-class IPCMain:
+        if not isinstance(retries, int) or retries < 0:
+            logger.error(f"[{task_name}]: 注册失败, retries参数必须为非负整数, 本次注册被忽略!")
+            return
 
-    def __init__(self, window, interval):
+        if not isinstance(backoff, (int, float)) or backoff < 0:
+            logger.error(f"[{task_name}]: 注册失败, backoff参数必须为非负数, 本次注册被忽略!")
+            return
 
-        self._window = window
-        self._interval = interval / 1000
-        self._task_datasets = {}
-        self._proc = None
-        self._watch_thread = None
-        self._listen_tasks = {}
+        if (overflow != "block" or backlog is not None) and self._channel.credits is None:
+            logger.warning(f"[{task_name}]: 未限制结果在途数, overflow及backlog参数不生效, 请在CreateIPC时传入result_queue_size")
 
-    def registry(self, task_name, task):
+        if executor == "process" and is_async(self._task_proto(task)):
+            logger.warning(f"[{task_name}]: 异步任务固定在任务管理进程的事件循环中执行, executor参数不生效")
+
+        options = {
+            "executor": executor, "concurrency": concurrency, "priority": priority,
+            "overflow": overflow, "backlog": backlog, "timeout": timeout, "retries": retries, "backoff": backoff
+        }
+        previous = self._task_datasets.get(task_name)
+        if previous is not None:
+            if previous["running"]:
+                logger.warning(f"[{task_name}]: 对应的任务还在运行中, 任务完成后才能重新注册任务, 本次注册被忽略!")
+                return
+            previous.pop("previous", None)
+            self._channel.put(("modify", self._wire(task_name), task, options))
+        else:
+            self._channel.put(("add", self._wire(task_name), task, options))
+            if task_name in self._projections:
+                self._channel.put(("project", self._wire(task_name), self._projections[task_name]))
+
+        # 任务管理进程内注册失败时撤销本次注册, 更新失败时恢复为previous
+        self._task_datasets.update({
+            task_name: {"task": task, "options": options, "running": 0, "cache": cache, "previous": previous}
+        })
+        logger.debug("[%s]: 下发注册/更新任务成功", task_name)
+
+    def pipeline(self, pipeline_name, stages, progress=False, concurrency=1, priority=0):
         """
-        注册/更新任务
-        :param task_name: 任务名称
-        :param task: 任务实体
+        注册/更新流水线: 由已注册任务组成, 通过start启动; 各阶段在任务管理进程内按依赖关系执行, 相互独立的阶段同时执行,
+        中间结果不经由渲染进程, 只有最终阶段的结果回调给该流水线名称的监听
+        :param pipeline_name: 流水线名称, 不能与已注册的任务重名
+        :param stages: 阶段列表(线性流水线, 前一阶段的返回值作为后一阶段的唯一位置参数)或依赖字典
+                       {阶段: [依赖的阶段, ...]}(依赖的各阶段返回值按声明顺序作为该阶段的位置参数), 阶段为已注册的任务名称;
+                       无依赖的阶段接收start传入的参数, 且只能有一个没有下游的阶段
+        :param progress: 是否在每完成一个中间阶段时回调进度, 通过IPCRenderer.on_progress接收
+        :param concurrency: 同一流水线同时运行的调用数上限
+        :param priority: 调度优先级, 同registry
         :return: None
         """
-        if task_name in self._task_datasets:
-            ori_task_info = self._task_datasets[task_name]
-            ori_task = ori_task_info["task"]
-            already_cycle = ori_task_info["already"]
-            if isinstance(ori_task, TaskIterator):
-                if ori_task.cycles == 0 or already_cycle < ori_task.cycles:
-                    logger.warning(f"[{task_name}]: 对应的任务还在运行中, 任务完成后才能重新注册任务, 本次注册被忽略!")
-                    return
-            else:
-                if already_cycle == 0:
-                    logger.warning(f"[{task_name}]: 对应的任务还在运行中, 任务完成后才能重新注册任务, 本次注册被忽略!")
-                    return
-            task_q.put(("modify", task_name, task))
-        else:
-            task_q.put(("add", task_name, task))
+        dataset = self._task_datasets.get(pipeline_name)
+        if dataset is not None and not isinstance(dataset["task"], Pipeline):
+            logger.error(f"[{pipeline_name}]: 注册失败, 该名称已注册为任务, 本次注册被忽略!")
+            return
+
+        try:
+            pipeline = Pipeline(stages)
+        except ValueError as e:
+            logger.error(f"[{pipeline_name}]: 注册失败, {e}, 本次注册被忽略!")
+            return
+
+        for stage in pipeline.stages:
+            if stage not in self._task_datasets or isinstance(self._task_datasets[stage]["task"], Pipeline):
+                logger.error(f"[{pipeline_name}]: 注册失败, 阶段{stage}不是已注册的任务, 本次注册被忽略!")
+                return
 
-        self._task_datasets.update({task_name: {"task": task, "already": 0}})
-        logger.debug(f"[{task_name}]: 下发注册/更新任务成功")
+        if not isinstance(concurrency, int) or concurrency < 1:
+            logger.error(f"[{pipeline_name}]: 注册失败, concurrency参数必须为正整数, 本次注册被忽略!")
+            return
+
+        if not isinstance(priority, int):
+            logger.error(f"[{pipeline_name}]: 注册失败, priority参数必须为整数, 本次注册被忽略!")
+            return
+
+        if dataset is not None and dataset["running"]:
+            logger.warning(f"[{pipeline_name}]: 对应的流水线还在运行中, 运行完成后才能重新注册, 本次注册被忽略!")
+            return
+
+        options = {
+            "concurrency": concurrency, "priority": priority, "progress": bool(progress),
+            "overflow": "block", "backlog": None
+        }
+        stage_names = {stage: self._wire(stage) for stage in pipeline.stages}
+        self._channel.put(("pipeline", self._wire(pipeline_name), pipeline, stage_names, options))
+        if pipeline_name in self._projections:
+            self._channel.put(("project", self._wire(pipeline_name), self._projections[pipeline_name]))
+        self._task_datasets[pipeline_name] = {"task": pipeline, "options": options, "running": 0, "cache": None}
+        logger.debug("[%s]: 下发注册/更新流水线成功", pipeline_name)
 
     def start(self, task_name, *args, **kwargs):
         """
-        启动任务
+        启动任务, 同一任务可多次启动并同时运行(受注册时的concurrency限制)
+        :param task_name: 任务名称
+        :param args: 执行任务传递的位置参数, 开启shm_threshold时超过阈值的bytes类对象或ndarray参数经由共享内存传递
+        :param kwargs: 执行任务传递的关键字参数, 同args
+        :return: int | None -> 本次调用编号, 启动失败时为None
+        """
+        if task_name not in self._task_datasets:
+            logger.error("流程错误, 请先完成任务注册后再启动, 本次启动被忽略!")
+            return None
+
+        if not self._channel.alive:
+            logger.error(f"[{task_name}]: 任务管理进程已停止且不再重启, 本次启动被忽略!")
+            return None
+
+        if not self._validate_task_params(task_name, *args, **kwargs):
+            logger.error("操作错误, 传递给任务的参数不合法, 请传递有效参数, 本次启动被忽略!")
+            return None
+
+        dataset = self._task_datasets[task_name]
+        invocation_id = next(self._invocation_ids)
+        invocation = {
+            "task_name": task_name, "dataset": dataset, "already": 0, "state": "queued", "enqueued_at": time.time()
+        }
+        self._invocations[invocation_id] = invocation
+        dataset["running"] += 1
+
+        cache = dataset["cache"]
+        if cache is not None:
+            key = cache.make_key(args, kwargs)
+            results = None if key is None else cache.get(key)
+            if results is not None:
+                if self._metrics is not None:
+                    self._metrics.incr(task_name, "cache_hits")
+                QTimer.singleShot(0, lambda: self._replay(task_name, invocation_id, results))
+                logger.debug("[%s#%s]: 命中结果缓存", task_name, invocation_id)
+                return invocation_id
+            if key is not None:
+                invocation.update({"cache_key": key, "results": []})
+
+        args, kwargs = share_args(args, kwargs, self._channel.manager_options["shm_threshold"])
+        self._channel.put(("start", self._wire(task_name), invocation_id, args, kwargs))
+        logger.debug("[%s#%s]: 下发启动任务成功", task_name, invocation_id)
+        return invocation_id
+
+    def map(self, task_name, iterable, chunksize=None, ordered=False, workers=None):
+        """
+        批量启动任务: 输入被切分为多个分块分发至线程或工作进程池执行, 结果随分块完成陆续回调给任务监听;
+        整个批量调用只占用一个并发名额, 各分块的并行度由执行者数量决定, 不受注册时的concurrency限制
+        :param task_name: 任务名称
+        :param iterable: 输入, 每个输入作为任务函数的唯一位置参数
+        :param chunksize: 分块大小, 为None时按执行者数量自动计算(约每个执行者4个分块)
+        :param ordered: 是否按输入顺序回调, 默认按完成顺序
+        :param workers: 线程执行时同时执行分块的线程数, 为None时为分块数, 且不超过CreateIPC传入的max_running
+                        (未传入时为min(32, CPU核数+4)); 进程池执行时为进程池大小, 该参数不生效
+        :return: int | None -> 本次调用编号, 启动失败时为None
+        """
+        if task_name not in self._task_datasets:
+            logger.error("流程错误, 请先完成任务注册后再启动, 本次启动被忽略!")
+            return None
+
+        if not self._channel.alive:
+            logger.error(f"[{task_name}]: 任务管理进程已停止且不再重启, 本次启动被忽略!")
+            return None
+
+        if is_async(self._task_proto(self._task_datasets[task_name]["task"])):
+            logger.error(f"[{task_name}]: 操作错误, 异步任务不支持批量执行, 本次启动被忽略!")
+            return None
+
+        if isinstance(self._task_datasets[task_name]["task"], Pipeline):
+            logger.error(f"[{task_name}]: 操作错误, 流水线不支持批量执行, 本次启动被忽略!")
+            return None
+
+        items = list(iterable)
+        if items and not self._validate_task_params(task_name, items[0]):
+            logger.error("操作错误, 传递给任务的参数不合法, 请传递有效参数, 本次启动被忽略!")
+            return None
+
+        if chunksize is not None and (not isinstance(chunksize, int) or chunksize < 1):
+            logger.error("操作错误, chunksize参数必须为正整数, 本次启动被忽略!")
+            return None
+
+        if workers is not None and (not isinstance(workers, int) or isinstance(workers, bool) or workers < 1):
+            logger.error("操作错误, workers参数必须为正整数, 本次启动被忽略!")
+            return None
+
+        dataset = self._task_datasets[task_name]
+        invocation_id = next(self._invocation_ids)
+        self._invocations[invocation_id] = {
+            "task_name": task_name, "dataset": dataset, "already": 0, "state": "queued", "enqueued_at": time.time()
+        }
+        dataset["running"] += 1
+        self._channel.put(("map", self._wire(task_name), invocation_id, items, chunksize, ordered, workers))
+        logger.debug("[%s#%s]: 下发批量任务成功, 输入数: %s", task_name, invocation_id, len(items))
+        return invocation_id
+
+    def schedule(
+        self, task_name, every=None, cron=None, fixed_rate=True, delay=None, times=None, skip=True, args=(), kwargs=None
+    ):
+        """
+        定时启动任务: 由任务管理进程内的定时器按间隔或cron表达式触发, 每次触发执行一次任务函数, 结果回调给任务监听;
+        整个定时调用只占用一个调用编号, 每次触发的执行与其它调用一同排队, 执行期间占用一个并发名额, 通过cancel停止
         :param task_name: 任务名称
-        :param args: 执行任务传递的位置参数
+        :param every: 触发间隔, 与cron二选一, 单位: s
+        :param cron: cron表达式(本地时间), 格式为"分 时 日 月 周", 与every二选一
+        :param fixed_rate: 按every触发时是否按固定频率触发, 为True时不随执行耗时漂移, 为False时上次执行结束后再间隔every触发
+        :param delay: 按every触发时首次触发的延迟, 为None时立即触发, 单位: s
+        :param times: 触发次数, 为None时不限次数
+        :param skip: 上次执行尚未结束时是否跳过本次触发, 为False时允许同一定时调用的多次执行重叠
+        :param args: 执行任务传递的位置参数, 每次触发均使用同一份参数
         :param kwargs: 执行任务传递的关键字参数
-        :return: None
+        :return: int | None -> 本次调用编号, 启动失败时为None
         """
         if task_name not in self._task_datasets:
             logger.error("流程错误, 请先完成任务注册后再启动, 本次启动被忽略!")
-            return
+            return None
+
+        if not self._channel.alive:
+            logger.error(f"[{task_name}]: 任务管理进程已停止且不再重启, 本次启动被忽略!")
+            return None
+
+        if isinstance(self._task_datasets[task_name]["task"], Pipeline):
+            logger.error(f"[{task_name}]: 操作错误, 流水线不支持定时执行, 本次启动被忽略!")
+            return None
+
+        if (every is None) == (cron is None):
+            logger.error("操作错误, every与cron参数必须且只能传入一个, 本次启动被忽略!")
+            return None
 
+        if every is not None and (not isinstance(every, (int, float)) or every <= 0):
+            logger.error("操作错误, every参数必须为正数, 本次启动被忽略!")
+            return None
+
+        if delay is not None and (not isinstance(delay, (int, float)) or delay < 0):
+            logger.error("操作错误, delay参数必须为非负数, 本次启动被忽略!")
+            return None
+
+        if times is not None and (not isinstance(times, int) or times < 1):
+            logger.error("操作错误, times参数必须为正整数, 本次启动被忽略!")
+            return None
+
+        if not isinstance(args, tuple) or not isinstance(kwargs or {}, dict):
+            logger.error("操作错误, args参数必须为元组, kwargs参数必须为字典, 本次启动被忽略!")
+            return None
+
+        kwargs = kwargs or {}
         if not self._validate_task_params(task_name, *args, **kwargs):
             logger.error("操作错误, 传递给任务的参数不合法, 请传递有效参数, 本次启动被忽略!")
-            return
+            return None
 
-        task_q.put(("start", task_name, args, kwargs))
-        logger.debug(f"[{task_name}]: 下发启动任务成功")
+        if cron is not None:
+            try:
+                trigger = Cron(cron)
+                # 语法合法但没有可触发的时刻(如"0 0 31 2 *")的表达式在此拒绝
+                trigger.first(time.monotonic())
+            except (AttributeError, ValueError) as e:
+                logger.error(f"操作错误, cron表达式{cron!r}不合法, {e}, 本次启动被忽略!")
+                return None
+        else:
+            trigger = Interval(every, bool(fixed_rate), delay)
+
+        dataset = self._task_datasets[task_name]
+        invocation_id = next(self._invocation_ids)
+        self._invocations[invocation_id] = {
+            "task_name": task_name, "dataset": dataset, "already": 0, "state": "queued", "enqueued_at": time.time()
+        }
+        dataset["running"] += 1
+        args, kwargs = share_args(args, kwargs, self._channel.manager_options["shm_threshold"])
+        self._channel.put(("schedule", self._wire(task_name), invocation_id, args, kwargs, trigger, times, bool(skip)))
+        logger.debug("[%s#%s]: 下发定时任务成功", task_name, invocation_id)
+        return invocation_id
 
-    def cancel(self, task_name):
+    def cancel(self, task_name, kill_timeout=None, invocation_id=None):
         """
-        停止任务
+        停止任务, 任务函数可通过pyqt_ipc.cancel.current_token()检查是否已被取消, 被取消的执行结果不会回调
         :param task_name: 任务名称
+        :param kill_timeout: 进程池执行的任务超过该时间仍未结束则强制结束其工作进程, 为None时仅协作式取消, 单位: s
+        :param invocation_id: 调用编号(start的返回值), 为None时停止该任务的所有调用
         :return: None
         """
         if task_name not in self._task_datasets:
             logger.error("流程错误, 任务完成注册并运行后才有停止的可能, 本次停止任务操作被忽略!")
             return
 
-        task_q.put(("stop", task_name))
-        logger.debug(f"[{task_name}]: 下发取消任务成功")
+        if kill_timeout is not None and (not isinstance(kill_timeout, (int, float)) or kill_timeout < 0):
+            logger.error("操作错误, kill_timeout参数必须为非负数, 本次停止任务操作被忽略!")
+            return
+
+        for _invocation_id, invocation in self._invocations.items():
+            if invocation["task_name"] == task_name and invocation_id in (None, _invocation_id):
+                invocation["cancelled"] = True
+
+        self._channel.put(("stop", self._wire(task_name), kill_timeout, invocation_id))
+        logger.debug("[%s]: 下发取消任务成功", task_name)
+
+    def invalidate(self, task_name, *args, **kwargs):
+        """
+        使任务的结果缓存失效
+        :param task_name: 任务名称
+        :param args: 启动任务时的位置参数
+        :param kwargs: 启动任务时的关键字参数; 未传递任何参数时清空该任务的所有缓存
+        :return: None
+        """
+        cache = self._task_datasets.get(task_name, {}).get("cache")
+        if cache is None:
+            logger.warning(f"[{task_name}]: 任务未注册或未开启结果缓存, 本次操作被忽略!")
+            return
+
+        cache.invalidate(cache.make_key(args, kwargs) if args or kwargs else None)
+        logger.debug("[%s]: 结果缓存已失效", task_name)
+
+    def cache_info(self, task_name):
+        """
+        任务结果缓存统计
+        :param task_name: 任务名称
+        :return: dict | None -> {"hits", "misses", "size", "bytes"}, 未开启缓存时为None
+        """
+        cache = self._task_datasets.get(task_name, {}).get("cache")
+        return None if cache is None else cache.info()
 
     def bind_quit(self):
         """
@@ -127,42 +452,371 @@ class IPCMain:
         closeEvent = self._window.closeEvent
 
         def _quit(event):
-            if self._watch_thread is not None:
-                self._watch_thread.run_flag = False
-                self._watch_thread.quit()
-
-            task_q.put(("stop-all",))
-            self.__kill_proc()
-
+            self.close()
             closeEvent(event)
 
         self._window.closeEvent = _quit
 
     def run(self):
         """
-        任务管理进程启动
+        任务管理进程启动, 共享其它IPCMain的任务管理进程时无需启动
+        :return: None
+        """
+        if self._owner_id is None:
+            self._channel.run()
+
+    def close(self):
+        """
+        退出IPC: 独占任务管理进程时将其关闭; 共享时只停止本对象运行中的任务, 最后一个退出者关闭任务管理进程
+        :return: None
+        """
+        if self._closed:
+            return
+
+        for task_name, dataset in self._task_datasets.items():
+            if dataset["running"]:
+                self._channel.put(("stop", self._wire(task_name), None, None))
+        if self._metrics_reporter is not None:
+            self._metrics_reporter.stop()
+        self._closed = True
+        self._channel.detach(self._owner_id)
+
+    def wait_ready(self, timeout=None):
+        """
+        等待任务管理进程(及prefork的工作进程池)预热完成, 可在窗口显示前调用
+        :param timeout: 最长等待时间, 为None时一直等待, 单位: s
+        :return: bool -> 是否已就绪
+        """
+        return self._channel.wait_ready(timeout)
+
+    @property
+    def startup_stats(self):
+        """
+        启动耗时统计, 单位: s
+        :return: dict -> startup: 任务管理进程从拉起到就绪的总耗时; preload: 预导入模块耗时; initializer: 初始化函数耗时;
+                         pool: prefork工作进程池耗时(仅prefork时); first_task: {任务名称: 首次调用从启动到收到首个结果的耗时};
+                         尚未就绪时仅有first_task
+        """
+        self.wait_ready(0)
+        stats = dict(self._channel.startup_stats or {})
+        stats["first_task"] = dict(self._first_latency)
+        return stats
+
+    def _on_message(self, message):
+        """
+        结果队列中的单个事件送达
+        :param message: 任务回传的事件
         :return: None
         """
-        self._proc = Process(target=TaskManager.run_ever, args=(task_q, result_q))
-        self._proc.daemon = True
-        self._proc.start()
+        try:
+            self._callback(message)
+        finally:
+            self._release_credits(message[2] in (EVENT_RESULT, EVENT_RESULTS))
 
-        self._watch_thread = WatchThread(True)
-        self._watch_thread.signal.connect(self._callback)
-        self._watch_thread.start()
+    def _on_batch(self, messages):
+        """
+        结果队列中的一批事件送达
+        :param messages: 该批次的事件列表
+        :return: None
+        """
+        try:
+            self._callback_batch(messages)
+        finally:
+            self._release_credits(sum(message[2] in (EVENT_RESULT, EVENT_RESULTS) for message in messages))
 
-    def _callback(self, result):
+    def _release_credits(self, n=0):
         """
-        结果回调
-        :param result: 任务完成后生成的结果
+        归还已处理的结果事件占用的在途额度; 开启frame_budget且积压的回调数达到result_queue_size时暂缓归还, 由分帧分发器执行后再归还
+        :param n: 新处理完的结果事件数
         :return: None
         """
-        task_name = result[0]
-        if task_name in self._listen_tasks:
-            self._listen_tasks[task_name](*result[1:])
+        credits = self._channel.credits
+        if credits is None:
+            return
 
-        if task_name in self._task_datasets:
-            self._callback_subsequent(task_name)
+        self._held_credits += n
+        if self._dispatcher is not None and self._dispatcher.pending >= self._channel.manager_options["result_queue_size"]:
+            return
+
+        for _ in range(self._held_credits):
+            credits.release()
+        self._held_credits = 0
+
+    def _callback(self, message):
+        """
+        结果回调, 回调后主动处理Qt事件; 开启frame_budget时回调已分帧执行, 不再主动处理
+        :param message: 任务回传的事件 (任务名称, 调用编号, 事件类型, 结果)
+        :return: None
+        """
+        self._callback_batch([message])
+        if self._dispatcher is None:
+            QApplication.processEvents()
+
+    def _callback_batch(self, messages):
+        """
+        批量结果回调, 仅订阅最新结果的监听对每个任务只回调该批次的最后一个结果
+        :param messages: 该批次的事件列表, 按到达顺序排列
+        :return: None
+        """
+        latest = {}
+        # 开启frame_budget时回调耗时在实际执行时记录
+        metrics = self._metrics if self._dispatcher is None else None
+        for task_name, invocation_id, event, values, meta in messages:
+            if event == EVENT_DROPPED:
+                self._record_dropped(task_name, values)
+                continue
+
+            if event == EVENT_PROGRESS:
+                self._dispatch_progress(task_name, invocation_id, values)
+                continue
+
+            if event == EVENT_ERROR:
+                self._dispatch_error(task_name, invocation_id, values)
+                continue
+
+            if event == EVENT_REJECTED:
+                self._on_rejected(task_name, *values)
+                continue
+
+            if event in (EVENT_RESULT, EVENT_RESULTS) and self._invocations.get(invocation_id, {}).get("cancelled"):
+                # 取消前已发出的结果不再回调, 只回调结束
+                discard_results((task_name, invocation_id, event, values))
+                continue
+
+            if self._metrics is not None and meta is not None:
+                self._record_metrics(task_name, invocation_id, event, values, meta)
+
+            t0 = time.perf_counter()
+            if event == EVENT_RESULT:
+                values = attach_result(values)
+                self._dispatch(task_name, invocation_id, values, latest)
+            elif event == EVENT_RESULTS:
+                values = [attach_result(item) for item in values]
+                for item in values:
+                    self._dispatch(task_name, invocation_id, item, latest)
+            if metrics is not None and event in (EVENT_RESULT, EVENT_RESULTS):
+                metrics.observe(task_name, "callback", time.perf_counter() - t0)
+
+            self._callback_subsequent(task_name, invocation_id, event, values)
+
+        for task_name, (invocation_id, values) in latest.items():
+            if self._invocations.get(invocation_id, {}).get("cancelled"):
+                continue
+            if task_name in self._listen_tasks and self._listen_tasks[task_name].has_latest:
+                if self._dispatcher is not None:
+                    self._post_latest(task_name, invocation_id, values)
+                    continue
+                t0 = time.perf_counter()
+                self._current_invocation = invocation_id
+                try:
+                    self._listen_tasks[task_name].dispatch_latest(invocation_id, *values)
+                finally:
+                    self._current_invocation = None
+                if metrics is not None:
+                    metrics.observe(task_name, "callback", time.perf_counter() - t0)
+
+    def _record_dropped(self, task_name, dropped):
+        """
+        记录任务管理进程因积压丢弃的结果, 有结果被丢弃的调用不写入结果缓存
+        :param task_name: 任务名称
+        :param dropped: {调用编号: 丢弃的结果数}
+        :return: None
+        """
+        if task_name not in self._dropped:
+            logger.warning(f"[{task_name}]: 结果积压超出上限, 部分结果已按溢出策略丢弃, 可通过dropped查看丢弃数")
+
+        n = sum(dropped.values())
+        self._dropped[task_name] = self._dropped.get(task_name, 0) + n
+        if self._metrics is not None:
+            self._metrics.incr(task_name, "dropped", n)
+        for invocation_id in dropped:
+            invocation = self._invocations.get(invocation_id)
+            if invocation is not None and invocation.get("results") is not None:
+                invocation["results"] = None
+
+    def _on_rejected(self, task_name, command, reason):
+        """
+        任务管理进程内注册失败(如以路径注册时导入失败): 撤销该次注册, 更新失败时恢复为更新前的注册;
+        已下发的调用由任务管理进程以错误结束
+        :param task_name: 任务名称
+        :param command: 失败的指令, add: 注册; modify: 更新
+        :param reason: 失败原因
+        :return: None
+        """
+        dataset = self._task_datasets.get(task_name)
+        if dataset is None:
+            return
+
+        previous = dataset.get("previous")
+        if command == "modify" and previous is not None:
+            self._task_datasets[task_name] = previous
+            logger.error(f"[{task_name}]: 任务管理进程内更新{reason} 已恢复为更新前的注册!")
+        else:
+            del self._task_datasets[task_name]
+            logger.error(f"[{task_name}]: 任务管理进程内{reason} 该任务已被移除, 请修正后重新注册!")
+
+    def _dispatch_progress(self, task_name, invocation_id, values):
+        """
+        流水线进度回调, 开启frame_budget时同样分帧执行
+        :param task_name: 流水线名称
+        :param invocation_id: 调用编号
+        :param values: (完成的阶段, 已完成阶段数, 阶段总数)
+        :return: None
+        """
+        controller = self._progress_listens.get(task_name)
+        if controller is None:
+            return
+
+        for listener in list(controller.listeners):
+            if self._dispatcher is not None:
+                self._dispatcher.post(listener.priority, listener, invocation_id, *values)
+                continue
+            try:
+                listener(invocation_id, *values)
+            except Exception:
+                logger.exception(f"[{task_name}#{invocation_id}]: 进度回调执行出错")
+
+    def _dispatch_error(self, task_name, invocation_id, error):
+        """
+        错误回调, 出错的调用不写入结果缓存; 开启frame_budget时同样分帧执行
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param error: TaskError
+        :return: None
+        """
+        invocation = self._invocations.get(invocation_id)
+        if invocation is not None:
+            invocation["error"] = error
+            invocation["results"] = None
+        if self._metrics is not None:
+            self._metrics.incr(task_name, "timeouts" if error.timeout else "errors")
+
+        controller = self._error_listens.get(task_name)
+        if controller is None:
+            logger.error(f"[{task_name}#{invocation_id}]: 任务执行出错, {error}, 可通过on_error监听")
+            return
+
+        for listener in list(controller.listeners):
+            if self._dispatcher is not None:
+                self._dispatcher.post(listener.priority, listener, invocation_id, error)
+                continue
+            try:
+                listener(invocation_id, error)
+            except Exception:
+                logger.exception(f"[{task_name}#{invocation_id}]: 错误回调执行出错")
+
+    def _record_metrics(self, task_name, invocation_id, event, values, meta):
+        """
+        记录事件附带的度量
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param event: 事件类型
+        :param values: 事件携带的结果
+        :param meta: 度量, 开始事件为开始执行的时刻; 结束事件为执行耗时; 结果事件为(回传时刻, 结果大小)
+        :return: None
+        """
+        if event == EVENT_START:
+            self._metrics.incr(task_name, "started")
+            invocation = self._invocations.get(invocation_id)
+            if invocation is not None:
+                self._metrics.observe(task_name, "queue_delay", meta - invocation["enqueued_at"])
+        elif event == EVENT_DONE:
+            self._metrics.incr(task_name, "done")
+            self._metrics.observe(task_name, "exec_time", meta)
+        else:
+            sent_at, size = meta
+            self._metrics.incr(task_name, "results", len(values) if event == EVENT_RESULTS else 1)
+            self._metrics.observe(task_name, "transit", time.time() - sent_at)
+            self._metrics.observe(task_name, "result_size", size)
+
+    def _dispatch(self, task_name, invocation_id, values, latest):
+        """
+        将单个结果分发给单次调用回调及任务回调
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param values: 结果
+        :param latest: 记录各任务最新结果的字典
+        :return: None
+        """
+        if self._dispatcher is not None:
+            self._post(task_name, invocation_id, values, latest)
+            return
+
+        self._current_invocation = invocation_id
+        try:
+            if invocation_id in self._invocation_listens:
+                self._invocation_listens[invocation_id].dispatch(invocation_id, *values)
+            if task_name in self._listen_tasks:
+                self._listen_tasks[task_name].dispatch(invocation_id, *values)
+                latest[task_name] = (invocation_id, values)
+        finally:
+            self._current_invocation = None
+
+    def _post(self, task_name, invocation_id, values, latest):
+        """
+        将单个结果的各监听回调投递给分帧分发器
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param values: 结果
+        :param latest: 记录各任务最新结果的字典
+        :return: None
+        """
+        invocation = self._invocations.get(invocation_id)
+        controllers = [self._invocation_listens.get(invocation_id), self._listen_tasks.get(task_name)]
+        for controller in controllers:
+            if controller is None:
+                continue
+            for listener in controller.listeners:
+                if not listener.latest_only:
+                    self._dispatcher.post(
+                        listener.priority, self._invoke, task_name, invocation_id, listener, values, invocation
+                    )
+        if controllers[1] is not None:
+            latest[task_name] = (invocation_id, values)
+
+    def _post_latest(self, task_name, invocation_id, values):
+        """
+        投递只接收最新结果的监听回调, 已在排队中的只更新其待回调的结果
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param values: 结果
+        :return: None
+        """
+        for listener in self._listen_tasks[task_name].listeners:
+            if not listener.latest_only:
+                continue
+            if listener not in self._latest_pending:
+                self._dispatcher.post(listener.priority, self._invoke_latest, task_name, listener)
+            self._latest_pending[listener] = (invocation_id, values, self._invocations.get(invocation_id))
+
+    def _invoke_latest(self, task_name, listener):
+
+        invocation_id, values, invocation = self._latest_pending.pop(listener)
+        self._invoke(task_name, invocation_id, listener, values, invocation)
+
+    def _invoke(self, task_name, invocation_id, listener, values, invocation=None):
+        """
+        执行单个监听回调
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param listener: 监听
+        :param values: 结果
+        :param invocation: 调用记录, 分帧执行时入队后该调用被取消的不再回调
+        :return: None
+        """
+        if invocation is not None and invocation.get("cancelled"):
+            # 入队后被取消的结果不再回调, 释放其共享内存(可能被多个监听共用, release可重复调用)
+            discard_result(values)
+            return
+
+        t0 = time.perf_counter()
+        self._current_invocation = invocation_id
+        try:
+            listener(invocation_id, *values)
+        finally:
+            self._current_invocation = None
+        if self._metrics is not None:
+            self._metrics.observe(task_name, "callback", time.perf_counter() - t0)
 
     def _validate_task_params(self, task_name, *args, **kwargs):
         """
@@ -172,9 +826,13 @@ class IPCMain:
         :param kwargs: 传递给任务的关键字参数
         :return: bool -> 是否校验成功
         """
-        task = self._task_datasets[task_name]["task"]
-        if isinstance(task, TaskIterator):
-            task = task.taskProto
+        task = self._task_proto(self._task_datasets[task_name]["task"])
+        if isinstance(task, Pipeline):
+            # 流水线的各起始阶段接收相同的参数
+            return all(self._validate_task_params(stage, *args, **kwargs) for stage in task.roots)
+        if isinstance(task, str):
+            # 以路径注册的任务不在渲染进程内导入, 无法校验参数
+            return True
         sig = inspect.signature(task)
         params = sig.parameters
         if len(args) > len(params):
@@ -187,24 +845,114 @@ class IPCMain:
 
         return True
 
-    def _callback_subsequent(self, task_name):
+    @staticmethod
+    def _task_proto(task):
         """
-        任务回调渲染的后续操作, 包括记录日志
+        获取任务函数本体
+        :param task: 任务实体
+        :return: 任务函数
+        """
+        return task.taskProto if isinstance(task, TaskIterator) else task
+
+    def _replay(self, task_name, invocation_id, results):
+        """
+        回放缓存的结果, 与任务管理进程回传的事件走相同的回调流程
         :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param results: 缓存的全部结果
         :return: None
         """
-        task_info = self._task_datasets[task_name]
-        task_obj = task_info["task"]
-        already_cycle = task_info["already"]
-        already_cycle += 1
-        task_info.update({"already": already_cycle})
-        if isinstance(task_obj, TaskIterator):
-            if task_obj.cycles == 0 or already_cycle < task_obj.cycles:
-                logger.debug(f"[{task_name}]: 第 {already_cycle} 次任务结束")
+        messages = [(task_name, invocation_id, EVENT_START, None, None)]
+        messages.extend((task_name, invocation_id, EVENT_RESULT, values, None) for values in results)
+        messages.append((task_name, invocation_id, EVENT_DONE, None, None))
+        if self._channel.batch_interval is not None:
+            self._callback_batch(messages)
+            return
+
+        for message in messages:
+            self._callback(message)
+
+    def _on_manager_failure(self, info):
+        """
+        任务管理进程故障: 运行中的调用全部以失败结束(不写入结果缓存), 随后回调故障监听
+        :param info: 故障信息, 见IPCRenderer.on_failure
+        :return: None
+        """
+        invocations = {}
+        for invocation_id, invocation in list(self._invocations.items()):
+            task_name = invocation["task_name"]
+            invocation["cancelled"] = True
+            invocations[invocation_id] = task_name
+            logger.error(f"[{task_name}#{invocation_id}]: 任务管理进程故障, 本次调用以失败结束!")
+            self._callback_batch([(task_name, invocation_id, EVENT_DONE, None, None)])
+        # 故障前的在途额度随旧的任务管理进程一并作废
+        self._held_credits = 0
+
+        info = dict(info, invocations=invocations)
+        for callback in list(self._failure_listens):
+            callback(info)
+
+    def _reregister(self):
+        """
+        任务管理进程重新拉起后按注册顺序重新注册任务、流水线及其结果投影
+        :return: None
+        """
+        for task_name, dataset in self._task_datasets.items():
+            task = dataset["task"]
+            if isinstance(task, Pipeline):
+                stage_names = {stage: self._wire(stage) for stage in task.stages}
+                self._channel.put(("pipeline", self._wire(task_name), task, stage_names, dataset["options"]))
             else:
-                logger.info(f"[{task_name}]: 对应任务已全部结束")
-        else:
-            logger.info(f"[{task_name}]: 任务已经结束")
+                self._channel.put(("add", self._wire(task_name), task, dataset["options"]))
+            if task_name in self._projections:
+                self._channel.put(("project", self._wire(task_name), self._projections[task_name]))
+        logger.debug("重新注册任务成功, 任务数: %s", len(self._task_datasets))
+
+    def _callback_subsequent(self, task_name, invocation_id, event, values=None):
+        """
+        任务回调渲染的后续操作, 包括记录日志、写入结果缓存, 调用结束时清理该调用的记录与回调
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param event: 事件类型
+        :param values: 结果事件携带的结果
+        :return: None
+        """
+        invocation = self._invocations.get(invocation_id)
+        if invocation is None:
+            return
+
+        dataset = invocation["dataset"]
+        task_obj = dataset["task"]
+        if event == EVENT_START:
+            invocation["state"] = "running"
+            return
+
+        if task_name not in self._first_latency:
+            self._first_latency[task_name] = time.time() - invocation["enqueued_at"]
+            logger.debug("[%s]: 首次调用耗时: %.1fms", task_name, self._first_latency[task_name] * 1000)
+
+        if event == EVENT_DONE:
+            del self._invocations[invocation_id]
+            self._invocation_listens.pop(invocation_id, None)
+            dataset["running"] -= 1
+            if invocation.get("results") and not invocation.get("cancelled"):
+                dataset["cache"].put(invocation["cache_key"], invocation["results"])
+            if isinstance(task_obj, TaskIterator):
+                logger.info("[%s#%s]: 对应任务已全部结束", task_name, invocation_id)
+            else:
+                logger.info("[%s#%s]: 任务已经结束", task_name, invocation_id)
+            return
+
+        results = values if event == EVENT_RESULTS else [values]
+        invocation["already"] += len(results)
+        if invocation.get("results") is not None:
+            if any(isinstance(value, SharedBuffer) for item in results for value in item):
+                invocation["results"] = None
+            else:
+                invocation["results"].extend(results)
+        # 每个结果都会经过, 关闭DEBUG时不产生日志调用
+        if isinstance(task_obj, TaskIterator) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[%s#%s]: 第 %s 次任务结束", task_name, invocation_id, invocation["already"])
 
     @property
     def listen_tasks(self):
@@ -216,16 +964,157 @@ class IPCMain:
 
         self._listen_tasks = newValue
 
-    def __kill_proc(self):
+    @property
+    def invocation_listens(self):
+
+        return self._invocation_listens
+
+    @property
+    def progress_listens(self):
+
+        return self._progress_listens
+
+    @property
+    def error_listens(self):
+
+        return self._error_listens
+
+    @property
+    def failure_listens(self):
+
+        return self._failure_listens
+
+    @property
+    def current_invocation(self):
         """
-        任务管理进程关闭
+        正在回调的结果所属的调用编号, 仅在监听回调内有效
+        :return: int | None
+        """
+        return self._current_invocation
+
+    @property
+    def projections(self):
+
+        return self._projections
+
+    def project(self, task_name, project=None, changes=None):
+        """
+        设置任务结果在任务管理进程内的投影与过滤, 在结果放入结果队列之前执行, 对该任务的所有监听生效; 通常经由IPCRenderer.on设置
+        :param task_name: 任务名称, 可在注册任务前设置
+        :param project: 投影函数, 参数与监听回调相同, 返回值按任务返回值的规则回调, 如对大数组降采样; 也可以是其可导入路径;
+                        需可被pickle, 即模块级函数
+        :param changes: "dedupe": 与同一调用上一次回传的结果相等时不回传; 或函数changes(previous, current),
+                        previous为同一调用上一次的投影结果(首次为None), 返回None时本次不回传, 否则回传其返回值(如只回传增量)
+        :return: bool -> 是否设置成功; project与changes均为None时取消投影
+        """
+        projection = None
+        if project is not None or changes is not None:
+            projection = Projection(project, changes)
+            error = projection.validate()
+            if error is not None:
+                logger.error(f"[{task_name}]: 设置结果投影失败, {error}, 本次设置被忽略!")
+                return False
+
+        if projection is None:
+            self._projections.pop(task_name, None)
+        else:
+            self._projections[task_name] = projection
+        if task_name in self._task_datasets:
+            self._channel.put(("project", self._wire(task_name), projection))
+        logger.debug("[%s]: 下发结果投影成功", task_name)
+        return True
+
+    def queue_depth(self, task_name=None):
+        """
+        调用排队/运行情况
+        :param task_name: 任务名称, 为None时统计所有任务
+        :return: dict -> {"queued": 排队中的调用数, "running": 运行中的调用数}
+        """
+        depth = {"queued": 0, "running": 0}
+        for invocation in self._invocations.values():
+            if task_name is None or invocation["task_name"] == task_name:
+                depth[invocation["state"]] += 1
+
+        return depth
+
+    def dropped(self, task_name=None):
+        """
+        因积压被丢弃的结果数
+        :param task_name: 任务名称, 为None时返回所有任务
+        :return: int | dict -> {任务名称: 丢弃数}
+        """
+        if task_name is not None:
+            return self._dropped.get(task_name, 0)
+
+        return dict(self._dropped)
+
+    def metrics(self, task_name=None):
+        """
+        指标快照, 需在CreateIPC时开启metrics
+        :param task_name: 任务名称, 为None时返回所有任务
+        :return: dict -> {任务名称: {"counters": 计数, "queue": 排队/运行中的调用数,
+                          "queue_delay"/"exec_time"/"result_size"/"transit"/"callback": 分布摘要}}, 分布的含义见Metrics
+        """
+        if self._metrics is None:
+            logger.warning("未开启指标统计, 请在CreateIPC时传入metrics=True!")
+            return {}
+
+        snapshot = self._metrics.snapshot(task_name)
+        for name, task_metrics in snapshot.items():
+            task_metrics["queue"] = self.queue_depth(name)
+
+        return snapshot
+
+    def reset_metrics(self):
+        """
+        清空指标
         :return: None
         """
-        if self._proc is None:
-            return
+        if self._metrics is not None:
+            self._metrics.reset()
 
-        process = psutil.Process(self._proc.pid)
-        for child in process.children(recursive=True):
-            child.kill()
+    @property
+    def metrics_snapshot(self):
+        """
+        定时发出指标快照的信号, 需在CreateIPC时传入metrics_interval
+        :return: pyqtBoundSignal | None
+        """
+        if self._metrics_reporter is None:
+            return None
+
+        return self._metrics_reporter.snapshot
+
+    def backlog(self):
+        """
+        回调积压统计, 需在CreateIPC时传入frame_budget
+        :return: dict -> 各项含义见FrameDispatcher.backlog
+        """
+        if self._dispatcher is None:
+            logger.warning("未开启分帧回调, 请在CreateIPC时传入frame_budget!")
+            return {}
+
+        return self._dispatcher.backlog()
+
+    def is_running(self, invocation_id):
+        """
+        调用是否仍在运行
+        :param invocation_id: 调用编号
+        :return: bool
+        """
+        return invocation_id in self._invocations
 
-        process.kill()
+    @property
+    def channel(self):
+        """
+        本对象使用的任务管理进程及其队列, 可传给CreateIPC的share参数以共享同一任务管理进程
+        :return: Channel
+        """
+        return self._channel
+
+    def _wire(self, task_name):
+        """
+        任务在任务管理进程内的名称, 共享任务管理进程的后加入者带上其归属编号, 避免与其它IPCMain的同名任务冲突
+        :param task_name: 任务名称
+        :return: str | tuple
+        """
+        return task_name if self._owner_id is None else (self._owner_id, task_name)
@@ -0,0 +1,243 @@
+import sys
+import math
+
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer
+
+from .shm import SharedResult
+
+
+__all__ = [
+    "Histogram",
+    "Metrics",
+    "MetricsReporter",
+    "result_size"
+]
+
+# 估算容器大小时最多逐个估算的元素数, 其余按已估算元素的平均大小推算
+_SAMPLE = 32
+# 估算嵌套容器的最大深度, 更深的取其自身占用的内存
+_MAX_DEPTH = 4
+# 数值、布尔值及None的估算大小, 单位: 字节
+_SCALAR = 8
+
+# 每个2倍区间划分的桶数, 分位数估算的相对误差不超过2 ** (1 / 4) - 1 ≈ 19%
+_BUCKETS_PER_OCTAVE = 4
+
+class Histogram:
+    """
+    对数分桶直方图, 以固定内存统计任意数量的样本; 分位数按所在桶的上界估算
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        """
+        记录一个样本
+        :param value: 样本值, 不小于0
+        :return: None
+        """
+        value = max(value, 0)
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value == 0:
+            self._zeros += 1
+            return
+
+        index = math.floor(math.log2(value) * _BUCKETS_PER_OCTAVE)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def percentile(self, pct):
+        """
+        估算分位数
+        :param pct: 百分位, 0~100
+        :return: float | None -> 无样本时为None
+        """
+        if not self.count:
+            return None
+
+        rank = pct / 100 * self.count
+        seen = self._zeros
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(2 ** ((index + 1) / _BUCKETS_PER_OCTAVE), self.max)
+
+        return self.max
+
+    def snapshot(self):
+        """
+        统计摘要
+        :return: dict
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99)
+        }
+
+class Metrics:
+    """
+    各任务的计数与耗时/大小分布, 在渲染进程内汇总
+    counters: started/results/done/cache_hits/dropped/errors/timeouts
+    histograms: queue_delay: 启动到开始执行的耗时(含任务队列传递与调度排队), 单位: s;
+                exec_time: 任务管理进程内单次调用的执行耗时, 单位: s;
+                result_size: 单个结果事件的大小估算, 单位: 字节;
+                transit: 结果从回传到渲染进程开始回调的耗时(含结果队列传递与信号投递), 单位: s;
+                callback: 渲染进程内单个结果事件的监听回调耗时, 开启frame_budget时为单个监听回调的耗时, 单位: s
+    """
+    COUNTERS = ("started", "results", "done", "cache_hits", "dropped", "errors", "timeouts")
+    HISTOGRAMS = ("queue_delay", "exec_time", "result_size", "transit", "callback")
+
+    def __init__(self):
+        self._tasks = {}
+
+    def incr(self, task_name, counter, n=1):
+        """
+        累加计数
+        :param task_name: 任务名称
+        :param counter: 计数名称
+        :param n: 增量
+        :return: None
+        """
+        self._task(task_name)["counters"][counter] += n
+
+    def observe(self, task_name, histogram, value):
+        """
+        记录分布样本
+        :param task_name: 任务名称
+        :param histogram: 直方图名称
+        :param value: 样本值
+        :return: None
+        """
+        self._task(task_name)["histograms"][histogram].observe(value)
+
+    def snapshot(self, task_name=None):
+        """
+        指标快照
+        :param task_name: 任务名称, 为None时返回所有任务
+        :return: dict -> {任务名称: {"counters": {...}, 直方图名称: {count, mean, min, max, p50, p95, p99}, ...}}
+        """
+        names = [task_name] if task_name is not None else list(self._tasks)
+        snapshot = {}
+        for name in names:
+            task = self._task(name)
+            snapshot[name] = {"counters": dict(task["counters"])}
+            for key, histogram in task["histograms"].items():
+                snapshot[name][key] = histogram.snapshot()
+
+        return snapshot
+
+    def reset(self):
+        """
+        清空所有指标
+        :return: None
+        """
+        self._tasks.clear()
+
+    def _task(self, task_name):
+
+        task = self._tasks.get(task_name)
+        if task is None:
+            task = self._tasks[task_name] = {
+                "counters": dict.fromkeys(self.COUNTERS, 0),
+                "histograms": {key: Histogram() for key in self.HISTOGRAMS}
+            }
+
+        return task
+
+class MetricsReporter(QObject):
+    """
+    定时发出指标快照
+    """
+    snapshot = pyqtSignal(dict)
+
+    def __init__(self, source, interval):
+        """
+        :param source: 返回快照的可调用对象
+        :param interval: 发出间隔, 单位: ms
+        """
+        super(MetricsReporter, self).__init__()
+        self._source = source
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._emit)
+        self._timer.start(interval)
+
+    def stop(self):
+
+        self._timer.stop()
+
+    def _emit(self):
+
+        self.snapshot.emit(self._source())
+
+def _sizeof(value, depth=0):
+    """
+    估算单个值的传递大小, 不做序列化: bytes类对象、ndarray及共享内存句柄取其字节数, 字符串取其编码后的长度,
+    容器按元素估算(元素较多时抽样推算), 其余取其自身占用的内存
+    :param value: 结果值
+    :param depth: 当前嵌套深度
+    :return: int
+    """
+    if isinstance(value, SharedResult):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value) if value.isascii() else len(value.encode("utf-8", "surrogatepass"))
+    if value is None or isinstance(value, (int, float)):
+        return _SCALAR
+    if type(value).__name__ == "ndarray" and type(value).__module__ == "numpy":
+        return value.nbytes
+    if depth < _MAX_DEPTH:
+        if isinstance(value, dict):
+            return _sizeof_items(value.items(), len(value), depth, pair=True)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return _sizeof_items(value, len(value), depth)
+
+    return sys.getsizeof(value)
+
+def _sizeof_items(items, n, depth, pair=False):
+    """
+    估算容器内元素的总大小, 只估算前_SAMPLE个元素, 其余按平均大小推算
+    :param items: 元素迭代器
+    :param n: 元素总数
+    :param depth: 容器的嵌套深度
+    :param pair: 元素是否为(键, 值)
+    :return: int
+    """
+    total = 0
+    sampled = 0
+    for item in items:
+        if sampled >= _SAMPLE:
+            break
+        if pair:
+            total += _sizeof(item[0], depth + 1) + _sizeof(item[1], depth + 1)
+        else:
+            total += _sizeof(item, depth + 1)
+        sampled += 1
+
+    return total if sampled >= n else total * n // sampled
+
+def result_size(results):
+    """
+    估算一个结果事件的大小
+    :param results: 结果列表, 每个结果为一个元组
+    :return: int -> 单位: 字节
+    """
+    return sum(_sizeof(value) for values in results for value in values)
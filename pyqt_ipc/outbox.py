@@ -0,0 +1,177 @@
+from threading import Thread, Condition
+from collections import deque
+
+from .shm import discard_result
+
+
+__all__ = [
+    "Outbox",
+    "OVERFLOWS",
+    "EVENT_DROPPED"
+]
+
+# block: 阻塞产出结果的任务; drop_oldest: 丢弃最早的未发送结果; drop_newest: 丢弃新产出的结果; latest: 只保留最新的一个结果
+OVERFLOWS = ("block", "drop_oldest", "drop_newest", "latest")
+
+# 丢弃事件, 携带{调用编号: 丢弃的结果数}, 在该任务下一个事件之前发送
+EVENT_DROPPED = "dropped"
+
+# 阻塞等待时检查取消令牌的间隔, 单位: s
+_BLOCK_POLL = 0.05
+
+class _Box:
+    """
+    单个任务的待发送事件
+    """
+
+    def __init__(self, limit, overflow):
+        self.limit = limit
+        self.overflow = overflow
+        self.messages = deque()
+        self.results = 0
+        self.dropped = {}
+        self.ready = False
+
+    @property
+    def full(self):
+
+        limit = 1 if self.overflow == "latest" else self.limit
+        return self.results >= limit
+
+    def drop(self, message):
+        """
+        丢弃一个结果事件, 释放其中的共享内存并计数
+        :param message: 结果事件
+        :return: None
+        """
+        _, invocation_id, _, values, _ = message
+        items = values if isinstance(values, list) else [values]
+        for item in items:
+            discard_result(item)
+        self.dropped[invocation_id] = self.dropped.get(invocation_id, 0) + len(items)
+
+    def drop_oldest(self):
+        """
+        丢弃最早的结果事件, 开始/结束事件保留
+        :return: None
+        """
+        for index, (message, droppable) in enumerate(self.messages):
+            if droppable:
+                del self.messages[index]
+                self.results -= 1
+                self.drop(message)
+                return
+
+class Outbox:
+    """
+    任务管理进程内的结果发件箱: 各任务的事件先进入各自的有界缓冲, 由发送线程按任务轮转转发至结果队列;
+    结果队列与渲染进程内未处理的结果事件总数受信用额度限制, 额度耗尽时发送线程等待, 任务缓冲满时按任务的溢出策略处理;
+    开始/结束事件不计入缓冲上限, 也不会被丢弃
+    """
+
+    def __init__(self, result_q, credits, limit):
+        """
+        :param result_q: 结果队列
+        :param credits: 跨进程信号量, 渲染进程处理完一个结果事件后释放一个额度
+        :param limit: 任务缓冲的默认上限(结果事件数)
+        """
+        self._result_q = result_q
+        self._credits = credits
+        self._limit = limit
+        self._boxes = {}
+        self._ready = deque()
+        self._cond = Condition()
+        t = Thread(target=self._send_loop)
+        t.daemon = True
+        t.start()
+
+    def register(self, task_name, limit=None, overflow="block"):
+        """
+        设置任务的缓冲上限与溢出策略, 已缓冲的事件保留
+        :param task_name: 任务名称
+        :param limit: 缓冲上限(结果事件数), 为None时使用默认上限
+        :param overflow: 溢出策略, 见OVERFLOWS
+        :return: None
+        """
+        with self._cond:
+            box = self._boxes.get(task_name)
+            if box is None:
+                self._boxes[task_name] = _Box(limit or self._limit, overflow)
+                return
+            box.limit = limit or self._limit
+            box.overflow = overflow
+            self._cond.notify_all()
+
+    def put(self, message, droppable=False, token=None):
+        """
+        投递事件
+        :param message: (任务名称, 调用编号, 事件类型, 结果, 度量)
+        :param droppable: 是否为结果事件, 结果事件受缓冲上限与溢出策略约束
+        :param token: 产出该结果的调用的取消令牌, 阻塞等待期间被取消时丢弃该结果
+        :return: None
+        """
+        with self._cond:
+            box = self._boxes.get(message[0])
+            if box is None:
+                # 未注册的任务(如注册失败)也需回传其错误/结束事件
+                box = self._boxes[message[0]] = _Box(self._limit, "block")
+            if droppable and box.full:
+                if box.overflow == "block":
+                    while box.full and box.overflow == "block":
+                        if token is not None and token.cancelled:
+                            box.drop(message)
+                            return
+                        self._cond.wait(_BLOCK_POLL)
+                elif box.overflow == "drop_newest":
+                    box.drop(message)
+                    return
+                while box.full:
+                    box.drop_oldest()
+
+            if not box.ready:
+                box.ready = True
+                self._ready.append(message[0])
+            box.messages.append((message, droppable))
+            box.results += droppable
+            self._cond.notify_all()
+
+    def has_room(self, task_name):
+        """
+        任务缓冲是否可以无阻塞地投递一个结果事件
+        :param task_name: 任务名称
+        :return: bool
+        """
+        with self._cond:
+            box = self._boxes[task_name]
+            return box.overflow != "block" or not box.full
+
+    def _send_loop(self):
+        """
+        发送线程: 取得额度后按任务轮转取出一个事件发送, 开始/结束事件发送后归还额度
+        :return: None
+        """
+        while True:
+            self._credits.acquire()
+            with self._cond:
+                while True:
+                    while not self._ready:
+                        self._cond.wait()
+                    task_name = self._ready.popleft()
+                    box = self._boxes[task_name]
+                    if box.messages:
+                        break
+                    box.ready = False
+                message, droppable = box.messages.popleft()
+                box.results -= droppable
+                if box.messages:
+                    self._ready.append(task_name)
+                else:
+                    box.ready = False
+                dropped, box.dropped = box.dropped, {}
+                self._cond.notify_all()
+
+            if dropped:
+                self._result_q.put((task_name, None, EVENT_DROPPED, dropped, None))
+            self._result_q.put(message)
+            if not droppable:
+                self._credits.release()
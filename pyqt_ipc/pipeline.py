@@ -0,0 +1,93 @@
+__all__ = [
+    "Pipeline"
+]
+
+class Pipeline:
+    """
+    由已注册任务组成的流水线(有向无环图), 各阶段以任务名称声明:
+    列表表示线性流水线, 前一阶段的返回值作为后一阶段的唯一位置参数;
+    字典表示依赖图, {阶段: [依赖的阶段, ...]}, 依赖的各阶段返回值按声明顺序作为该阶段的位置参数;
+    无依赖的阶段接收启动时传入的参数, 且只能有一个没有下游的阶段, 其返回值即流水线的结果
+    """
+
+    def __init__(self, stages):
+        """
+        :param stages: 阶段列表或依赖字典
+        """
+        if isinstance(stages, (list, tuple)):
+            if not stages:
+                raise ValueError("流水线至少需要一个阶段")
+            if len(set(stages)) != len(stages):
+                raise ValueError("线性流水线的阶段不能重复, 请改用依赖字典声明")
+            graph = {stage: (prev,) for prev, stage in zip(stages, stages[1:])}
+            graph[stages[0]] = ()
+        elif isinstance(stages, dict) and stages:
+            graph = {stage: tuple(deps or ()) for stage, deps in stages.items()}
+        else:
+            raise ValueError("流水线的阶段必须为非空的列表或依赖字典")
+
+        for stage, deps in graph.items():
+            for dep in deps:
+                if dep not in graph:
+                    raise ValueError(f"阶段{stage}依赖的{dep}未在流水线中声明")
+
+        self._deps = graph
+        self._order = _topological_order(graph)
+        sinks = set(graph) - {dep for deps in graph.values() for dep in deps}
+        if len(sinks) != 1:
+            raise ValueError(f"流水线必须有且只有一个没有下游的阶段, 当前为: {', '.join(map(str, sinks))}")
+        self._sink = sinks.pop()
+
+    @property
+    def stages(self):
+        """
+        按拓扑顺序排列的全部阶段
+        :return: tuple
+        """
+        return self._order
+
+    @property
+    def roots(self):
+        """
+        无依赖的阶段, 接收启动时传入的参数
+        :return: tuple
+        """
+        return tuple(stage for stage in self._order if not self._deps[stage])
+
+    @property
+    def sink(self):
+
+        return self._sink
+
+    def deps(self, stage):
+        """
+        阶段依赖的上游阶段
+        :param stage: 阶段
+        :return: tuple
+        """
+        return self._deps[stage]
+
+def _topological_order(graph):
+    """
+    依赖图的拓扑排序, 存在环时报错
+    :param graph: {阶段: (依赖的阶段, ...)}
+    :return: tuple
+    """
+    order = []
+    state = {}
+
+    def visit(stage, path):
+        if state.get(stage) == "done":
+            return
+        if state.get(stage) == "visiting":
+            raise ValueError(f"流水线存在循环依赖: {' -> '.join(map(str, path + [stage]))}")
+        state[stage] = "visiting"
+        for dep in graph[stage]:
+            visit(dep, path + [stage])
+        state[stage] = "done"
+        order.append(stage)
+
+    for stage in graph:
+        visit(stage, [])
+
+    return tuple(order)
@@ -0,0 +1,505 @@
+import os
+import itertools
+from collections import deque
+from threading import Thread, Event, Lock, Timer
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process, Pipe, RawValue, get_start_method
+from multiprocessing.connection import wait
+from multiprocessing.reduction import ForkingPickler
+
+from .logger import logger, log_directly
+from .cancel import SharedCancelToken, bind_token
+from .shm import share_result, discard_result, attach_args
+from .stream import is_stream, iter_stream
+from .warmup import warm_up
+from .ref import resolve
+from .exception import TaskException, CancelledException
+from .error import TaskError
+
+
+__all__ = [
+    "WorkerPool"
+]
+
+_OK = 0
+_ERROR = 1
+_CANCELLED = 2
+_YIELD = 3
+_STREAMED = 4
+_READY = 5
+
+def _send(result_conn, message):
+    """
+    回传消息, 结果无法序列化时改为回传错误
+    :param result_conn: 回传结果的管道
+    :param message: (任务编号, 状态, 结果)
+    :return: bool -> 原消息是否回传成功
+    """
+    try:
+        result_conn.send(message)
+    except Exception as e:
+        discard_result(message[2])
+        result_conn.send((message[0], _ERROR, TaskError(type(e).__name__, f"结果无法序列化, {e}")))
+        return False
+
+    return True
+
+def _stream(result_conn, job_id, stream, cancel_value, shm_threshold):
+    """
+    逐个回传生成器产出的结果
+    :param result_conn: 回传结果的管道
+    :param job_id: 任务编号
+    :param stream: 生成器或异步生成器
+    :param cancel_value: 共享内存中被取消的任务编号
+    :param shm_threshold: 结果使用共享内存传递的字节数阈值
+    :return: tuple | None -> 结束消息, 已因结果无法序列化而结束时为None
+    """
+    items = iter_stream(stream)
+    try:
+        for item in items:
+            if cancel_value.value == job_id:
+                return job_id, _CANCELLED, None
+            if not _send(result_conn, (job_id, _YIELD, share_result(item, shm_threshold))):
+                return None
+    finally:
+        items.close()
+
+    return job_id, _STREAMED, None
+
+def _worker_main(conn, result_conn, cancel_value, parent_pid, shm_threshold, warm=None):
+    """
+    工作进程入口, 预热完成后通知就绪, 循环接收任务并回传结果; 父进程(任务管理进程)退出后自行结束
+    :param conn: 接收任务的管道
+    :param result_conn: 回传结果的管道
+    :param cancel_value: 共享内存中被取消的任务编号
+    :param parent_pid: 任务管理进程pid
+    :param shm_threshold: 结果使用共享内存传递的字节数阈值
+    :param warm: 预热参数(preload, initializer, initargs), 为None时不预热
+    :return: None
+    """
+    log_directly()
+    if warm is not None:
+        warm_up(*warm)
+    result_conn.send((0, _READY, None))
+
+    while True:
+        if not conn.poll(1):
+            if os.getppid() != parent_pid:
+                return
+            continue
+
+        job = conn.recv()
+        if job is None:
+            return
+
+        job_id, func, args, kwargs = job
+        bind_token(SharedCancelToken(cancel_value, job_id))
+        try:
+            if isinstance(func, str):
+                func = resolve(func)
+            # 参数中的共享内存句柄在此映射, 任务函数直接读取同一块共享内存(不拷贝); 名称由任务管理进程在调用结束时释放
+            args, kwargs = attach_args(args, kwargs, unlink=False)
+            result = func(*args, **kwargs)
+            if is_stream(result):
+                message = _stream(result_conn, job_id, result, cancel_value, shm_threshold)
+            elif cancel_value.value == job_id:
+                message = (job_id, _CANCELLED, None)
+            else:
+                message = (job_id, _OK, share_result(result, shm_threshold))
+        except CancelledException:
+            message = (job_id, _CANCELLED, None)
+        except Exception as e:
+            message = (job_id, _ERROR, TaskError.from_exception(e))
+        bind_token(None)
+
+        if message is not None:
+            _send(result_conn, message)
+        # 释放本次执行的参数及返回值, 参数映射的共享内存随之关闭
+        job = args = kwargs = result = message = None
+
+class Job:
+    """
+    提交至进程池的单次执行
+    """
+
+    def __init__(self, job_id, func, args, kwargs, on_yield=None):
+        self.job_id = job_id
+        self.payload = (job_id, func, args, kwargs)
+        self.data = None
+        self.worker = None
+        self._on_yield = on_yield
+        self._done = Event()
+        self._status = _OK
+        self._result = None
+        self._callbacks = []
+        self._inbox = deque()
+        self._delivering = False
+        self._lock = Lock()
+
+    def set_result(self, status, result):
+
+        with self._lock:
+            self._status = status
+            self._result = result
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            callback(self)
+
+    def put_yield(self, result):
+        """
+        任务函数为生成器时, 接收其产出的单个结果
+        :param result: 产出的结果
+        :return: None
+        """
+        if self._on_yield is None:
+            discard_result(result)
+            return
+
+        self._on_yield(result)
+
+    def post(self, status, result):
+        """
+        收到工作进程回传的结果, 先入队再由交付线程按到达顺序处理
+        :param status: 状态
+        :param result: 结果
+        :return: bool -> 是否需要安排交付线程处理
+        """
+        with self._lock:
+            self._inbox.append((status, result))
+            if self._delivering:
+                return False
+            self._delivering = True
+            return True
+
+    def deliver(self):
+        """
+        交付线程: 按到达顺序处理已入队的结果, 生成器产出的结果回调on_yield, 最终结果写入并执行结束回调
+        :return: None
+        """
+        while True:
+            with self._lock:
+                if not self._inbox:
+                    self._delivering = False
+                    return
+                status, result = self._inbox.popleft()
+            if status == _YIELD:
+                self.put_yield(result)
+            else:
+                self.set_result(status, result)
+
+    def add_done_callback(self, callback):
+        """
+        添加执行结束后的回调, 已结束时立即回调
+        :param callback: 回调函数, 参数为该Job
+        :return: None
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback(self)
+
+    def result(self, timeout=None):
+        """
+        等待并获取执行结果
+        :param timeout: 最长等待时间, 单位: s
+        :return: 任务返回值
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError
+        if self._status == _ERROR:
+            raise TaskException(self._result, self._result)
+        if self._status == _CANCELLED:
+            raise CancelledException("任务已被取消")
+
+        return self._result
+
+    @property
+    def streamed(self):
+        """
+        结果是否已由生成器逐个产出, 为True时result()返回None
+        :return: bool
+        """
+        return self._status == _STREAMED
+
+class _Worker:
+    """
+    工作进程及其通信管道
+    """
+
+    def __init__(self, parent_pid, shm_threshold, warm=None):
+        self.conn, worker_conn = Pipe()
+        self.result_conn, worker_result_conn = Pipe(duplex=False)
+        self.cancel_value = RawValue("q", 0)
+        self.job = None
+        self.proc = Process(
+            target=_worker_main,
+            args=(worker_conn, worker_result_conn, self.cancel_value, parent_pid, shm_threshold, warm)
+        )
+        self.proc.daemon = True
+        self.proc.start()
+        worker_conn.close()
+        worker_result_conn.close()
+
+    def close(self):
+
+        self.conn.close()
+        self.result_conn.close()
+
+class WorkerPool:
+    """
+    任务管理进程内的工作进程池, 用于执行CPU密集型任务
+    每个工作进程独占一对管道, 空闲时才会被派发任务, 未能派发的任务在池内排队;
+    工作进程被强制结束或异常退出时将被重新拉起
+    """
+
+    def __init__(self, size=None, shm_threshold=None, warm=None):
+        """
+        :param size: 工作进程数, 默认为CPU核数
+        :param shm_threshold: 结果使用共享内存传递的字节数阈值
+        :param warm: 预热参数(preload, initializer, initargs); fork方式启动的工作进程直接继承任务管理进程的预热状态, 不再重复预热
+        """
+        self._size = size or os.cpu_count() or 1
+        self._shm_threshold = shm_threshold
+        self._warm = None if get_start_method() == "fork" else warm
+        self._ready = 0
+        self._all_ready = Event()
+        self._workers = []
+        self._idle = deque()
+        self._pending = deque()
+        self._ids = itertools.count(1)
+        self._lock = Lock()
+        self._wakeup_r, self._wakeup_w = Pipe(duplex=False)
+        # on_yield及结束回调可能阻塞(如结果缓冲满时的block策略、结果投影), 不在结果收集线程中执行;
+        # 同一任务的结果依次交付, 不同任务之间互不阻塞
+        self._delivery = ThreadPoolExecutor(thread_name_prefix="pyqt-ipc-pool")
+
+        for _ in range(self._size):
+            worker = self._spawn()
+            self._workers.append(worker)
+            self._idle.append(worker)
+
+        collector = Thread(target=self._collect)
+        collector.daemon = True
+        collector.start()
+        logger.debug("工作进程池已启动, 进程数: %s", self._size)
+
+    def submit(self, func, args, kwargs, on_yield=None):
+        """
+        提交任务
+        :param func: 任务函数, 需可被pickle; 也可以是任务函数的可导入路径, 由工作进程解析
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :param on_yield: 任务函数为生成器时, 每产出一个结果的回调(在交付线程中执行)
+        :return: Job
+        """
+        job = Job(next(self._ids), func, args, kwargs, on_yield)
+        # 在锁外序列化, 无法序列化时只有本次执行失败, 不占用工作进程
+        try:
+            job.data = ForkingPickler.dumps(job.payload)
+        except Exception as e:
+            job.set_result(_ERROR, TaskError.from_exception(e))
+            return job
+
+        with self._lock:
+            if self._idle:
+                self._dispatch(self._idle.popleft(), job)
+            else:
+                self._pending.append(job)
+
+        return job
+
+    def cancel(self, job, kill_timeout=None):
+        """
+        取消任务; 排队中的任务直接取消, 执行中的任务通知其取消令牌
+        :param job: Job
+        :param kill_timeout: 超过该时间仍未结束则强制结束其工作进程, 为None时不强制结束, 单位: s
+        :return: None
+        """
+        with self._lock:
+            if job in self._pending:
+                self._pending.remove(job)
+                job.set_result(_CANCELLED, None)
+                return
+
+            if job.worker is None:
+                return
+            job.worker.cancel_value.value = job.job_id
+
+        if kill_timeout is not None:
+            timer = Timer(kill_timeout, self._kill, args=(job,))
+            timer.daemon = True
+            timer.start()
+
+    def wait_ready(self, timeout=None):
+        """
+        等待首批工作进程全部就绪
+        :param timeout: 最长等待时间, 为None时一直等待, 单位: s
+        :return: bool -> 是否全部就绪
+        """
+        return self._all_ready.wait(timeout)
+
+    def shutdown(self):
+        """
+        关闭所有工作进程
+        :return: None
+        """
+        for worker in self._workers:
+            worker.conn.send(None)
+        self._delivery.shutdown(wait=False)
+
+    @property
+    def size(self):
+
+        return self._size
+
+    def _spawn(self):
+        """
+        拉起一个工作进程
+        :return: _Worker
+        """
+        return _Worker(os.getpid(), self._shm_threshold, self._warm)
+
+    def _dispatch(self, worker, job):
+        """
+        派发任务到指定工作进程, 调用方需持有锁
+        :param worker: _Worker
+        :param job: Job
+        :return: None
+        """
+        worker.job = job
+        job.worker = worker
+        data, job.data = job.data, None
+        try:
+            worker.conn.send_bytes(data)
+        except OSError:
+            # 工作进程已退出, 由_on_worker_exit拉起新进程并将该任务标记为失败
+            pass
+
+    def _deliver(self, job, status, result):
+        """
+        将结果交由交付线程处理, 保证同一任务先交付已产出的结果再交付最终结果
+        :param job: Job
+        :param status: 状态
+        :param result: 结果
+        :return: None
+        """
+        if job.post(status, result):
+            self._delivery.submit(job.deliver)
+
+    def _release(self, worker):
+        """
+        工作进程空闲后派发排队中的任务, 调用方需持有锁
+        :param worker: _Worker
+        :return: None
+        """
+        worker.job = None
+        if self._pending:
+            self._dispatch(worker, self._pending.popleft())
+        else:
+            self._idle.append(worker)
+
+    def _replace(self, worker):
+        """
+        结束并替换工作进程, 调用方需持有锁
+        :param worker: _Worker
+        :return: Job | None -> 该工作进程上执行中的任务
+        """
+        job = worker.job
+        worker.proc.kill()
+        worker.proc.join()
+        worker.close()
+        new_worker = self._spawn()
+        self._workers[self._workers.index(worker)] = new_worker
+        if job is not None:
+            job.worker = None
+        self._release(new_worker)
+        self._wakeup_w.send(None)
+        return job
+
+    def _kill(self, job):
+        """
+        强制结束仍在执行指定任务的工作进程
+        :param job: Job
+        :return: None
+        """
+        with self._lock:
+            if job.worker is None or job.worker.job is not job:
+                return
+            self._replace(job.worker)
+
+        self._deliver(job, _CANCELLED, None)
+        logger.warning(f"[job-{job.job_id}]: 任务超时未响应取消, 已强制结束其工作进程")
+
+    def _collect(self):
+        """
+        收集工作进程的执行结果, 并处理工作进程的异常退出
+        :return: None
+        """
+        while True:
+            with self._lock:
+                readers = {worker.result_conn: worker for worker in self._workers}
+                sentinels = {worker.proc.sentinel: worker for worker in self._workers}
+
+            ready = wait([self._wakeup_r, *readers, *sentinels])
+            if self._wakeup_r in ready:
+                self._wakeup_r.recv()
+
+            for conn in ready:
+                if conn in readers:
+                    try:
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        continue
+                    self._finish(readers[conn], message)
+
+            for sentinel in ready:
+                if sentinel in sentinels:
+                    self._on_worker_exit(sentinels[sentinel])
+
+    def _finish(self, worker, message):
+        """
+        处理执行结果
+        :param worker: _Worker
+        :param message: (任务编号, 状态, 结果)
+        :return: None
+        """
+        job_id, status, result = message
+        if status == _READY:
+            self._ready += 1
+            if self._ready >= self._size:
+                self._all_ready.set()
+            return
+
+        with self._lock:
+            job = worker.job
+            if worker not in self._workers or job is None or job.job_id != job_id:
+                job = None
+            elif status != _YIELD:
+                job.worker = None
+                self._release(worker)
+
+        if job is None:
+            discard_result(result)
+        else:
+            self._deliver(job, status, result)
+
+    def _on_worker_exit(self, worker):
+        """
+        工作进程异常退出时拉起新进程, 并将其执行中的任务标记为失败
+        :param worker: _Worker
+        :return: None
+        """
+        with self._lock:
+            if worker not in self._workers:
+                return
+            worker.proc.join()
+            exitcode = worker.proc.exitcode
+            job = self._replace(worker)
+
+        logger.error(f"工作进程异常退出, 退出码: {exitcode}, 已重新拉起")
+        if job is not None:
+            self._deliver(job, _ERROR, TaskError("WorkerExit", f"工作进程异常退出, 退出码: {exitcode}"))
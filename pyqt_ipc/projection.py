@@ -0,0 +1,122 @@
+import sys
+import pickle
+from threading import Lock
+
+from .ref import resolve
+from .shm import SharedResult, share_result, attach_args
+
+
+__all__ = [
+    "Projection",
+    "CHANGES"
+]
+
+# dedupe: 与同一调用上一次回传的结果相等时不回传
+CHANGES = ("dedupe",)
+
+class Projection:
+    """
+    任务结果在任务管理进程内的投影与过滤, 在结果放入结果队列之前执行, 只有监听实际需要的数据被序列化传递
+    project将任务的返回值映射为新的返回值(如对大数组降采样); changes按同一调用的上一次投影结果决定本次回传的内容(如只回传变化)
+    """
+
+    def __init__(self, project=None, changes=None):
+        """
+        :param project: 投影函数, 参数与监听回调相同, 返回值按任务返回值的规则回调; 也可以是其可导入路径
+        :param changes: "dedupe"或函数changes(previous, current), previous为同一调用上一次的投影结果(首次为None),
+                        返回None时本次不回传, 否则回传其返回值(如只回传增量)
+        """
+        self.project = project
+        self.changes = changes
+        self._previous = {}
+        self._lock = Lock()
+
+    def __eq__(self, other):
+
+        return isinstance(other, Projection) and (self.project, self.changes) == (other.project, other.changes)
+
+    def __getstate__(self):
+
+        return {"project": self.project, "changes": self.changes}
+
+    def __setstate__(self, state):
+
+        self.__init__(state["project"], state["changes"])
+
+    def validate(self):
+        """
+        渲染端校验投影可被传递至任务管理进程
+        :return: str | None -> 不合法的原因
+        """
+        if self.project is not None and not (isinstance(self.project, str) or callable(self.project)):
+            return "project参数必须为可调用的或其可导入路径"
+        if self.changes is not None and self.changes not in CHANGES and not callable(self.changes):
+            return f"changes参数必须为{'/'.join(CHANGES)}或可调用的"
+        try:
+            pickle.dumps(self)
+        except Exception as e:
+            return f"投影函数无法跨进程传递({type(e).__name__}), 请改用模块级函数或可导入路径"
+
+        return None
+
+    def apply(self, invocation_id, values, threshold=None):
+        """
+        任务管理进程: 对一次结果执行投影与过滤
+        :param invocation_id: 调用编号
+        :param values: 结果事件携带的结果(元组), 可能含有共享内存句柄
+        :param threshold: 共享内存阈值, 投影后的结果按该阈值重新放入共享内存
+        :return: tuple | None -> 处理后的结果, 为None时本次不回传
+        """
+        if self.project is None and self.changes is None:
+            return values
+
+        if any(isinstance(value, SharedResult) for value in values):
+            values = attach_args(values, {})[0]
+
+        if self.project is not None:
+            project = resolve(self.project) if isinstance(self.project, str) else self.project
+            result = project(*values)
+            values = result if isinstance(result, tuple) else (result,)
+
+        if self.changes is not None:
+            with self._lock:
+                previous = self._previous.get(invocation_id)
+                self._previous[invocation_id] = values
+            if self.changes == "dedupe":
+                if previous is not None and _same(previous, values):
+                    return None
+            else:
+                result = self.changes(None if previous is None else _unpack(previous), _unpack(values))
+                if result is None:
+                    return None
+                values = result if isinstance(result, tuple) else (result,)
+
+        return share_result(values, threshold)
+
+    def forget(self, invocation_id):
+        """
+        调用结束, 丢弃其上一次的投影结果
+        :param invocation_id: 调用编号
+        :return: None
+        """
+        with self._lock:
+            self._previous.pop(invocation_id, None)
+
+def _unpack(values):
+
+    return values[0] if len(values) == 1 else values
+
+def _same(a, b):
+    """
+    比较两次结果是否相等, 支持含ndarray的元组/列表
+    :return: bool
+    """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and (isinstance(a, numpy.ndarray) or isinstance(b, numpy.ndarray)):
+        return numpy.array_equal(a, b)
+    if isinstance(a, (tuple, list)) and isinstance(b, (tuple, list)):
+        return type(a) is type(b) and len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    try:
+        return bool(a == b)
+    except (ValueError, TypeError):
+        return False
@@ -0,0 +1,30 @@
+import importlib
+from functools import lru_cache
+
+
+__all__ = [
+    "resolve"
+]
+
+@lru_cache(maxsize=None)
+def resolve(path):
+    """
+    按可导入路径解析任务函数, 每个进程内只解析一次
+    :param path: "包.模块:属性.属性"或"包.模块.函数", 属性链可指向模块级对象的方法
+    :return: 任务函数
+    """
+    if ":" in path:
+        module_name, qualname = path.split(":", 1)
+    else:
+        module_name, _, qualname = path.rpartition(".")
+    if not module_name or not qualname:
+        raise ImportError(f"无效的任务路径: {path}")
+
+    target = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        target = getattr(target, attr)
+
+    if not callable(target):
+        raise TypeError(f"{path}不可调用")
+
+    return target
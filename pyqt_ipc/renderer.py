@@ -1,5 +1,4 @@
-from PyQt5.QtWidgets import QApplication
-
+from .projection import Projection
 from .logger import logger
 
 
@@ -7,52 +6,99 @@ __all__ = [
     "IPCRenderer"
 ]
 
+class Listener:
+    """
+    单个监听回调及其选项
+    """
+
+    def __init__(self, callback, latest_only=False, with_invocation=False, priority=0):
+        self.callback = callback
+        self.latest_only = latest_only
+        self.with_invocation = with_invocation
+        self.priority = priority
+
+    def __call__(self, invocation_id, *args, **kwargs):
+
+        if self.with_invocation:
+            self.callback(invocation_id, *args, **kwargs)
+        else:
+            self.callback(*args, **kwargs)
+
 class CallController:
 
-    def __init__(self, callback):
-        self._callbacks = [callback]
+    def __init__(self, callback, latest_only=False, with_invocation=False, priority=0):
+        self._listeners = []
+        self.add(callback, latest_only, with_invocation, priority)
 
-    def add(self, callback):
+    def add(self, callback, latest_only=False, with_invocation=False, priority=0):
         """
-        添加回调函数
+        添加回调函数, 按优先级从高到低排列, 同一优先级内按添加顺序排列
         :param callback: 结果回调函数
+        :param latest_only: 批量模式下是否只接收每批次的最新结果
+        :param with_invocation: 回调时是否将调用编号作为第一个参数传入
+        :param priority: 回调优先级
         :return: None
         """
-        self._callbacks.append(callback)
+        index = len(self._listeners)
+        while index and self._listeners[index - 1].priority < priority:
+            index -= 1
+        self._listeners.insert(index, Listener(callback, latest_only, with_invocation, priority))
 
     def remove(self, callback):
         """
         移除回调函数
         :return: bool
         """
-        if callback not in self._callbacks:
-            return False
+        for listener in self._listeners:
+            if listener.callback == callback:
+                self._listeners.remove(listener)
+                return True
 
-        self._callbacks.remove(callback)
-        return True
+        return False
 
     def clear(self):
         """
         清空回调函数
         :return: None
         """
-        self._callbacks.clear()
+        self._listeners.clear()
 
     def empty(self):
 
-        return not self._callbacks
+        return not self._listeners
+
+    @property
+    def listeners(self):
 
-    def __call__(self, *args, **kwargs):
+        return self._listeners
+
+    def dispatch(self, invocation_id, *args, **kwargs):
         """
-        调用回调函数
-        :param args:
-        :param kwargs:
-        :return:
+        批量模式下调用接收全部结果的回调函数, 不主动处理Qt事件
+        :param invocation_id: 结果所属的调用编号
+        :return: None
         """
-        for callback in self._callbacks:
-            callback(*args, **kwargs)
+        for listener in self._listeners:
+            if not listener.latest_only:
+                listener(invocation_id, *args, **kwargs)
 
-        QApplication.processEvents()
+    @property
+    def has_latest(self):
+        """
+        是否存在只接收最新结果的回调函数
+        :return: bool
+        """
+        return any(listener.latest_only for listener in self._listeners)
+
+    def dispatch_latest(self, invocation_id, *args, **kwargs):
+        """
+        批量模式下调用只接收最新结果的回调函数
+        :param invocation_id: 结果所属的调用编号
+        :return: None
+        """
+        for listener in self._listeners:
+            if listener.latest_only:
+                listener(invocation_id, *args, **kwargs)
 
 class IPCRenderer:
 
@@ -60,20 +106,119 @@ class IPCRenderer:
 
         self._ipcMain = ipcMain
 
-    def on(self, task_name, callback):
+    def on(
+        self, task_name, callback, latest_only=False, with_invocation=False, priority=0, project=None, changes=None
+    ):
         """
         添加任务回调
         :param task_name: 任务名称
         :param callback: 结果回调函数
+        :param latest_only: 批量模式下是否只接收每批次的最新结果(高频任务只需渲染最新值时使用);
+                            开启frame_budget时只接收回调执行时的最新结果, 积压期间的中间结果被合并
+        :param with_invocation: 回调时是否将调用编号(start的返回值)作为第一个参数传入, 用于区分同一任务的多次调用
+        :param priority: 回调优先级, 数值越大越先执行; 开启frame_budget时积压的回调按优先级执行, 高优先级回调可越过积压
+        :param project: 在任务管理进程内对结果执行的投影函数, 只有其返回值被传递至渲染进程, 见IPCMain.project;
+                        投影属于任务, 对该任务的所有监听生效
+        :param changes: 在任务管理进程内按同一调用的上一次结果过滤, "dedupe"或函数changes(previous, current), 见IPCMain.project
         :return: None
         """
+        if not isinstance(priority, int):
+            logger.error(f"[{task_name}]: 添加监听失败, priority参数必须为整数, 本次添加监听被忽略!")
+            return
+
+        if project is not None or changes is not None:
+            current = self._ipcMain.projections.get(task_name)
+            if current is not None and current != Projection(project, changes):
+                logger.error(f"[{task_name}]: 添加监听失败, 该任务已设置了不同的结果投影, 本次添加监听被忽略!")
+                return
+            if current is None and not self._ipcMain.project(task_name, project, changes):
+                return
+
         if task_name in self._ipcMain.listen_tasks:
-            self._ipcMain.listen_tasks[task_name].add(callback)
+            self._ipcMain.listen_tasks[task_name].add(callback, latest_only, with_invocation, priority)
         else:
             new_listen_tasks = self._ipcMain.listen_tasks
-            new_listen_tasks[task_name] = CallController(callback)
+            new_listen_tasks[task_name] = CallController(callback, latest_only, with_invocation, priority)
             self._ipcMain.listen_tasks = new_listen_tasks
-        logger.debug(f"[{task_name}]: 添加任务监听成功")
+        logger.debug("[%s]: 添加任务监听成功", task_name)
+
+    def on_invocation(self, invocation_id, callback, priority=0):
+        """
+        添加单次调用的回调, 同一优先级内先于任务回调执行, 调用结束后自动移除
+        :param invocation_id: 调用编号(start的返回值)
+        :param callback: 结果回调函数
+        :param priority: 回调优先级, 同on
+        :return: None
+        """
+        if not self._ipcMain.is_running(invocation_id):
+            logger.warning(f"[#{invocation_id}]: 调用不存在或已结束, 本次添加监听被忽略!")
+            return
+
+        if not isinstance(priority, int):
+            logger.error(f"[#{invocation_id}]: 添加监听失败, priority参数必须为整数, 本次添加监听被忽略!")
+            return
+
+        if invocation_id in self._ipcMain.invocation_listens:
+            self._ipcMain.invocation_listens[invocation_id].add(callback, priority=priority)
+        else:
+            self._ipcMain.invocation_listens[invocation_id] = CallController(callback, priority=priority)
+        logger.debug("[#%s]: 添加调用监听成功", invocation_id)
+
+    def on_progress(self, pipeline_name, callback, with_invocation=False, priority=0):
+        """
+        添加流水线进度回调, 需在注册流水线时开启progress; 每完成一个中间阶段回调一次, 参数为(完成的阶段, 已完成阶段数, 阶段总数)
+        :param pipeline_name: 流水线名称
+        :param callback: 进度回调函数
+        :param with_invocation: 同on
+        :param priority: 同on
+        :return: None
+        """
+        if not isinstance(priority, int):
+            logger.error(f"[{pipeline_name}]: 添加监听失败, priority参数必须为整数, 本次添加监听被忽略!")
+            return
+
+        if pipeline_name in self._ipcMain.progress_listens:
+            self._ipcMain.progress_listens[pipeline_name].add(callback, False, with_invocation, priority)
+        else:
+            self._ipcMain.progress_listens[pipeline_name] = CallController(callback, False, with_invocation, priority)
+        logger.debug("[%s]: 添加进度监听成功", pipeline_name)
+
+    def on_error(self, task_name, callback, with_invocation=False, priority=0):
+        """
+        添加任务错误回调, 任务函数抛出异常或执行超时(见registry的timeout)时回调一次, 参数为TaskError:
+        type: 异常类型名; message: 异常信息; traceback: 格式化后的调用栈; timeout: 是否因超时结束; attempts: 已执行的次数(含重试);
+        出错的调用随后照常回调结束, 未添加错误监听时只记录日志
+        :param task_name: 任务名称
+        :param callback: 错误回调函数
+        :param with_invocation: 同on
+        :param priority: 同on
+        :return: None
+        """
+        if not isinstance(priority, int):
+            logger.error(f"[{task_name}]: 添加监听失败, priority参数必须为整数, 本次添加监听被忽略!")
+            return
+
+        if task_name in self._ipcMain.error_listens:
+            self._ipcMain.error_listens[task_name].add(callback, False, with_invocation, priority)
+        else:
+            self._ipcMain.error_listens[task_name] = CallController(callback, False, with_invocation, priority)
+        logger.debug("[%s]: 添加错误监听成功", task_name)
+
+    def on_failure(self, callback):
+        """
+        添加任务管理进程故障回调, 需在CreateIPC时开启supervise; 故障时运行中的调用已以失败结束, 参数为故障信息字典:
+        reason: exited(进程已退出, 如段错误、被OOM结束)或unresponsive(心跳超时); exitcode: 退出码;
+        restarts: 时间窗口内的重启次数; recovering: 是否将重新拉起, 为False时已超出重启次数上限;
+        invocations: {调用编号: 任务名称} 本次故障中失败的调用
+        :param callback: 故障回调函数
+        :return: None
+        """
+        if callback in self._ipcMain.failure_listens:
+            logger.warning("该回调已添加为故障监听, 本次添加监听被忽略!")
+            return
+
+        self._ipcMain.failure_listens.append(callback)
+        logger.debug("添加故障监听成功")
 
     def remove(self, task_name, callback):
         """
@@ -94,18 +239,24 @@ class IPCRenderer:
             new_listen_tasks = self._ipcMain.listen_tasks
             del new_listen_tasks[task_name]
             self._ipcMain.listen_tasks = new_listen_tasks
+            if task_name in self._ipcMain.projections:
+                self._ipcMain.project(task_name)
 
-        logger.debug(f"[{task_name}]: 移除任务单个监听成功")
+        logger.debug("[%s]: 移除任务单个监听成功", task_name)
 
     def cancel(self, task_name):
         """
-        清空任务回调
+        清空任务回调(含错误回调及流水线的进度回调)
         :param task_name: 任务名称
         :return: None
         """
+        self._ipcMain.progress_listens.pop(task_name, None)
+        self._ipcMain.error_listens.pop(task_name, None)
         if task_name in self._ipcMain.listen_tasks:
             new_listen_tasks = self._ipcMain.listen_tasks
             del new_listen_tasks[task_name]
             self._ipcMain.listen_tasks = new_listen_tasks
+        if task_name in self._ipcMain.projections:
+            self._ipcMain.project(task_name)
 
-        logger.debug(f"[{task_name}]: 清空任务监听成功")
\ No newline at end of file
+        logger.debug("[%s]: 清空任务监听成功", task_name)
\ No newline at end of file
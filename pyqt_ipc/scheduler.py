@@ -0,0 +1,127 @@
+from threading import Lock
+from collections import deque, OrderedDict
+
+from .logger import logger
+
+
+__all__ = [
+    "Scheduler"
+]
+
+class Scheduler:
+    """
+    任务管理进程内的调度器
+    优先级高的调用先执行; 同一优先级内按任务名称轮转, 避免某一任务的大量调用饿死其它任务;
+    同时受各任务的并发上限与全局运行上限约束, 未能执行的调用排队等待
+    """
+
+    def __init__(self, max_running=None):
+        self._max_running = max_running
+        self._running = 0
+        self._levels = {}
+        self._lock = Lock()
+
+    def submit(self, run):
+        """
+        提交调用
+        :param run: TaskRun
+        :return: None
+        """
+        task = run.task
+        with self._lock:
+            level = self._levels.setdefault(task.priority, OrderedDict())
+            level.setdefault(task.name, deque()).append(run)
+
+        self._schedule()
+
+    def release(self, run):
+        """
+        调用结束, 释放运行名额并调度排队中的调用
+        :param run: TaskRun
+        :return: None
+        """
+        with self._lock:
+            self._running -= 1
+
+        self._schedule()
+
+    def remove(self, task, invocation_id=None):
+        """
+        移除排队中的调用
+        :param task: Task
+        :param invocation_id: 调用编号, 为None时移除该任务所有排队中的调用
+        :return: list -> 被移除的TaskRun
+        """
+        removed = []
+        with self._lock:
+            for level in self._levels.values():
+                runs = level.get(task.name)
+                if not runs:
+                    continue
+                for run in list(runs):
+                    if invocation_id is None or run.invocation_id == invocation_id:
+                        runs.remove(run)
+                        removed.append(run)
+                if not runs:
+                    del level[task.name]
+
+        return removed
+
+    @property
+    def max_running(self):
+
+        return self._max_running
+
+    def depth(self):
+        """
+        排队中的调用数
+        :return: dict -> {任务名称: 排队数}
+        """
+        with self._lock:
+            depth = {}
+            for level in self._levels.values():
+                for task_name, runs in level.items():
+                    depth[task_name] = depth.get(task_name, 0) + len(runs)
+
+        return depth
+
+    def _schedule(self):
+        """
+        在名额允许的范围内依次拉起排队中的调用
+        :return: None
+        """
+        admitted = []
+        with self._lock:
+            while self._max_running is None or self._running < self._max_running:
+                run = self._next()
+                if run is None:
+                    break
+                self._running += 1
+                run.task.admit(run)
+                admitted.append(run)
+
+        for run in admitted:
+            run.start()
+            logger.debug("[%s#%s]: 任务已成功启动", run.task.name, run.invocation_id)
+
+    def _next(self):
+        """
+        取出下一个可执行的调用, 调用方需持有锁
+        :return: TaskRun | None
+        """
+        for priority in sorted(self._levels, reverse=True):
+            level = self._levels[priority]
+            for task_name, runs in level.items():
+                if not runs[0].task.available:
+                    continue
+
+                run = runs.popleft()
+                if runs:
+                    level.move_to_end(task_name)
+                else:
+                    del level[task_name]
+                if not level:
+                    del self._levels[priority]
+                return run
+
+        return None
@@ -0,0 +1,297 @@
+import os
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from .logger import logger
+
+
+__all__ = [
+    "SharedResult",
+    "SharedBuffer",
+    "share_result",
+    "attach_result",
+    "discard_result",
+    "share_args",
+    "attach_args",
+    "discard_args"
+]
+
+class SharedResult:
+    """
+    共享内存结果句柄, 仅句柄经由结果队列传递
+    """
+    __slots__ = ("name", "nbytes", "kind", "dtype", "shape")
+
+    def __init__(self, name, nbytes, kind, dtype=None, shape=None):
+        self.name = name
+        self.nbytes = nbytes
+        self.kind = kind
+        self.dtype = dtype
+        self.shape = shape
+
+    def discard(self):
+        """
+        丢弃未被接收的结果, 释放共享内存
+        :return: None
+        """
+        try:
+            buffer = SharedBuffer(self)
+        except FileNotFoundError:
+            return
+        buffer.release()
+
+def _unmap(shm, exports, force):
+    """
+    关闭共享内存映射, release、丢弃及对象回收共用
+    :param shm: SharedMemory
+    :param exports: 导出对象的弱引用列表, 元素为(memoryview的弱引用, 以其为base的ndarray的弱引用或None)
+    :param force: 是否释放仍存活的memoryview, 为False时有导出存活即不关闭; ndarray不经由缓冲区导出持有映射, 存活时均不关闭
+    :return: bool -> 是否已关闭, 导出的ndarray仍存活或memoryview仍被引用时为False
+    """
+    views = []
+    for view_ref, array_ref in exports:
+        if array_ref is not None and array_ref() is not None:
+            return False
+        view = view_ref()
+        if view is not None:
+            if not force:
+                return False
+            views.append(view)
+    for view in views:
+        try:
+            view.release()
+        except BufferError:
+            return False
+    exports.clear()
+
+    try:
+        shm.close()
+    except BufferError:
+        # 导出的memoryview被再次包装(如memoryview(view)), 无法追踪
+        logger.warning(f"[{shm.name}]: 共享内存仍被未追踪的对象引用, 本次关闭被忽略!")
+        return False
+
+    return True
+
+class SharedBuffer:
+    """
+    渲染端接收到的共享内存结果, 只读
+    创建时即解除共享内存名称的链接, 内存在release或对象被回收后释放; 对象被回收时通过view/array导出的对象仍存活的,
+    待其全部回收后再关闭映射
+    """
+
+    def __init__(self, handle, unlink=True):
+        """
+        :param handle: SharedResult
+        :param unlink: 是否解除名称的链接, 为False时名称仍由其所有者(如任务管理进程内的调用)在结束时释放
+        """
+        self._handle = handle
+        self._exports = []
+        self._shm = None
+        self._shm = SharedMemory(name=handle.name)
+        if unlink:
+            self._shm.unlink()
+        elif os.name == "posix":
+            # 映射时会登记至resource_tracker, 名称的生命周期由其所有者管理, 此处不再追踪
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+    def _track(self, view, array=None):
+        """
+        追踪导出的对象, 关闭映射前需先释放或等待其回收
+        :param view: memoryview
+        :param array: 以view为base的ndarray
+        :return: None
+        """
+        self._exports.append((weakref.ref(view), weakref.ref(array) if array is not None else None))
+
+    @property
+    def nbytes(self):
+
+        return self._handle.nbytes
+
+    @property
+    def view(self):
+        """
+        只读memoryview, 不发生拷贝
+        :return: memoryview
+        """
+        view = self._shm.buf[:self._handle.nbytes].toreadonly()
+        self._track(view)
+        return view
+
+    @property
+    def array(self):
+        """
+        只读ndarray, 不发生拷贝; bytes结果将以uint8一维数组返回
+        :return: numpy.ndarray
+        """
+        import numpy
+
+        buffer = self._shm.buf[:self._handle.nbytes].toreadonly()
+        dtype = self._handle.dtype if self._handle.kind == "ndarray" else numpy.uint8
+        array = numpy.frombuffer(buffer, dtype)
+        # 由该数组派生的视图(含reshape)均以其为base, 其base的memoryview随最后一个派生视图回收
+        self._track(array.base, array)
+        if self._handle.kind == "ndarray":
+            return array.reshape(self._handle.shape)
+
+        return array
+
+    def tobytes(self):
+        """
+        拷贝为bytes, 拷贝后即可release
+        :return: bytes
+        """
+        return bytes(self._shm.buf[:self._handle.nbytes])
+
+    def release(self):
+        """
+        释放共享内存映射, 释放后通过view获取的memoryview不可再使用; 可重复调用
+        :return: bool -> 是否释放成功, 通过array获取的ndarray仍被引用时释放失败, 待其回收后可再次release
+        """
+        if _unmap(self._shm, self._exports, True):
+            return True
+
+        logger.warning(f"[{self._handle.name}]: 共享内存仍被ndarray引用, 本次释放被忽略!")
+        return False
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+
+        self.release()
+
+    def __del__(self):
+
+        if self._shm is None or _unmap(self._shm, self._exports, False):
+            return
+        # 导出的memoryview仍存活(或仍被ndarray引用), 最后一个被回收时关闭映射
+        for view_ref, _ in self._exports:
+            view = view_ref()
+            if view is not None:
+                weakref.finalize(view, _unmap, self._shm, self._exports, False)
+
+def _share(value, threshold):
+    """
+    将超过阈值的bytes类对象或ndarray放入共享内存
+    :param value: 任务返回值
+    :param threshold: 使用共享内存的字节数阈值
+    :return: SharedResult | 原值
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = memoryview(value).cast("B")
+        if data.nbytes < threshold or data.nbytes == 0:
+            return value
+        shm = SharedMemory(create=True, size=data.nbytes)
+        shm.buf[:data.nbytes] = data
+        handle = SharedResult(shm.name, data.nbytes, "bytes")
+    elif type(value).__name__ == "ndarray" and type(value).__module__ == "numpy":
+        import numpy
+
+        if value.dtype.hasobject or value.nbytes < threshold or value.nbytes == 0:
+            return value
+        shm = SharedMemory(create=True, size=value.nbytes)
+        target = numpy.ndarray(value.shape, value.dtype, buffer=shm.buf)
+        target[...] = value
+        del target
+        handle = SharedResult(shm.name, value.nbytes, "ndarray", value.dtype.str, value.shape)
+    else:
+        return value
+
+    # 共享内存的生命周期交由渲染端管理, 生产端不再追踪
+    shm.close()
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return handle
+
+def share_result(result, threshold):
+    """
+    生产端: 按阈值将任务返回值(元组时逐个元素)放入共享内存
+    :param result: 任务返回值
+    :param threshold: 字节数阈值, 为None时不使用共享内存
+    :return: 处理后的返回值
+    """
+    if threshold is None:
+        return result
+
+    if isinstance(result, tuple):
+        return tuple(_share(item, threshold) for item in result)
+
+    return _share(result, threshold)
+
+def attach_result(result):
+    """
+    渲染端: 将结果消息中的共享内存句柄替换为SharedBuffer
+    :param result: 结果队列中取出的消息
+    :return: 处理后的消息
+    """
+    if not any(isinstance(item, SharedResult) for item in result):
+        return result
+
+    return tuple(SharedBuffer(item) if isinstance(item, SharedResult) else item for item in result)
+
+def discard_result(result):
+    """
+    丢弃不再回传或不再回调的结果, 释放其中的共享内存
+    :param result: share_result处理后的返回值, 或渲染端attach_result处理后的结果
+    :return: None
+    """
+    for item in result if isinstance(result, tuple) else (result,):
+        if isinstance(item, SharedResult):
+            item.discard()
+        elif isinstance(item, SharedBuffer):
+            item.release()
+
+def share_args(args, kwargs, threshold):
+    """
+    渲染端: 按阈值将任务参数中的bytes类对象或ndarray放入共享内存, 任务队列只传递句柄
+    :param args: 位置参数
+    :param kwargs: 关键字参数
+    :param threshold: 字节数阈值, 为None时不使用共享内存
+    :return: (args, kwargs) -> 处理后的参数
+    """
+    if threshold is None:
+        return args, kwargs
+
+    return tuple(_share(arg, threshold) for arg in args), {k: _share(v, threshold) for k, v in kwargs.items()}
+
+def _restore(value, unlink):
+    """
+    将共享内存句柄还原为参数值, ndarray以只读数组引用共享内存(不拷贝), bytes类对象拷贝为bytes
+    :param value: 参数值
+    :param unlink: 同attach_args
+    :return: 还原后的参数值
+    """
+    if not isinstance(value, SharedResult):
+        return value
+
+    buffer = SharedBuffer(value, unlink)
+    if value.kind == "ndarray":
+        return buffer.array
+
+    data = buffer.tobytes()
+    buffer.release()
+    return data
+
+def attach_args(args, kwargs, unlink=True):
+    """
+    任务管理进程及工作进程: 还原参数中的共享内存句柄, 还原的ndarray被回收后映射随之关闭
+    :param args: 位置参数
+    :param kwargs: 关键字参数
+    :param unlink: 是否同时解除名称的链接; 同一份句柄会被多次还原(工作进程内每次执行、流水线的各起始阶段)时为False,
+                   由调用结束时的discard_args释放
+    :return: (args, kwargs) -> 还原后的参数
+    """
+    return tuple(_restore(arg, unlink) for arg in args), {k: _restore(v, unlink) for k, v in kwargs.items()}
+
+def discard_args(args, kwargs):
+    """
+    任务管理进程: 丢弃未被执行的调用的参数, 释放其中的共享内存
+    :param args: 位置参数
+    :param kwargs: 关键字参数
+    :return: None
+    """
+    discard_result(tuple(args) + tuple(kwargs.values()))
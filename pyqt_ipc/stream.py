@@ -0,0 +1,41 @@
+import asyncio
+import inspect
+
+
+__all__ = [
+    "is_stream",
+    "iter_stream"
+]
+
+def is_stream(result):
+    """
+    任务返回值是否为需要逐个回传的生成器(或异步生成器)
+    :param result: 任务返回值
+    :return: bool
+    """
+    return inspect.isgenerator(result) or inspect.isasyncgen(result)
+
+def iter_stream(stream):
+    """
+    以同步方式遍历生成器产出的结果, 异步生成器在独立的事件循环中驱动;
+    遍历提前结束时需调用返回值的close以关闭生成器
+    :param stream: 生成器或异步生成器
+    :return: generator
+    """
+    if inspect.isgenerator(stream):
+        try:
+            yield from stream
+        finally:
+            stream.close()
+        return
+
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(stream.aclose())
+        loop.close()
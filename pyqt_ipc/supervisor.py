@@ -0,0 +1,151 @@
+import time
+from threading import Thread
+from collections import deque
+
+from PyQt5.QtCore import QTimer
+
+from .logger import logger
+
+
+__all__ = [
+    "RestartPolicy",
+    "Supervisor",
+    "start_heartbeat"
+]
+
+class RestartPolicy:
+    """
+    任务管理进程的监督与重启策略
+    任务管理进程退出(如C扩展段错误、被OOM结束)或心跳超时后, 按指数退避重新拉起并重新注册任务;
+    window时间内重启超过max_restarts次则不再重启
+    """
+
+    def __init__(self, heartbeat=0.1, timeout=1.0, max_restarts=5, window=60.0, backoff=0.05, max_backoff=5.0):
+        """
+        :param heartbeat: 心跳间隔, 同时也是存活检查的间隔, 单位: s
+        :param timeout: 超过该时间未收到心跳视为无响应, 单位: s
+        :param max_restarts: window时间内的最多重启次数
+        :param window: 统计重启次数的时间窗口, 单位: s
+        :param backoff: 首次重启前的等待时间, 之后每次连续重启翻倍, 单位: s
+        :param max_backoff: 重启前等待时间的上限, 单位: s
+        """
+        self.heartbeat = heartbeat
+        self.timeout = timeout
+        self.max_restarts = max_restarts
+        self.window = window
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt):
+        """
+        第attempt次连续重启前的等待时间
+        :param attempt: 时间窗口内的重启次数, 从1开始
+        :return: float -> 单位: s
+        """
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+def start_heartbeat(conn, interval):
+    """
+    任务管理进程: 启动心跳线程, 按间隔经由管道发送心跳, 渲染进程关闭管道后结束
+    :param conn: 心跳管道的发送端
+    :param interval: 心跳间隔, 单位: s
+    :return: None
+    """
+    def beat():
+        while True:
+            try:
+                conn.send_bytes(b"")
+            except (OSError, ValueError):
+                return
+            time.sleep(interval)
+
+    t = Thread(target=beat)
+    t.daemon = True
+    t.start()
+
+class Supervisor:
+    """
+    渲染进程内的监督者: 按心跳间隔检查任务管理进程是否存活及心跳是否超时, 发现故障时回调on_failure
+    """
+
+    def __init__(self, policy, on_failure):
+        """
+        :param policy: RestartPolicy
+        :param on_failure: 故障回调, 参数为(原因, 退出码), 原因为exited或unresponsive
+        """
+        self._policy = policy
+        self._on_failure = on_failure
+        self._proc = None
+        self._conn = None
+        self._last_beat = 0.0
+        self._restarts = deque()
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._check)
+
+    def watch(self, proc, conn):
+        """
+        开始监督新拉起的任务管理进程
+        :param proc: 任务管理进程
+        :param conn: 心跳管道的接收端
+        :return: None
+        """
+        self._proc = proc
+        self._conn = conn
+        self._last_beat = time.perf_counter()
+        self._timer.start(max(1, int(self._policy.heartbeat * 1000)))
+
+    def stop(self):
+        """
+        停止监督
+        :return: None
+        """
+        self._timer.stop()
+        self._proc = None
+
+    def next_restart(self):
+        """
+        记录一次重启, 按策略计算重启前的等待时间
+        :return: float | None -> 等待时间(单位: s), 超出重启次数上限时为None
+        """
+        now = time.monotonic()
+        while self._restarts and now - self._restarts[0] > self._policy.window:
+            self._restarts.popleft()
+        if len(self._restarts) >= self._policy.max_restarts:
+            return None
+
+        self._restarts.append(now)
+        return self._policy.delay(len(self._restarts))
+
+    @property
+    def restarts(self):
+
+        return len(self._restarts)
+
+    def _check(self):
+        """
+        检查任务管理进程, 心跳以收到的时刻计, 渲染进程自身卡顿期间积压的心跳不会被误判为超时
+        :return: None
+        """
+        if self._proc is None:
+            return
+
+        alive = True
+        try:
+            while self._conn.poll():
+                self._conn.recv_bytes()
+                self._last_beat = time.perf_counter()
+        except (EOFError, OSError):
+            alive = False
+
+        if alive and self._proc.is_alive():
+            if time.perf_counter() - self._last_beat <= self._policy.timeout:
+                return
+            reason = "unresponsive"
+        else:
+            self._proc.join(self._policy.heartbeat)
+            reason = "exited"
+
+        exitcode = self._proc.exitcode
+        self.stop()
+        logger.error(f"任务管理进程{'已退出' if reason == 'exited' else '无响应'}, 退出码: {exitcode}")
+        self._on_failure(reason, exitcode)
@@ -1,14 +1,65 @@
-from threading import Thread
+import os
+import time
+import math
+import asyncio
+import inspect
+from queue import Queue, Empty
+from threading import Thread, Lock
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 
-from .logger import logger
-from .exception import RegistryException
+from .logger import logger, log_in_background
+from .pool import WorkerPool
+from .scheduler import Scheduler
+from .aio import EventLoopThread, is_async
+from .warmup import warm_up
+from .metrics import result_size
+from .cancel import CancelToken, bind_token, current_token
+from .ref import resolve
+from .shm import share_result, discard_result, attach_args, discard_args
+from .stream import is_stream, iter_stream
+from .outbox import Outbox, OVERFLOWS, EVENT_DROPPED
+from .timer import TimerThread
+from .supervisor import start_heartbeat
+from .error import TaskError
+from .exception import RegistryException, TaskException, CancelledException
 
 
 __all__ = [
     "TaskIterator",
-    "TaskManager"
+    "TaskManager",
+    "EXECUTORS",
+    "OVERFLOWS",
+    "EVENT_START",
+    "EVENT_RESULT",
+    "EVENT_RESULTS",
+    "EVENT_DONE",
+    "EVENT_DROPPED",
+    "EVENT_PROGRESS",
+    "EVENT_ERROR",
+    "EVENT_REJECTED"
 ]
 
+EXECUTORS = ("thread", "process")
+
+# 异步任务等待结果缓冲空位的检查间隔, 单位: s
+_ROOM_POLL = 0.005
+
+# 流水线等待阶段完成时检查取消令牌的间隔, 单位: s
+_STAGE_POLL = 0.05
+# 线程执行的批量调用在未设置max_running时的默认线程数上限, 同ThreadPoolExecutor的默认值
+_MAP_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+EVENT_START = "start"
+EVENT_RESULT = "result"
+EVENT_RESULTS = "results"
+EVENT_DONE = "done"
+# 流水线进度事件, 携带(完成的阶段, 已完成阶段数, 阶段总数)
+EVENT_PROGRESS = "progress"
+# 错误事件, 携带TaskError
+EVENT_ERROR = "error"
+# 注册失败事件, 携带(失败的指令add/modify, 失败原因), 渲染进程收到后撤销该次注册
+EVENT_REJECTED = "rejected"
+
 class TaskIterator:
 
     def __init__(self, task, cycles=0):
@@ -50,9 +101,1026 @@ class TaskIterator:
 
         logger.error("操作错误, 不支持通过该方式修改任务本体, 本次修改被忽略!")
 
+class TaskRun:
+    """
+    任务的单次调用, 每次启动任务对应一个TaskRun, 携带独立的调用编号与取消令牌
+    """
+
+    def __init__(self, task, invocation_id, args, kwargs):
+        self._task = task
+        self._invocation_id = invocation_id
+        self._args = args
+        self._kwargs = kwargs
+        self._token = CancelToken()
+        self._job = None
+        self._started_at = None
+        self._timeout = None
+        self._deadline = None
+        self._attempts = 0
+        self._produced = False
+        self._finished = False
+        self._lock = Lock()
+
+    def start(self):
+        """
+        在新线程中执行
+        :return: None
+        """
+        self._started_at = time.perf_counter()
+        self._task.put(self._invocation_id, EVENT_START)
+        t = Thread(target=self.run)
+        t.daemon = True
+        t.start()
+
+    def run(self):
+        """
+        执行任务, 被取消后的执行结果不会回传; 无论以何种方式结束都会回传结束事件
+        任务函数为生成器(或异步生成器)时, 每产出一个结果即回传一次
+        :return: None
+        """
+        task_iterator = self._task.task
+        func = task_iterator.taskProto
+        cycles = task_iterator.cycles
+        cycle = 0
+        bind_token(self._token)
+        try:
+            args, kwargs = self._attach()
+            self._watch()
+            while cycles == 0 or cycle < cycles:
+                cycle += 1
+                if self._token.cancelled:
+                    return
+
+                attempt = 0
+                while True:
+                    attempt += 1
+                    try:
+                        self._execute(attempt, func, args, kwargs)
+                        break
+                    except CancelledException:
+                        raise
+                    except Exception as e:
+                        delay = self._retry_delay(attempt, e)
+                        if delay is None:
+                            raise
+                    if self._token.wait(delay):
+                        return
+        except CancelledException:
+            return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._job = None
+            bind_token(None)
+            self._detach()
+            self._end()
+
+    def _execute(self, attempt, func, args, kwargs):
+        """
+        执行一次任务函数, 开启超时时执行期间设有截止时刻
+        :param attempt: 本次为第几次执行(含重试)
+        :param func: 任务函数
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: None
+        """
+        self._begin(attempt)
+        pool = self._task.pool
+        try:
+            if pool is None:
+                result = func(*args, **kwargs)
+                if is_stream(result):
+                    self._stream(result)
+                elif not self._token.cancelled:
+                    self._put_result(share_result(result, self._task.shm_threshold))
+            else:
+                self._job = pool.submit(self._task.ref or func, args, kwargs, on_yield=self._put_result)
+                result = self._job.result()
+                if not self._job.streamed:
+                    self._put_result(result)
+        finally:
+            self._deadline = None
+
+    def _watch(self):
+        """
+        开启超时时在定时器中加入本次调用的超时检查
+        :return: None
+        """
+        self._timeout = self._task.timeout
+        if self._timeout is not None:
+            self._task.timer.add(_Deadline(self), time.monotonic() + self._timeout)
+
+    def _begin(self, attempt):
+        """
+        开始一次执行, 开启超时时设置截止时刻
+        :param attempt: 本次为第几次执行(含重试)
+        :return: None
+        """
+        self._attempts = attempt
+        self._produced = False
+        if self._timeout is not None:
+            self._deadline = time.monotonic() + self._timeout
+
+    def _retry_delay(self, attempt, e):
+        """
+        执行出错后的重试等待时间, 按已重试次数指数退避
+        :param attempt: 出错的是第几次执行
+        :param e: 异常
+        :return: float | None -> 单位: s; 不再重试(已达重试次数、已被取消或本次执行已回传过结果)时为None
+        """
+        if attempt > self._task.retries or self._produced or self._token.cancelled:
+            return None
+
+        delay = self._task.backoff * 2 ** (attempt - 1)
+        logger.warning(
+            f"[{self._task.name}#{self._invocation_id}]: 任务执行出错, {_error_of(e)}, {delay:.2f}s后第{attempt}次重试"
+        )
+        return delay
+
+    def _fail(self, e):
+        """
+        回传错误事件, 已取消(含已超时结束)时不回传
+        :param e: 异常
+        :return: None
+        """
+        if self._token.cancelled:
+            return
+
+        error = _error_of(e)
+        error.attempts = max(self._attempts, 1)
+        logger.error(f"[{self._task.name}#{self._invocation_id}]: 任务执行出错, {error}")
+        self._task.put(self._invocation_id, EVENT_ERROR, error)
+
+    def _end(self):
+        """
+        调用结束, 已因超时结束时不再重复结束
+        :return: None
+        """
+        with self._lock:
+            self._finished = True
+        self._task.finish(self)
+
+    def check_deadline(self):
+        """
+        定时器检查本次调用是否超时, 超时则以超时错误结束调用并立即释放并发名额: 取消令牌, 强制结束进程池中的执行,
+        取消异步任务; 线程执行的任务函数无法被强制结束, 其后续结果被丢弃
+        :return: float | None -> 下次检查时刻, 调用已结束时为None
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._finished or self._token.cancelled:
+                return None
+            deadline = self._deadline
+            if deadline is None:
+                return now + self._timeout
+            if deadline > now:
+                return deadline
+            self._finished = True
+            self._token.cancel()
+
+        error = TaskError(
+            "TimeoutError", f"单次执行超过{self._timeout}s未结束", timeout=True, attempts=max(self._attempts, 1)
+        )
+        logger.error(f"[{self._task.name}#{self._invocation_id}]: 任务执行超时, 调用被结束")
+        self._task.put(self._invocation_id, EVENT_ERROR, error)
+        self.quit(0)
+        self._task.finish(self)
+        return None
+
+    def discard(self):
+        """
+        调用未执行即被移除时, 释放参数占用的共享内存
+        :return: None
+        """
+        discard_args(self._args, self._kwargs)
+
+    def _attach(self):
+        """
+        还原参数中的共享内存句柄; 进程池执行时原样传递句柄, 由工作进程映射同一块共享内存(不拷贝), 调用结束时由_detach释放
+        :return: (args, kwargs)
+        """
+        if self._task.pool is not None:
+            return self._args, self._kwargs
+
+        return attach_args(self._args, self._kwargs)
+
+    def _detach(self):
+        """
+        进程池执行的调用结束, 释放参数占用的共享内存
+        :return: None
+        """
+        if self._task.pool is not None:
+            discard_args(self._args, self._kwargs)
+
+    def _stream(self, stream):
+        """
+        线程执行时逐个回传生成器产出的结果
+        :param stream: 生成器或异步生成器
+        :return: None
+        """
+        items = iter_stream(stream)
+        try:
+            for item in items:
+                self._token.raise_if_cancelled()
+                self._put_result(share_result(item, self._task.shm_threshold))
+        finally:
+            items.close()
+
+    def _put_result(self, result):
+        """
+        回传一次结果, 已取消时丢弃
+        :param result: share_result处理后的返回值
+        :return: None
+        """
+        if self._token.cancelled:
+            discard_result(result)
+            return
+
+        self._task.put(
+            self._invocation_id, EVENT_RESULT, result if isinstance(result, tuple) else (result,), token=self._token
+        )
+        self._produced = True
+
+    def quit(self, kill_timeout=None):
+        """
+        取消执行: 循环任务的后续执行不再拉起, 当前执行通过取消令牌通知;
+        进程池执行的任务超过kill_timeout仍未结束时强制结束其工作进程
+        :param kill_timeout: 强制结束的等待时间, 为None时仅协作式取消, 单位: s
+        :return: None
+        """
+        self._token.cancel()
+        job = self._job
+        if job is not None:
+            self._task.pool.cancel(job, kill_timeout)
+
+    @property
+    def invocation_id(self):
+
+        return self._invocation_id
+
+    @property
+    def elapsed(self):
+        """
+        开始执行至今的耗时, 尚未开始执行时为None
+        :return: float | None -> 单位: s
+        """
+        if self._started_at is None:
+            return None
+
+        return time.perf_counter() - self._started_at
+
+    @property
+    def task(self):
+
+        return self._task
+
+class AsyncTaskRun(TaskRun):
+    """
+    异步任务(async def或异步生成器)的单次调用, 以协程在任务管理进程的事件循环中执行, 不占用线程
+    """
+
+    def __init__(self, task, invocation_id, args, kwargs):
+        super(AsyncTaskRun, self).__init__(task, invocation_id, args, kwargs)
+        self._future = None
+
+    def start(self):
+        """
+        提交至事件循环执行
+        :return: None
+        """
+        self._started_at = time.perf_counter()
+        self._task.put(self._invocation_id, EVENT_START)
+        self._future = self._task.loop.submit(self.run())
+
+    async def run(self):
+        """
+        执行任务, 同TaskRun.run; 被取消时对应的asyncio.Task将收到CancelledError
+        :return: None
+        """
+        task_iterator = self._task.task
+        func = task_iterator.taskProto
+        cycles = task_iterator.cycles
+        cycle = 0
+        bind_token(self._token)
+        try:
+            args, kwargs = attach_args(self._args, self._kwargs)
+            self._watch()
+            while cycles == 0 or cycle < cycles:
+                cycle += 1
+                if self._token.cancelled:
+                    return
+
+                attempt = 0
+                while True:
+                    attempt += 1
+                    try:
+                        await self._execute(attempt, func, args, kwargs)
+                        break
+                    except (CancelledException, asyncio.CancelledError):
+                        raise
+                    except Exception as e:
+                        delay = self._retry_delay(attempt, e)
+                        if delay is None:
+                            raise
+                    await asyncio.sleep(delay)
+        except (CancelledException, asyncio.CancelledError):
+            return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            bind_token(None)
+            self._end()
+
+    async def _execute(self, attempt, func, args, kwargs):
+        """
+        执行一次任务函数, 同TaskRun._execute
+        :return: None
+        """
+        self._begin(attempt)
+        try:
+            result = func(*args, **kwargs)
+            if inspect.isasyncgen(result):
+                await self._stream(result)
+                return
+            if inspect.isawaitable(result):
+                result = await result
+            if not self._token.cancelled:
+                await self._task.wait_room()
+                self._put_result(share_result(result, self._task.shm_threshold))
+        finally:
+            self._deadline = None
+
+    async def _stream(self, stream):
+        """
+        逐个回传异步生成器产出的结果
+        :param stream: 异步生成器
+        :return: None
+        """
+        try:
+            async for item in stream:
+                self._token.raise_if_cancelled()
+                await self._task.wait_room()
+                self._put_result(share_result(item, self._task.shm_threshold))
+        finally:
+            await stream.aclose()
+
+    def quit(self, kill_timeout=None):
+        """
+        取消执行: 通知取消令牌并取消对应的asyncio.Task
+        :param kill_timeout: 异步任务不支持强制结束, 该参数被忽略
+        :return: None
+        """
+        self._token.cancel()
+        future = self._future
+        if future is not None:
+            future.cancel()
+
+class PeriodicRun(TaskRun):
+    """
+    任务的定时调用, 由任务管理进程内的定时器按间隔或cron表达式触发, 每次触发执行一次任务函数并回传其结果(不按TaskIterator的cycles循环);
+    每次触发的执行经由调度器排队, 执行期间才占用并发名额, 等待下次触发期间不占用线程及并发名额; 被取消或达到触发次数后回传结束事件
+    """
+
+    def __init__(self, task, invocation_id, args, kwargs, timer, trigger, times=None, skip=True):
+        super(PeriodicRun, self).__init__(task, invocation_id, args, kwargs)
+        self._timer = timer
+        self._trigger = trigger
+        self._times = times
+        self._skip = skip
+        self._fired = 0
+        self._active = 0
+        self._finished = False
+        self._future = None
+        self._lock = Lock()
+
+    def start(self):
+        """
+        加入定时器; 无法计算首次触发时刻(如cron表达式没有可触发的时刻)时抛出异常, 此时尚未回传开始事件, 参数也未被还原
+        :return: None
+        """
+        due = self._trigger.first(time.monotonic())
+        self._started_at = time.perf_counter()
+        self._task.put(self._invocation_id, EVENT_START)
+        self._args, self._kwargs = self._attach()
+        self._timer.add(self, due)
+
+    def fire(self, due):
+        """
+        定时器到期, 在计时线程中执行; 开启skip时上次执行尚未结束则跳过本次触发
+        :param due: 本次的计划触发时刻
+        :return: float | None -> 下次触发时刻, 不再由计时线程触发时为None
+        """
+        with self._lock:
+            if self._token.cancelled or self._finished:
+                return None
+            launch = not (self._skip and self._active)
+            if launch:
+                self._active += 1
+                self._fired += 1
+            exhausted = self._times is not None and self._fired >= self._times
+
+        if launch:
+            self._task.tick(self)
+        else:
+            logger.debug("[%s#%s]: 上次执行尚未结束, 跳过本次触发", self._task.name, self._invocation_id)
+
+        if exhausted or not self._trigger.fixed_rate:
+            return None
+        return self._trigger.next(due, time.monotonic())
+
+    def launch(self, tick):
+        """
+        调度器准许后执行一次任务函数: 异步任务提交至事件循环, 进程池任务提交至进程池, 线程任务在定时器的共享线程池中执行
+        :param tick: 本次执行对应的_Tick
+        :return: None
+        """
+        if self._token.cancelled:
+            self._complete(tick)
+            return
+
+        func = self._task.task.taskProto
+        if self._task.loop is not None:
+            self._future = self._task.loop.submit(self._run_async(func))
+            self._future.add_done_callback(lambda _: self._complete(tick))
+        elif self._task.pool is not None:
+            self._job = self._task.pool.submit(
+                self._task.ref or func, self._args, self._kwargs, on_yield=self._put_result
+            )
+            self._job.add_done_callback(lambda job: self._on_job(job, tick))
+        else:
+            self._timer.execute(self._run_thread, func, tick)
+
+    def drop(self):
+        """
+        排队中的单次执行随定时调用的取消被移除
+        :return: None
+        """
+        with self._lock:
+            self._active -= 1
+
+    def _run_thread(self, func, tick):
+
+        bind_token(self._token)
+        try:
+            result = func(*self._args, **self._kwargs)
+            if is_stream(result):
+                self._stream(result)
+            elif not self._token.cancelled:
+                self._put_result(share_result(result, self._task.shm_threshold))
+        except CancelledException:
+            pass
+        except Exception as e:
+            self._fail(e)
+        finally:
+            bind_token(None)
+            self._complete(tick)
+
+    async def _run_async(self, func):
+
+        bind_token(self._token)
+        try:
+            result = func(*self._args, **self._kwargs)
+            if inspect.isasyncgen(result):
+                try:
+                    async for item in result:
+                        self._token.raise_if_cancelled()
+                        await self._task.wait_room()
+                        self._put_result(share_result(item, self._task.shm_threshold))
+                finally:
+                    await result.aclose()
+                return
+            if inspect.isawaitable(result):
+                result = await result
+            if not self._token.cancelled:
+                await self._task.wait_room()
+                self._put_result(share_result(result, self._task.shm_threshold))
+        except (CancelledException, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            self._fail(e)
+        finally:
+            bind_token(None)
+
+    def _on_job(self, job, tick):
+
+        try:
+            result = job.result()
+            if not job.streamed:
+                self._put_result(result)
+        except CancelledException:
+            pass
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._job = None
+            self._complete(tick)
+
+    def _complete(self, tick):
+        """
+        单次执行结束: 释放其并发名额; 已取消或达到触发次数且没有执行中的任务时结束调用, 固定延迟时安排下次触发
+        :param tick: 本次执行对应的_Tick
+        :return: None
+        """
+        self._task.release(tick)
+        with self._lock:
+            self._active -= 1
+            done = self._token.cancelled or (self._times is not None and self._fired >= self._times)
+            finish = done and not self._active and not self._finished
+            if finish:
+                self._finished = True
+
+        if finish:
+            self._detach()
+            self._task.finish(self)
+        elif not done and not self._trigger.fixed_rate:
+            self._timer.add(self, self._trigger.next(None, time.monotonic()))
+
+    def quit(self, kill_timeout=None):
+        """
+        取消定时调用, 不再触发; 执行中的任务按TaskRun.quit取消, 结束后回传结束事件
+        :param kill_timeout: 同TaskRun.quit
+        :return: None
+        """
+        self._token.cancel()
+        job, future = self._job, self._future
+        if job is not None:
+            self._task.pool.cancel(job, kill_timeout)
+        if future is not None:
+            future.cancel()
+
+        with self._lock:
+            finish = not self._active and not self._finished
+            if finish:
+                self._finished = True
+
+        if finish:
+            self._detach()
+            self._task.finish(self)
+
+class _Tick:
+    """
+    定时调用的单次执行, 与其它调用一同由调度器按优先级与并发上限择机执行
+    """
+
+    def __init__(self, run):
+        self._run = run
+
+    def start(self):
+
+        self._run.launch(self)
+
+    def discard(self):
+
+        self._run.drop()
+
+    @property
+    def task(self):
+
+        return self._run.task
+
+    @property
+    def invocation_id(self):
+
+        return self._run.invocation_id
+
+class PipelineRun(TaskRun):
+    """
+    流水线的单次调用: 各阶段按依赖关系在任务管理进程内执行, 依赖已满足的阶段同时执行, 中间结果留在任务管理进程内不回传;
+    只回传最终阶段的结果, 开启progress时每完成一个中间阶段回传一次进度事件; 任一阶段出错时取消其余阶段
+    """
+
+    def __init__(self, task, invocation_id, args, kwargs):
+        super(PipelineRun, self).__init__(task, invocation_id, args, kwargs)
+        self._futures = {}
+        self._jobs = []
+
+    def run(self):
+        """
+        执行流水线, 无论以何种方式结束都会回传结束事件
+        :return: None
+        """
+        pipeline = self._task.pipeline
+        pending = list(pipeline.stages)
+        results = {}
+        stage = None
+        bind_token(self._token)
+        try:
+            # 各起始阶段共用同一份参数, 句柄在阶段启动时按其执行方式还原, 调用结束时释放
+            args, kwargs = self._args, self._kwargs
+            while not self._token.cancelled:
+                for stage in [x for x in pending if all(dep in results for dep in pipeline.deps(x))]:
+                    pending.remove(stage)
+                    deps = pipeline.deps(stage)
+                    if deps:
+                        future = self._launch(stage, tuple(results[dep] for dep in deps), {})
+                    else:
+                        future = self._launch(stage, args, kwargs)
+                    self._futures[future] = stage
+
+                if not self._futures:
+                    break
+
+                done, _ = wait(list(self._futures), _STAGE_POLL, FIRST_COMPLETED)
+                for future in done:
+                    stage = self._futures.pop(future)
+                    results[stage] = future.result()
+                    if self._task.progress and stage != pipeline.sink:
+                        self._task.put(
+                            self._invocation_id, EVENT_PROGRESS, (stage, len(results), len(pipeline.stages))
+                        )
+
+            if not self._token.cancelled:
+                self._put_result(share_result(results[pipeline.sink], self._task.shm_threshold))
+        except CancelledException:
+            return
+        except Exception as e:
+            if not self._token.cancelled:
+                error = _error_of(e)
+                logger.error(
+                    f"[{self._task.name}#{self._invocation_id}]: 流水线阶段{stage}执行出错, {error}, 其余阶段被取消!"
+                )
+                error.message = f"阶段{stage}执行出错, {error.message}"
+                self._task.put(self._invocation_id, EVENT_ERROR, error)
+        finally:
+            if self._futures:
+                self._abort()
+            bind_token(None)
+            discard_args(self._args, self._kwargs)
+            self._task.finish(self)
+
+    def _launch(self, stage, args, kwargs):
+        """
+        按阶段任务的执行方式执行一个阶段
+        :param stage: 阶段
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: concurrent.futures.Future -> 阶段的返回值, 生成器阶段为全部产出组成的列表
+        """
+        task = self._task.stage(stage)
+        func = task.task.taskProto
+        if task.pool is None:
+            # 进程池执行的阶段原样传递句柄, 由工作进程映射; 其它阶段在本进程内映射, 名称由调用结束时释放
+            args, kwargs = attach_args(args, kwargs, unlink=False)
+        if task.loop is not None:
+            return task.loop.submit(self._run_async(func, args, kwargs))
+
+        future = Future()
+        future.set_running_or_notify_cancel()
+        if task.pool is not None:
+            items = []
+            job = task.pool.submit(task.ref or func, args, kwargs, on_yield=items.append)
+            self._jobs.append((task.pool, job))
+            job.add_done_callback(lambda job: _settle(future, job, items))
+        else:
+            t = Thread(target=self._run_stage, args=(future, func, args, kwargs))
+            t.daemon = True
+            t.start()
+
+        return future
+
+    def _run_stage(self, future, func, args, kwargs):
+
+        bind_token(self._token)
+        try:
+            result = func(*args, **kwargs)
+            if is_stream(result):
+                items = iter_stream(result)
+                try:
+                    result = []
+                    for item in items:
+                        self._token.raise_if_cancelled()
+                        result.append(item)
+                finally:
+                    items.close()
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            bind_token(None)
+
+    async def _run_async(self, func, args, kwargs):
+
+        bind_token(self._token)
+        try:
+            result = func(*args, **kwargs)
+            if inspect.isasyncgen(result):
+                items = []
+                try:
+                    async for item in result:
+                        self._token.raise_if_cancelled()
+                        items.append(item)
+                finally:
+                    await result.aclose()
+                return items
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        finally:
+            bind_token(None)
+
+    def _abort(self, kill_timeout=None):
+        """
+        取消执行中的阶段
+        :param kill_timeout: 同TaskRun.quit
+        :return: None
+        """
+        self._token.cancel()
+        for future in list(self._futures):
+            future.cancel()
+        for pool, job in self._jobs:
+            pool.cancel(job, kill_timeout)
+
+    def quit(self, kill_timeout=None):
+        """
+        取消执行: 通知取消令牌, 取消异步阶段, 进程池执行的阶段超过kill_timeout仍未结束时强制结束其工作进程
+        :param kill_timeout: 同TaskRun.quit
+        :return: None
+        """
+        self._abort(kill_timeout)
+
+class _Deadline:
+    """
+    调用超时检查的定时条目, 每个开启超时的调用一个, 按当前执行的截止时刻重新排期
+    """
+
+    def __init__(self, run):
+        self._run = run
+
+    def fire(self, due):
+
+        return self._run.check_deadline()
+
+def _error_of(e):
+    """
+    异常对应的TaskError, 进程池回传的错误保留工作进程内的调用栈
+    :param e: 异常
+    :return: TaskError
+    """
+    if isinstance(e, TaskException) and e.error is not None:
+        return e.error
+
+    return TaskError.from_exception(e)
+
+def _settle(future, job, items):
+    """
+    进程池执行的阶段结束, 还原其结果中的共享内存句柄后写入future
+    :param future: 阶段的future
+    :param job: 进程池的Job
+    :param items: 生成器阶段的全部产出
+    :return: None
+    """
+    try:
+        result = job.result()
+    except Exception as e:
+        future.set_exception(e)
+        return
+
+    if job.streamed:
+        future.set_result([_restore_result(item) for item in items])
+    else:
+        future.set_result(_restore_result(result))
+
+def _restore_result(result):
+    """
+    还原进程池回传的中间结果中的共享内存句柄
+    :param result: 进程池回传的结果
+    :return: 还原后的结果
+    """
+    if isinstance(result, tuple):
+        return attach_args(result, {})[0]
+
+    return attach_args((result,), {})[0][0]
+
+def _run_chunk(func, chunk):
+    """
+    依次执行一个分块内的所有输入, 每个输入作为任务函数的唯一位置参数
+    :param func: 任务函数或其可导入路径
+    :param chunk: 输入列表
+    :return: tuple -> 各输入的执行结果
+    """
+    if isinstance(func, str):
+        func = resolve(func)
+    token = current_token()
+    results = []
+    for item in chunk:
+        token.raise_if_cancelled()
+        results.append(func(item))
+
+    return tuple(results)
+
+class MapRun(TaskRun):
+    """
+    任务的批量调用, 输入被切分为多个分块分发执行, 每个分块完成后整块回传
+    """
+
+    def __init__(self, task, invocation_id, items, chunksize=None, ordered=False, workers=None):
+        super(MapRun, self).__init__(task, invocation_id, (), {})
+        self._items = items
+        self._chunksize = chunksize
+        self._ordered = ordered
+        self._workers = workers
+        self._jobs = []
+        self._done_q = Queue()
+        self._abandoned = False
+
+    def run(self):
+        """
+        分发分块并按完成顺序(或输入顺序)回传结果
+        :return: None
+        """
+        func = self._task.task.taskProto
+        pool = self._task.pool
+        if pool is not None:
+            workers = pool.size
+        else:
+            # 线程执行时不受任务的concurrency限制, 默认每个分块一个线程, 线程数不超过全局运行上限
+            workers = self._workers or self._task.max_running or _MAP_WORKERS
+        chunksize = self._chunksize or max(1, math.ceil(len(self._items) / (workers * 4)))
+        chunks = [self._items[i:i + chunksize] for i in range(0, len(self._items), chunksize)]
+        bind_token(self._token)
+        try:
+            if pool is not None:
+                for index, chunk in enumerate(chunks):
+                    job = pool.submit(_run_chunk, (self._task.ref or func, chunk), {})
+                    job.add_done_callback(lambda job, index=index: self._chunk_done(index, job))
+                    self._jobs.append(job)
+            else:
+                pending = Queue()
+                for index, chunk in enumerate(chunks):
+                    pending.put((index, chunk))
+                for _ in range(min(workers, len(chunks))):
+                    t = Thread(target=self._run_chunks, args=(func, pending))
+                    t.daemon = True
+                    t.start()
+
+            buffered = {}
+            next_index = 0
+            for _ in range(len(chunks)):
+                index, job = self._done_q.get()
+                if self._token.cancelled:
+                    _discard_chunk(job)
+                    return
+
+                results = job.result()
+
+                if not self._ordered:
+                    self._put_chunk(results)
+                    continue
+
+                buffered[index] = results
+                while next_index in buffered:
+                    self._put_chunk(buffered.pop(next_index))
+                    next_index += 1
+        except CancelledException:
+            return
+        except Exception as e:
+            # 出错后其余分块被取消
+            self._fail(e)
+            self._token.cancel()
+        finally:
+            if self._token.cancelled and pool is not None:
+                for job in self._jobs:
+                    pool.cancel(job)
+            self._jobs = []
+            self._abandon()
+            bind_token(None)
+            self._task.finish(self)
+
+    def quit(self, kill_timeout=None):
+        """
+        取消批量调用, 排队中的分块直接取消
+        :param kill_timeout: 同TaskRun.quit
+        :return: None
+        """
+        self._token.cancel()
+        for job in list(self._jobs):
+            self._task.pool.cancel(job, kill_timeout)
+
+    def _chunk_done(self, index, job):
+        """
+        分块执行结束, 批量调用已结束(被取消或出错)后完成的分块直接丢弃, 释放其共享内存
+        :param index: 分块序号
+        :param job: Job | _ChunkResult
+        :return: None
+        """
+        with self._lock:
+            if not self._abandoned:
+                self._done_q.put((index, job))
+                return
+
+        _discard_chunk(job)
+
+    def _abandon(self):
+        """
+        批量调用结束, 丢弃已完成但未回传的分块; 之后完成的分块由_chunk_done丢弃
+        :return: None
+        """
+        with self._lock:
+            self._abandoned = True
+
+        while True:
+            try:
+                _, job = self._done_q.get_nowait()
+            except Empty:
+                return
+            _discard_chunk(job)
+
+    def _run_chunks(self, func, pending):
+        """
+        线程执行时的分块消费者
+        :return: None
+        """
+        bind_token(self._token)
+        while True:
+            try:
+                index, chunk = pending.get_nowait()
+            except Empty:
+                break
+            job = _ChunkResult()
+            try:
+                job.set(share_result(_run_chunk(func, chunk), self._task.shm_threshold))
+            except Exception as e:
+                job.set_exception(e)
+            self._chunk_done(index, job)
+
+    def _put_chunk(self, results):
+        """
+        整块回传结果
+        :param results: 分块内各输入的执行结果
+        :return: None
+        """
+        values = [result if isinstance(result, tuple) else (result,) for result in results]
+        self._task.put(self._invocation_id, EVENT_RESULTS, values, token=self._token)
+
+def _discard_chunk(job):
+    """
+    丢弃不再回传的分块结果, 释放其中的共享内存
+    :param job: Job | _ChunkResult
+    :return: None
+    """
+    try:
+        results = job.result()
+    except Exception:
+        return
+
+    for result in results:
+        discard_result(result)
+
+class _ChunkResult:
+    """
+    线程执行的分块结果, 与进程池Job提供相同的result接口
+    """
+
+    def __init__(self):
+        self._result = None
+        self._exception = None
+
+    def set(self, result):
+
+        self._result = result
+
+    def set_exception(self, exception):
+
+        self._exception = exception
+
+    def result(self):
+
+        if self._exception is not None:
+            raise self._exception
+
+        return self._result
+
+def _resolve_task(task):
+    """
+    解析以可导入路径注册的任务
+    :param task: 任务实体, 可以是路径字符串或任务函数为路径字符串的TaskIterator
+    :return: (task, ref) -> 解析后的任务实体, 任务路径(非路径注册时为None)
+    """
+    proto = task.taskProto if isinstance(task, TaskIterator) else task
+    if not isinstance(proto, str):
+        return task, None
+
+    try:
+        func = resolve(proto)
+    except Exception as e:
+        logger.error(f"注册失败, 无法解析任务路径{proto}, {type(e).__name__}: {e}, 本次注册被忽略!")
+        raise RegistryException(f"无法解析任务路径{proto}")
+
+    return (TaskIterator(func, cycles=task.cycles) if isinstance(task, TaskIterator) else func), proto
+
 class Task:
 
-    def __init__(self, task_name, task, result_q):
+    def __init__(
+        self, task_name, task, result_q, scheduler, pool=None, shm_threshold=None, concurrency=1, priority=0,
+        loop=None, ref=None, metrics=False, timeout=None, retries=0, backoff=0.1, timer=None
+    ):
+        """
+        :param timeout: 单次执行任务函数的最长时间, 超时以超时错误结束调用, 为None时不限制, 单位: s
+        :param retries: 执行出错后的重试次数
+        :param backoff: 首次重试前的等待时间, 之后每次翻倍, 单位: s
+        :param timer: 超时检查使用的TimerThread, 开启超时时需传入
+        """
         if isinstance(task, TaskIterator):
             self._task = task
         elif hasattr(task, "__call__"):
@@ -61,42 +1129,228 @@ class Task:
             logger.error("注册失败, 任务必须为可调用的,它可以是一个函数或TaskIterator实例对象, 本次注册被忽略!")
             raise RegistryException("任务必须为可调用的,它可以是一个函数或TaskIterator实例对象")
 
-        self._run = False
         self._task_name = task_name
         self._result_q = result_q
+        self._pool = pool
+        self._loop = loop
+        self._ref = ref
+        self._metrics = metrics
+        self._shm_threshold = shm_threshold
+        self._scheduler = scheduler
+        self._concurrency = concurrency
+        self._priority = priority
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._timer = timer
+        self._runs = {}
+        self._schedules = {}
+        self._ticks = set()
+        self._projection = None
+        self._lock = Lock()
 
-    def run(self, *args, **kwargs):
+    def start(self, invocation_id, args, kwargs):
         """
-        启动任务
+        提交一次调用至调度器, 由调度器按优先级与并发上限择机执行
+        :param invocation_id: 调用编号
+        :param args: 执行任务的位置参数
+        :param kwargs: 执行任务的关键字参数
         :return: None
         """
-        self._run = True
-        for task in self._task:
-            if not self._run:
-                return
+        run_cls = AsyncTaskRun if self._loop is not None else TaskRun
+        self._scheduler.submit(run_cls(self, invocation_id, args, kwargs))
+
+    def map(self, invocation_id, items, chunksize=None, ordered=False, workers=None):
+        """
+        提交一次批量调用至调度器
+        :param invocation_id: 调用编号
+        :param items: 输入列表
+        :param chunksize: 分块大小, 为None时按执行者数量自动计算
+        :param ordered: 是否按输入顺序回传
+        :param workers: 线程执行时的线程数, 为None时为分块数, 不超过max_running(未设置时为_MAP_WORKERS)
+        :return: None
+        """
+        if self._loop is not None:
+            logger.error(f"[{self._task_name}]: 操作错误, 异步任务不支持批量执行, 本次启动被忽略!")
+            self.put(invocation_id, EVENT_DONE)
+            return
+
+        self._scheduler.submit(MapRun(self, invocation_id, items, chunksize, ordered, workers))
+
+    def schedule(self, invocation_id, args, kwargs, timer, trigger, times=None, skip=True):
+        """
+        开启一次定时调用, 直接加入定时器; 等待触发期间不占用并发名额, 每次触发的执行经由调度器排队
+        :param invocation_id: 调用编号
+        :param args: 执行任务的位置参数
+        :param kwargs: 执行任务的关键字参数
+        :param timer: TimerThread
+        :param trigger: 触发规则, Interval或Cron
+        :param times: 触发次数, 为None时不限次数
+        :param skip: 上次执行尚未结束时是否跳过本次触发
+        :return: None
+        """
+        run = PeriodicRun(self, invocation_id, args, kwargs, timer, trigger, times, skip)
+        with self._lock:
+            self._schedules[invocation_id] = run
+        try:
+            run.start()
+        except Exception:
+            with self._lock:
+                self._schedules.pop(invocation_id, None)
+            raise
+
+    def tick(self, run):
+        """
+        定时调用触发一次执行, 与其它调用一同按优先级与并发上限排队
+        :param run: PeriodicRun
+        :return: None
+        """
+        self._scheduler.submit(_Tick(run))
 
-            result = task(*args, **kwargs)
-            if isinstance(result, tuple):
-                self._result_q.put((self._task_name, *result))
+    def admit(self, run):
+        """
+        调度器准许执行, 计入运行中的调用
+        :param run: TaskRun | _Tick
+        :return: None
+        """
+        with self._lock:
+            if isinstance(run, _Tick):
+                self._ticks.add(run)
             else:
-                self._result_q.put((self._task_name, result))
+                self._runs[run.invocation_id] = run
 
-        self._run = False
+    def release(self, tick):
+        """
+        定时调用的单次执行结束, 释放其并发名额
+        :param tick: _Tick
+        :return: None
+        """
+        with self._lock:
+            self._ticks.discard(tick)
+        self._scheduler.release(tick)
 
-    def quit(self):
-        self._run = False
+    def quit(self, kill_timeout=None, invocation_id=None):
+        """
+        取消调用, 排队中的调用直接结束
+        :param kill_timeout: 进程池执行的任务强制结束的等待时间, 为None时仅协作式取消, 单位: s
+        :param invocation_id: 调用编号, 为None时取消该任务的所有调用
+        :return: bool -> 是否存在被取消的调用
+        """
+        pending = self._scheduler.remove(self, invocation_id)
+        for run in pending:
+            run.discard()
+            # 定时调用排队中的单次执行随定时调用一同结束
+            if not isinstance(run, _Tick):
+                self.put(run.invocation_id, EVENT_DONE)
 
-    def reload(self):
+        with self._lock:
+            if invocation_id is None:
+                runs = list(self._runs.values()) + list(self._schedules.values())
+            else:
+                run = self._runs.get(invocation_id) or self._schedules.get(invocation_id)
+                runs = [run] if run is not None else []
+
+        for run in runs:
+            run.quit(kill_timeout)
+
+        return bool(runs or pending)
+
+    def put(self, invocation_id, event, values=None, elapsed=None, token=None):
         """
-        重置任务
+        回传调用事件, 开启指标统计时附带该事件的度量; 开启result_queue_size时结果事件受该任务的缓冲上限与溢出策略约束
+        :param invocation_id: 调用编号
+        :param event: 事件类型
+        :param values: 事件携带的结果
+        :param elapsed: 结束事件对应调用的执行耗时, 单位: s
+        :param token: 结果事件所属调用的取消令牌, 阻塞等待期间被取消时丢弃该结果
+        :return: None
+        """
+        projection = self._projection
+        if projection is not None:
+            if event == EVENT_RESULT:
+                values = self._project(projection, invocation_id, values)
+                if values is None:
+                    return
+            elif event == EVENT_RESULTS:
+                values = [x for x in (self._project(projection, invocation_id, item) for item in values) if x is not None]
+                if not values:
+                    return
+            elif event == EVENT_DONE:
+                projection.forget(invocation_id)
+
+        meta = None
+        if self._metrics:
+            if event == EVENT_START:
+                meta = time.time()
+            elif event == EVENT_DONE:
+                meta = elapsed
+            elif event in (EVENT_RESULT, EVENT_RESULTS):
+                meta = (time.time(), result_size(values if event == EVENT_RESULTS else [values]))
+
+        message = (self._task_name, invocation_id, event, values, meta)
+        if isinstance(self._result_q, Outbox):
+            self._result_q.put(message, event in (EVENT_RESULT, EVENT_RESULTS), token)
+        else:
+            self._result_q.put(message)
+
+    def _project(self, projection, invocation_id, values):
+        """
+        对一次结果执行投影与过滤, 出错时丢弃该结果
+        :param projection: Projection
+        :param invocation_id: 调用编号
+        :param values: 结果
+        :return: tuple | None -> 处理后的结果, 为None时本次不回传
+        """
+        try:
+            return projection.apply(invocation_id, values, self._shm_threshold)
+        except Exception:
+            discard_result(values)
+            logger.exception(f"[{self._task_name}#{invocation_id}]: 结果投影执行出错, 本次结果被丢弃")
+            return None
+
+    async def wait_room(self):
+        """
+        异步任务回传结果前等待缓冲有空位, 溢出策略为block时不阻塞事件循环
         :return: None
         """
-        self._task.reload()
+        if not isinstance(self._result_q, Outbox):
+            return
+
+        while not self._result_q.has_room(self._task_name):
+            await asyncio.sleep(_ROOM_POLL)
+
+    def finish(self, run):
+        """
+        调用结束, 同一调用只结束一次(超时结束后, 仍在执行的线程结束时不再重复回传)
+        :param run: TaskRun
+        :return: None
+        """
+        with self._lock:
+            # 定时调用不占用并发名额, 结束时无需释放
+            admitted = self._runs.pop(run.invocation_id, None) is not None
+            if not admitted and self._schedules.pop(run.invocation_id, None) is None:
+                return
+        self.put(run.invocation_id, EVENT_DONE, elapsed=run.elapsed)
+        if admitted:
+            self._scheduler.release(run)
+
+    @property
+    def name(self):
+
+        return self._task_name
 
     @property
     def isRuning(self):
 
-        return self._run
+        return bool(self._runs or self._schedules)
+
+    @property
+    def available(self):
+        """
+        运行中的调用数(含定时调用执行中的单次执行)是否未达上限
+        :return: bool
+        """
+        return len(self._runs) + len(self._ticks) < self._concurrency
 
     @property
     def task(self):
@@ -118,94 +1372,482 @@ class Task:
             logger.error("注册错误, 任务必须为可调用的,它可以是一个函数或TaskIterator实例对象, 本次修改被忽略!")
             raise RegistryException("任务必须为可调用的,它可以是一个函数或TaskIterator实例对象")
 
+    @property
+    def pool(self):
+
+        return self._pool
+
+    @pool.setter
+    def pool(self, newValue):
+
+        if self.isRuning:
+            return
+
+        self._pool = newValue
+
+    @property
+    def ref(self):
+        """
+        任务的可导入路径, 以路径注册时进程池只传递该路径, 由工作进程自行解析
+        :return: str | None
+        """
+        return self._ref
+
+    @ref.setter
+    def ref(self, newValue):
+
+        if self.isRuning:
+            return
+
+        self._ref = newValue
+
+    @property
+    def loop(self):
+
+        return self._loop
+
+    @loop.setter
+    def loop(self, newValue):
+
+        if self.isRuning:
+            return
+
+        self._loop = newValue
+
+    @property
+    def concurrency(self):
+
+        return self._concurrency
+
+    @property
+    def max_running(self):
+        """
+        全局同时运行的调用数上限
+        :return: int | None
+        """
+        return self._scheduler.max_running
+
+    @concurrency.setter
+    def concurrency(self, newValue):
+
+        self._concurrency = newValue
+
+    @property
+    def priority(self):
+
+        return self._priority
+
+    @priority.setter
+    def priority(self, newValue):
+
+        self._priority = newValue
+
+    @property
+    def timeout(self):
+
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, newValue):
+
+        self._timeout = newValue
+
+    @property
+    def retries(self):
+
+        return self._retries
+
+    @retries.setter
+    def retries(self, newValue):
+
+        self._retries = newValue
+
+    @property
+    def backoff(self):
+
+        return self._backoff
+
+    @backoff.setter
+    def backoff(self, newValue):
+
+        self._backoff = newValue
+
+    @property
+    def timer(self):
+
+        return self._timer
+
+    @timer.setter
+    def timer(self, newValue):
+
+        self._timer = newValue
+
+    @property
+    def shm_threshold(self):
+
+        return self._shm_threshold
+
+    @property
+    def projection(self):
+
+        return self._projection
+
+    @projection.setter
+    def projection(self, newValue):
+
+        self._projection = newValue
+
+class PipelineTask(Task):
+    """
+    流水线任务, 各阶段对应的任务在调用时按名称查找, 阶段任务重新注册后对之后的调用生效
+    """
+
+    def __init__(
+        self, task_name, pipeline, stages, tasks, result_q, scheduler, shm_threshold=None, concurrency=1, priority=0,
+        progress=False, metrics=False
+    ):
+        """
+        :param pipeline: Pipeline
+        :param stages: {阶段: 任务管理进程内的任务名称}
+        :param tasks: 任务管理进程内的全部任务
+        :param progress: 是否回传进度事件
+        """
+        super(PipelineTask, self).__init__(
+            task_name, TaskIterator(pipeline, cycles=1), result_q, scheduler, shm_threshold=shm_threshold,
+            concurrency=concurrency, priority=priority, metrics=metrics
+        )
+        self._stages = stages
+        self._tasks = tasks
+        self._progress = progress
+
+    def start(self, invocation_id, args, kwargs):
+
+        self._scheduler.submit(PipelineRun(self, invocation_id, args, kwargs))
+
+    def map(self, invocation_id, items, chunksize=None, ordered=False, workers=None):
+
+        logger.error(f"[{self._task_name}]: 操作错误, 流水线不支持批量执行, 本次启动被忽略!")
+        self.put(invocation_id, EVENT_DONE)
+
+    def schedule(self, invocation_id, args, kwargs, timer, trigger, times=None, skip=True):
+
+        logger.error(f"[{self._task_name}]: 操作错误, 流水线不支持定时执行, 本次启动被忽略!")
+        self.put(invocation_id, EVENT_DONE)
+
+    def stage(self, stage):
+        """
+        阶段对应的任务
+        :param stage: 阶段
+        :return: Task
+        """
+        return self._tasks[self._stages[stage]]
+
+    @property
+    def pipeline(self):
+
+        return self._task.taskProto
+
+    @property
+    def progress(self):
+
+        return self._progress
+
 class TaskManager:
 
-    def __init__(self, result_q):
+    def __init__(
+        self, result_q, pool_size=None, shm_threshold=None, max_running=None,
+        preload=None, initializer=None, initargs=(), prefork=False, metrics=False,
+        result_queue_size=None, credits=None
+    ):
 
-        self._result_q = result_q
+        self._result_q = Outbox(result_q, credits, result_queue_size) if credits is not None else result_q
         self._all_tasks = {}
+        self._pool_size = pool_size
+        self._pool = None
+        self._loop = None
+        self._shm_threshold = shm_threshold
+        self._scheduler = Scheduler(max_running)
+        self._timer = None
+        self._warm = (preload, initializer, initargs)
+        self._prefork = prefork
+        self._metrics = metrics
 
     @classmethod
-    def run_ever(cls, task_q, result_q):
+    def run_ever(cls, task_q, result_q, ready_conn=None, heartbeat=None, log_level=None, **options):
         """
-        接收任务并执行
+        预热完成后接收任务并执行
         :param task_q: 任务队列
         :param output_q: 结果队列
+        :param ready_conn: 就绪通知管道, 预热完成后经由该管道回传各阶段耗时
+        :param heartbeat: (心跳管道, 心跳间隔), 受监督时在预热之前即开始发送心跳, 为None时不发送
+        :param log_level: 任务管理进程的日志等级, 为None时沿用默认等级
+        :param options: 任务管理进程选项
+                        pool_size: 工作进程池大小, 为None时取CPU核数
+                        shm_threshold: 结果使用共享内存传递的字节数阈值, 为None时不使用
+                        max_running: 全局同时运行的调用数上限, 为None时不限制
+                        preload: 需预先导入的模块名列表
+                        initializer/initargs: 初始化函数及其位置参数
+                        prefork: 是否在启动时即拉起工作进程池
+                        metrics: 是否在回传的事件中附带度量
+                        result_queue_size/credits: 结果事件的在途上限及对应的跨进程信号量, 为None时不限制
         :return: None
         """
-        manager = cls(result_q)
+        if log_level is not None:
+            logger.setLevel(log_level)
+        log_in_background()
+        if heartbeat is not None:
+            start_heartbeat(*heartbeat)
+
+        manager = cls(result_q, **options)
+        stats = manager._warm_up()
+        if ready_conn is not None:
+            ready_conn.send(stats)
+            ready_conn.close()
 
         while True:
             task_params = task_q.get()
-            task_type = task_params[0]
-            if task_type == "add":
-                manager._add_task(*task_params[1:])
-            elif task_type == "modify":
-                manager._modify_task(*task_params[1:])
-            elif task_type == "start":
-                manager._start_task(*task_params[1:])
-            elif task_type == "stop":
-                manager._stop_task(*task_params[1:])
-            elif task_type == "stop-all":
-                manager._stop_all()
-
-    def _add_task(self, task_name, task):
+            try:
+                manager._handle(task_params)
+            except Exception:
+                logger.exception(f"执行指令{task_params[0]}出错, 本次指令被忽略!")
+
+    def _handle(self, task_params):
+        """
+        执行渲染进程下发的单条指令
+        :param task_params: (指令类型, 指令参数...)
+        :return: None
+        """
+        task_type = task_params[0]
+        if task_type == "add":
+            self._add_task(*task_params[1:])
+        elif task_type == "modify":
+            self._modify_task(*task_params[1:])
+        elif task_type == "start":
+            self._start_task(*task_params[1:])
+        elif task_type == "map":
+            self._map_task(*task_params[1:])
+        elif task_type == "schedule":
+            self._schedule_task(*task_params[1:])
+        elif task_type == "pipeline":
+            self._add_pipeline(*task_params[1:])
+        elif task_type == "project":
+            self._project_task(*task_params[1:])
+        elif task_type == "stop":
+            self._stop_task(*task_params[1:])
+        elif task_type == "stop-all":
+            self._stop_all()
+
+    def _add_task(self, task_name, task, options):
         """
         添加/注册任务
         :param task_name: 任务名称
         :param task: 任务实体
+        :param options: 任务选项
+                        executor: 执行方式, thread: 管理进程内线程执行; process: 工作进程池执行;
+                                  异步任务固定在管理进程的事件循环中执行, 不受该选项影响
+                        concurrency: 同时运行的调用数上限
+                        priority: 调度优先级, 数值越大越先执行
+                        overflow/backlog: 结果缓冲的溢出策略与上限, 仅限制结果事件在途数时生效
+                        timeout/retries/backoff: 单次执行的超时时间、出错后的重试次数及首次重试前的等待时间
         :return: None
         """
         try:
-            self._all_tasks[task_name] = Task(task_name, task, self._result_q)
-        except RegistryException:
+            task, ref = _resolve_task(task)
+            loop = self._event_loop(task)
+            self._all_tasks[task_name] = Task(
+                task_name, task, self._result_q, self._scheduler,
+                None if loop else self._executor_pool(options["executor"]), self._shm_threshold,
+                options["concurrency"], options["priority"], loop, ref, self._metrics,
+                options["timeout"], options["retries"], options["backoff"],
+                None if options["timeout"] is None else self._timer_thread()
+            )
+            self._register_outbox(task_name, options)
+        except RegistryException as e:
+            self._put_event(task_name, None, EVENT_REJECTED, ("add", str(e)))
             return
         else:
-            logger.debug(f"[{task_name}]: 任务已成功注册")
+            logger.debug("[%s]: 任务已成功注册", task_name)
 
-    def _modify_task(self, task_name, task):
+    def _modify_task(self, task_name, task, options):
         """
         修改任务
         :param task_name: 任务名称
         :param task: 任务实体
+        :param options: 任务选项, 同_add_task
         :return: None
         """
+        if task_name not in self._all_tasks:
+            # 之前的注册失败时按新注册处理
+            self._add_task(task_name, task, options)
+            return
+
+        # 先检查再一并修改, 不允许只修改部分选项
+        task_obj = self._all_tasks[task_name]
         try:
-            self._all_tasks[task_name].task = task
-        except RegistryException:
+            if task_obj.isRuning:
+                logger.error(f"[{task_name}]: 操作错误, 对应的任务还在运行中，不允许修改注册, 本次修改被忽略!")
+                raise RegistryException("对应的任务还在运行中, 不允许修改注册")
+            task, ref = _resolve_task(task)
+            loop = self._event_loop(task)
+            task_obj.task = task
+        except RegistryException as e:
+            self._put_event(task_name, None, EVENT_REJECTED, ("modify", str(e)))
             return
-        else:
-            logger.debug(f"[{task_name}]: 任务已成功更新")
 
-    def _start_task(self, task_name, args, kwargs):
+        task_obj.ref = ref
+        task_obj.loop = loop
+        task_obj.pool = None if loop else self._executor_pool(options["executor"])
+        task_obj.concurrency = options["concurrency"]
+        task_obj.priority = options["priority"]
+        task_obj.timeout = options["timeout"]
+        task_obj.retries = options["retries"]
+        task_obj.backoff = options["backoff"]
+        task_obj.timer = None if options["timeout"] is None else self._timer_thread()
+        self._register_outbox(task_name, options)
+        logger.debug("[%s]: 任务已成功更新", task_name)
+
+    def _add_pipeline(self, task_name, pipeline, stages, options):
+        """
+        添加/更新流水线
+        :param task_name: 流水线名称
+        :param pipeline: Pipeline
+        :param stages: {阶段: 任务管理进程内的任务名称}
+        :param options: 任务选项, 同_add_task, 另有progress: 是否回传进度事件
+        :return: None
+        """
+        self._all_tasks[task_name] = PipelineTask(
+            task_name, pipeline, stages, self._all_tasks, self._result_q, self._scheduler, self._shm_threshold,
+            options["concurrency"], options["priority"], options["progress"], self._metrics
+        )
+        self._register_outbox(task_name, options)
+        logger.debug("[%s]: 流水线已成功注册", task_name)
+
+    def _project_task(self, task_name, projection):
+        """
+        设置任务结果的投影与过滤, 对之后产出的结果生效
+        :param task_name: 任务名称
+        :param projection: Projection, 为None时取消
+        :return: None
+        """
+        task = self._all_tasks.get(task_name)
+        if task is None:
+            return
+
+        task.projection = projection
+        logger.debug("[%s]: 结果投影已%s", task_name, "设置" if projection is not None else "取消")
+
+    def _register_outbox(self, task_name, options):
+        """
+        设置任务结果缓冲的上限与溢出策略
+        :param task_name: 任务名称
+        :param options: 任务选项
+        :return: None
+        """
+        if isinstance(self._result_q, Outbox):
+            self._result_q.register(task_name, options["backlog"], options["overflow"])
+
+    def _put_event(self, task_name, invocation_id, event, values=None):
+        """
+        回传不属于已注册任务的事件, 如注册失败及对未注册任务的调用
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param event: 事件类型
+        :param values: 事件携带的内容
+        :return: None
+        """
+        self._result_q.put((task_name, invocation_id, event, values, None))
+
+    def _lookup(self, task_name, invocation_id):
+        """
+        查找调用对应的任务, 任务未注册(如以路径注册时导入失败)时该调用以错误结束
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :return: Task | None
+        """
+        task = self._all_tasks.get(task_name)
+        if task is None:
+            logger.error(f"[{task_name}#{invocation_id}]: 任务未注册或注册失败, 本次调用以错误结束!")
+            self._put_event(task_name, invocation_id, EVENT_ERROR, TaskError("RegistryException", "任务未注册或注册失败"))
+            self._put_event(task_name, invocation_id, EVENT_DONE)
+
+        return task
+
+    def _start_task(self, task_name, invocation_id, args, kwargs):
         """
         开启任务
         :param task_name: 任务名称
+        :param invocation_id: 调用编号
         :param args: 执行任务的位置参数
         :param kwargs: 执行任务的关键字参数
         :return: None
         """
-        if self._all_tasks[task_name].isRuning:
-            logger.warning(f"[{task_name}]: 任务正在运行中, 本次启动忽略!")
+        task = self._lookup(task_name, invocation_id)
+        if task is None:
+            discard_args(args, kwargs)
             return
 
-        self._all_tasks[task_name].reload()
-        t = Thread(target=self._all_tasks[task_name].run, args=args, kwargs=kwargs)
-        t.setDaemon(True)
-        t.start()
-        logger.debug(f"[{task_name}]: 任务已成功启动")
+        task.start(invocation_id, args, kwargs)
+        logger.debug("[%s#%s]: 任务已提交调度", task_name, invocation_id)
+
+    def _map_task(self, task_name, invocation_id, items, chunksize=None, ordered=False, workers=None):
+        """
+        开启批量任务
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param items: 输入列表
+        :param chunksize: 分块大小
+        :param ordered: 是否按输入顺序回传
+        :param workers: 线程执行时的线程数
+        :return: None
+        """
+        task = self._lookup(task_name, invocation_id)
+        if task is None:
+            return
+
+        task.map(invocation_id, items, chunksize, ordered, workers)
+        logger.debug("[%s#%s]: 批量任务已提交调度, 输入数: %s", task_name, invocation_id, len(items))
 
-    def _stop_task(self, task_name):
+    def _schedule_task(self, task_name, invocation_id, args, kwargs, trigger, times=None, skip=True):
+        """
+        开启定时任务
+        :param task_name: 任务名称
+        :param invocation_id: 调用编号
+        :param args: 执行任务的位置参数
+        :param kwargs: 执行任务的关键字参数
+        :param trigger: 触发规则
+        :param times: 触发次数
+        :param skip: 上次执行尚未结束时是否跳过本次触发
+        :return: None
+        """
+        task = self._lookup(task_name, invocation_id)
+        if task is None:
+            discard_args(args, kwargs)
+            return
+
+        try:
+            task.schedule(invocation_id, args, kwargs, self._timer_thread(), trigger, times, skip)
+        except Exception as e:
+            # 如cron表达式没有可触发的时刻, 以错误结束本次调用
+            logger.error(f"[{task_name}#{invocation_id}]: 定时任务开启失败, {e}")
+            discard_args(args, kwargs)
+            self._put_event(task_name, invocation_id, EVENT_ERROR, TaskError.from_exception(e))
+            self._put_event(task_name, invocation_id, EVENT_DONE)
+            return
+        logger.debug("[%s#%s]: 定时任务已提交调度", task_name, invocation_id)
+
+    def _stop_task(self, task_name, kill_timeout=None, invocation_id=None):
         """
         停止任务
         :param task_name: 任务名称
+        :param kill_timeout: 进程池执行的任务强制结束的等待时间, 为None时仅协作式取消, 单位: s
+        :param invocation_id: 调用编号, 为None时停止该任务的所有调用
         :return: None
         """
-        if not self._all_tasks[task_name].isRuning:
+        task = self._all_tasks.get(task_name)
+        if task is None or not task.quit(kill_timeout, invocation_id):
             logger.warning(f"[{task_name}]: 任务未启动或已结束, 本次取消忽略!")
             return
-        self._all_tasks[task_name].quit()
-        logger.debug(f"[{task_name}]: 若是循环任务, 后续执行已被取消; 当前拉起的执行无法取消, 若无需监听请将监听移除")
+        logger.debug("[%s]: 已发出取消信号, 当前执行的结果将被丢弃", task_name)
 
     def _stop_all(self):
         """
@@ -213,4 +1855,56 @@ class TaskManager:
         :return: None
         """
         for task in self._all_tasks.values():
-            task.quit()
\ No newline at end of file
+            task.quit()
+
+    def _warm_up(self):
+        """
+        预热任务管理进程, 开启prefork时同时拉起工作进程池并等待其就绪
+        :return: dict -> 各阶段耗时(单位: s)及就绪时刻(time.time())
+        """
+        stats = warm_up(*self._warm)
+        if self._prefork:
+            t0 = time.perf_counter()
+            self._executor_pool("process").wait_ready()
+            stats["pool"] = time.perf_counter() - t0
+
+        stats["ready_at"] = time.time()
+        return stats
+
+    def _executor_pool(self, executor):
+        """
+        获取执行方式对应的进程池, 进程池在首次使用时创建
+        :param executor: 执行方式
+        :return: WorkerPool | None -> 线程执行时为None
+        """
+        if executor != "process":
+            return None
+
+        if self._pool is None:
+            self._pool = WorkerPool(self._pool_size, self._shm_threshold, self._warm)
+
+        return self._pool
+
+    def _timer_thread(self):
+        """
+        获取定时任务及超时检查使用的定时器, 定时器在首次使用时创建
+        :return: TimerThread
+        """
+        if self._timer is None:
+            self._timer = TimerThread()
+
+        return self._timer
+
+    def _event_loop(self, task):
+        """
+        获取异步任务使用的事件循环, 事件循环在首次使用时创建
+        :param task: 任务实体
+        :return: EventLoopThread | None -> 非异步任务时为None
+        """
+        if not is_async(task.taskProto if isinstance(task, TaskIterator) else task):
+            return None
+
+        if self._loop is None:
+            self._loop = EventLoopThread()
+
+        return self._loop
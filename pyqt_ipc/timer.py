@@ -0,0 +1,207 @@
+import time
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from threading import Thread, Condition
+from concurrent.futures import ThreadPoolExecutor
+
+from .logger import logger
+
+
+__all__ = [
+    "Interval",
+    "Cron",
+    "TimerThread"
+]
+
+class Interval:
+    """
+    按固定间隔触发
+    fixed_rate为True时按固定频率触发, 下次触发时刻为上次的计划时刻加间隔, 不随执行耗时漂移, 落后超过一个间隔时跳过错过的触发;
+    为False时按固定延迟触发, 上次执行结束后再间隔interval触发
+    """
+
+    def __init__(self, interval, fixed_rate=True, delay=None):
+        """
+        :param interval: 间隔, 单位: s
+        :param fixed_rate: 是否按固定频率触发
+        :param delay: 首次触发的延迟, 为None时立即触发, 单位: s
+        """
+        self.interval = interval
+        self.fixed_rate = fixed_rate
+        self.delay = delay
+
+    def first(self, now):
+        """
+        首次触发时刻
+        :param now: 当前时刻(time.monotonic())
+        :return: float
+        """
+        return now + (self.delay or 0)
+
+    def next(self, due, now):
+        """
+        下次触发时刻
+        :param due: 本次的计划触发时刻
+        :param now: 当前时刻, 固定延迟时为上次执行结束的时刻
+        :return: float
+        """
+        if not self.fixed_rate:
+            return now + self.interval
+
+        due += self.interval
+        if due <= now:
+            due += (now - due) // self.interval * self.interval + self.interval
+        return due
+
+class Cron:
+    """
+    按cron表达式触发(本地时间), 格式为"分 时 日 月 周", 各字段支持*、数值、a-b范围、/步长及逗号分隔的列表,
+    周的0与7均为周日; 日与周同时受限时满足其一即触发
+    """
+    _FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    fixed_rate = True
+
+    def __init__(self, spec):
+        """
+        :param spec: cron表达式, 如"*/5 * * * *"(每5分钟)、"0 9 * * 1-5"(工作日9点)
+        """
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron表达式需为5个字段, 实际为{len(fields)}个")
+
+        self.spec = spec
+        self._minutes, self._hours, self._days, self._months, weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, self._FIELDS)
+        )
+        self._weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def first(self, now):
+
+        return self.next(now, now)
+
+    def next(self, due, now):
+        """
+        下次触发时刻, 以time.monotonic()表示
+        :param due: 本次的计划触发时刻
+        :param now: 当前时刻(time.monotonic())
+        :return: float
+        """
+        wall = time.time()
+        return now + (self._next_wall(wall) - wall)
+
+    def _next_wall(self, wall):
+        """
+        当前时刻之后首个满足表达式的整分钟
+        :param wall: 当前时刻(time.time())
+        :return: float
+        """
+        t = datetime.fromtimestamp(wall).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 只有日与月的组合可能没有可触发的时刻, 向后查找9年即可覆盖2月29日(世纪年非闰年时相隔8年), 查找按天推进
+        limit = t + timedelta(days=366 * 9)
+        while t < limit:
+            if t.month not in self._months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self._hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self._minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t.timestamp()
+
+        raise ValueError(f"cron表达式{self.spec}没有可触发的时刻")
+
+    def _day_matches(self, t):
+
+        day = t.day in self._days
+        weekday = (t.weekday() + 1) % 7 in self._weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+def _parse_field(field, low, high):
+    """
+    解析cron表达式的单个字段
+    :param field: 字段
+    :param low: 取值下限
+    :param high: 取值上限
+    :return: set
+    """
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/", 1)
+            step = int(step)
+            if step < 1:
+                raise ValueError(f"cron字段{field}的步长必须为正整数")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"cron字段{field}超出取值范围{low}-{high}")
+        values.update(range(start, end + 1, step))
+
+    return values
+
+class TimerThread:
+    """
+    任务管理进程内的定时器: 所有定时调用共用一个计时线程, 以最小堆按触发时刻排序;
+    到期时调用条目的fire, 其返回值为下次触发时刻(为None时不再触发); 线程执行的任务在共享的线程池中执行
+    """
+
+    def __init__(self, workers=None):
+        """
+        :param workers: 执行线程任务的线程池大小, 为None时使用ThreadPoolExecutor的默认值
+        """
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pyqt-ipc-timer")
+        t = Thread(target=self._run)
+        t.daemon = True
+        t.start()
+
+    def add(self, entry, due):
+        """
+        添加定时条目
+        :param entry: 定时条目, 需实现fire(due)
+        :param due: 触发时刻(time.monotonic())
+        :return: None
+        """
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), entry))
+            self._cond.notify()
+
+    def execute(self, func, *args):
+        """
+        在共享的线程池中执行
+        :param func: 可调用对象
+        :param args: 位置参数
+        :return: concurrent.futures.Future
+        """
+        return self._executor.submit(func, *args)
+
+    def _run(self):
+
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                due, _, entry = heapq.heappop(self._heap)
+
+            try:
+                next_due = entry.fire(due)
+            except Exception:
+                logger.exception("定时任务触发出错")
+                continue
+            if next_due is not None:
+                self.add(entry, next_due)
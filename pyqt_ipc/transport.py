@@ -0,0 +1,107 @@
+import selectors
+from queue import Empty
+from threading import Lock
+from multiprocessing import Pipe
+
+from .codec import Codec
+
+
+__all__ = [
+    "PipeQueue",
+    "TRANSPORTS"
+]
+
+# queue: multiprocessing.Queue; pipe: PipeQueue
+TRANSPORTS = ("queue", "pipe")
+
+class PipeQueue:
+    """
+    基于单向管道的队列, 接口与multiprocessing.Queue的put/get/get_nowait一致
+    put在调用线程内编码并直接写入管道, 不经由后台发送线程; 写入端与读取端各自只能在一个进程内使用(可多线程),
+    管道写满时put阻塞直至读取端读出, 即读取端跟不上时自然形成背压
+    """
+
+    def __init__(self, codec=None):
+        """
+        :param codec: 编解码器, 为None时使用默认的Codec
+        """
+        self._codec = codec or Codec()
+        self._reader, self._writer = Pipe(duplex=False)
+        self._waker, self._wake_conn = Pipe(duplex=False)
+        self._selector = None
+        self._rlock = Lock()
+        self._wlock = Lock()
+
+    def __getstate__(self):
+
+        state = self.__dict__.copy()
+        del state["_rlock"], state["_wlock"]
+        state["_selector"] = None
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+        self._rlock = Lock()
+        self._wlock = Lock()
+
+    def put(self, obj):
+        """
+        写入一条消息
+        :param obj: 消息
+        :return: None
+        """
+        frames = self._codec.encode(obj)
+        with self._wlock:
+            for frame in frames:
+                self._writer.send_bytes(frame)
+
+    def get(self, block=True, timeout=None):
+        """
+        读取一条消息
+        :param block: 是否阻塞等待
+        :param timeout: 最长等待时间, 为None时一直等待, 单位: s
+        :return: 消息; 被wake唤醒时为None
+        :raise: queue.Empty -> 等待超时
+        """
+        with self._rlock:
+            if not self._reader.poll():
+                if not block:
+                    raise Empty
+                if self._selector is None:
+                    # 读取端所在进程内首次等待时创建, 之后复用
+                    self._selector = selectors.DefaultSelector()
+                    self._selector.register(self._reader, selectors.EVENT_READ)
+                    self._selector.register(self._waker, selectors.EVENT_READ)
+                ready = [key.fileobj for key, _ in self._selector.select(timeout)]
+                if self._waker in ready:
+                    self._waker.recv_bytes()
+                    return None
+                if not ready:
+                    raise Empty
+
+            return self._codec.decode(self._reader.recv_bytes(), self._read)
+
+    def get_nowait(self):
+
+        return self.get(False)
+
+    def wake(self):
+        """
+        唤醒读取端阻塞中的get, 由读取端所在进程调用(写入端可能位于已退出的进程)
+        :return: None
+        """
+        self._wake_conn.send_bytes(b"")
+
+    def _read(self, size=None):
+        """
+        读取同一条消息的后续帧
+        :param size: 帧大小, 传入时读入可写的bytearray
+        :return: bytes | bytearray
+        """
+        if size is None:
+            return self._reader.recv_bytes()
+
+        buffer = bytearray(size)
+        self._reader.recv_bytes_into(buffer)
+        return buffer
@@ -0,0 +1,37 @@
+import time
+import importlib
+
+from .logger import logger
+
+
+__all__ = [
+    "warm_up"
+]
+
+def warm_up(preload=None, initializer=None, initargs=()):
+    """
+    预热当前进程: 预先导入模块并执行初始化函数, 使任务的首次执行不再承担导入开销
+    :param preload: 需预先导入的模块名列表
+    :param initializer: 初始化函数
+    :param initargs: 初始化函数的位置参数
+    :return: dict -> 各阶段耗时, 单位: s
+    """
+    stats = {"preload": 0.0, "initializer": 0.0}
+
+    t0 = time.perf_counter()
+    for module in preload or ():
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.error(f"预导入模块{module}失败, {type(e).__name__}: {e}")
+    stats["preload"] = time.perf_counter() - t0
+
+    if initializer is not None:
+        t0 = time.perf_counter()
+        try:
+            initializer(*initargs)
+        except Exception as e:
+            logger.error(f"初始化函数执行失败, {type(e).__name__}: {e}")
+        stats["initializer"] = time.perf_counter() - t0
+
+    return stats
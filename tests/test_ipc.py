@@ -0,0 +1,386 @@
+"""
+无界面(offscreen)的端到端测试: 运行方式 python -m pytest -q
+"""
+import os
+import time
+import importlib
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5.QtWidgets import QApplication, QMainWindow
+
+from pyqt_ipc import CreateIPC
+from pyqt_ipc.timer import Cron
+
+
+def echo(x):
+    return x
+
+def make_lock(x):
+    return threading.Lock()
+
+def count(n):
+    for i in range(n):
+        yield i
+
+def hang():
+    time.sleep(3)
+    return "late"
+
+def whoami(x):
+    time.sleep(0.05)
+    return threading.current_thread().name
+
+def mapper(x):
+    if x == 7:
+        raise ZeroDivisionError("seven")
+    return x * 2
+
+def locate(array):
+    """
+    数组数据所在的内存映射, 用于确认参数未被拷贝
+    :return: (映射的文件路径, 数组是否可写)
+    """
+    address = array.ctypes.data
+    with open("/proc/self/maps") as f:
+        for line in f:
+            fields = line.split()
+            start, end = (int(x, 16) for x in fields[0].split("-"))
+            if start <= address < end:
+                return (fields[5] if len(fields) > 5 else ""), array.flags.writeable
+    return "", array.flags.writeable
+
+def slow(tag):
+    time.sleep(0.02)
+    return tag
+
+class FailsInManager(Cron):
+    """
+    在渲染进程内可计算首次触发时刻, 在任务管理进程内计算失败, 用于验证任务管理进程内开启定时任务失败的处理
+    """
+    pid = os.getpid()
+
+    def first(self, now):
+
+        if os.getpid() != self.pid:
+            raise ValueError("没有可触发的时刻")
+        return super(FailsInManager, self).first(now)
+
+def boom(x):
+    raise ValueError(f"bad {x}")
+
+
+@pytest.fixture(scope="module")
+def app():
+
+    app = QApplication.instance() or QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+    yield app
+
+@pytest.fixture
+def create(app):
+    """
+    按参数创建ipcMain/ipcRenderer, 测试结束后关闭
+    """
+    created = []
+
+    def factory(**kwargs):
+        window = QMainWindow()
+        ipcMain, ipcRenderer = CreateIPC(window, **kwargs)
+        created.append((window, ipcMain))
+        return ipcMain, ipcRenderer
+
+    yield factory
+    for window, ipcMain in created:
+        ipcMain.close()
+
+def wait_until(predicate, timeout=10.0):
+    """
+    处理Qt事件直至条件成立
+    :return: bool -> 超时前条件是否成立
+    """
+    app = QApplication.instance()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if predicate():
+            return True
+        time.sleep(0.005)
+    app.processEvents()
+    return predicate()
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_result_roundtrip(create, executor):
+
+    ipcMain, ipcRenderer = create(executor=executor, pool_size=2)
+    ipcMain.registry("echo", echo, concurrency=4)
+    results = []
+    ipcRenderer.on("echo", lambda inv, v: results.append((inv, v)), with_invocation=True)
+
+    invocations = {ipcMain.start("echo", i): i for i in range(4)}
+    assert None not in invocations
+    assert wait_until(lambda: len(results) == 4 and not any(map(ipcMain.is_running, invocations)))
+    assert sorted(results) == sorted(invocations.items())
+
+
+def test_unpicklable_payload_fails_only_its_job(create):
+
+    ipcMain, ipcRenderer = create(pool_size=1)
+    ipcMain.registry("make_lock", make_lock)
+    ipcMain.registry("echo", echo, executor="process")
+    ipcMain.pipeline("pl", ["make_lock", "echo"])
+    results = []
+    ipcRenderer.on("echo", results.append)
+
+    invocation_id = ipcMain.start("pl", 1)
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    for i in range(3):
+        ipcMain.start("echo", i)
+    assert wait_until(lambda: sorted(results) == [0, 1, 2])
+
+
+@pytest.mark.parametrize("mode", [{}, {"batch": True}, {"frame_budget": 2}])
+def test_cancel_stops_results(create, mode):
+
+    ipcMain, ipcRenderer = create(**mode)
+    ipcMain.registry("count", count)
+    results = []
+
+    def on_result(value):
+        results.append(value)
+        if len(results) == 5:
+            ipcMain.cancel("count")
+
+    ipcRenderer.on("count", on_result)
+    invocation_id = ipcMain.start("count", 200000)
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    # 取消之后已发出的在途结果不再回调
+    assert len(results) == 5
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_cancel_timeout_kill(create, executor):
+
+    ipcMain, ipcRenderer = create(executor=executor)
+    ipcMain.registry("hang", hang)
+    results = []
+    ipcRenderer.on("hang", results.append)
+
+    invocation_id = ipcMain.start("hang")
+    wait_until(lambda: False, timeout=0.3)
+    ipcMain.cancel("hang", kill_timeout=0.1)
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id), timeout=4)
+    assert results == []
+
+
+def test_map(create):
+
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("mapper", mapper)
+    results, errors = [], []
+    ipcRenderer.on("mapper", results.append)
+    ipcRenderer.on_error("mapper", errors.append)
+
+    invocation_id = ipcMain.map("mapper", range(6), chunksize=2, ordered=True)
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert errors == []
+
+    invocation_id = ipcMain.map("mapper", range(10), chunksize=2)
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    assert len(errors) == 1 and errors[0].type == "ZeroDivisionError"
+
+
+def test_generator_results(create):
+
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("count", count)
+    results = []
+    ipcRenderer.on("count", results.append)
+
+    invocation_id = ipcMain.start("count", 50)
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    assert results == list(range(50))
+
+
+def test_failed_registration_is_rejected(create):
+
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("bad", "no_such_module_for_tests:func")
+    ipcMain.registry("echo", echo)
+    errors, results = [], []
+    ipcRenderer.on_error("bad", errors.append)
+    ipcRenderer.on("echo", results.append)
+
+    invocation_id = ipcMain.start("bad")
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    assert errors and errors[0].type == "RegistryException"
+    # 注册被撤销, 任务管理进程仍然存活
+    assert ipcMain.start("bad") is None
+    ipcMain.start("echo", 1)
+    assert wait_until(lambda: results == [1])
+    assert ipcMain.channel.alive
+
+
+@pytest.mark.parametrize("options, workers", [({}, None), ({"workers": 2}, 2), ({"max_running": 3}, 3)])
+def test_map_threads_not_limited_by_concurrency(create, options, workers):
+
+    ipcMain, ipcRenderer = create(max_running=options.get("max_running"))
+    # 默认concurrency=1, 分块仍并行执行
+    ipcMain.registry("whoami", whoami)
+    names = []
+    ipcRenderer.on("whoami", names.append)
+
+    invocation_id = ipcMain.map("whoami", range(8), chunksize=1, workers=options.get("workers"))
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    assert len(names) == 8
+    if workers is None:
+        assert len(set(names)) > 1
+    else:
+        assert 1 < len(set(names)) <= workers
+
+
+def test_map_rejects_invalid_workers(create):
+
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("whoami", whoami)
+    assert ipcMain.map("whoami", range(4), workers=0) is None
+    assert ipcMain.map("whoami", range(4), workers=True) is None
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="需要/proc/self/maps")
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_shared_args_are_not_copied(create, executor):
+
+    numpy = pytest.importorskip("numpy")
+    ipcMain, ipcRenderer = create(executor=executor, shm_threshold=1024)
+    ipcMain.registry("locate", locate, concurrency=2)
+    results = []
+    ipcRenderer.on("locate", lambda path, writeable: results.append((path, writeable)))
+
+    def segments():
+        return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+    before = segments()
+    invocations = [ipcMain.start("locate", numpy.arange(100000.0)), ipcMain.start("locate", array=numpy.ones(50000))]
+    assert wait_until(lambda: not any(map(ipcMain.is_running, invocations)))
+    # 任务函数收到的数组直接映射渲染进程放入的共享内存, 而非反序列化得到的拷贝
+    assert len(results) == 2
+    for path, writeable in results:
+        assert path.startswith("/dev/shm/psm_") and not writeable
+    # 调用结束后参数的共享内存已释放
+    assert segments() <= before
+
+
+def test_schedules_share_concurrency(create):
+
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("slow", slow, concurrency=1)
+    hits = {}
+    ipcRenderer.on("slow", lambda tag: hits.__setitem__(tag, hits.get(tag, 0) + 1))
+
+    first = ipcMain.schedule("slow", every=0.1, args=("first",))
+    second = ipcMain.schedule("slow", every=0.1, args=("second",))
+    ipcMain.start("slow", "plain")
+    # 定时调用只在执行期间占用并发名额, 同一任务的其它调用不会一直排队
+    assert wait_until(lambda: hits.get("first", 0) >= 2 and hits.get("second", 0) >= 2 and hits.get("plain"))
+
+    ipcMain.cancel("slow", invocation_id=first)
+    ipcMain.cancel("slow", invocation_id=second)
+    assert wait_until(lambda: not ipcMain.is_running(first) and not ipcMain.is_running(second))
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_pipe_transport(create, executor):
+
+    ipcMain, ipcRenderer = create(transport="pipe", executor=executor, pool_size=2)
+    ipcMain.registry("echo", echo, concurrency=4)
+    ipcMain.registry("count", count)
+    results, streamed = [], []
+    ipcRenderer.on("echo", lambda inv, v: results.append((inv, v)), with_invocation=True)
+    ipcRenderer.on("count", streamed.append)
+
+    invocations = {ipcMain.start("echo", i): i for i in range(4)}
+    invocation_id = ipcMain.start("count", 50)
+    assert wait_until(lambda: not any(map(ipcMain.is_running, [*invocations, invocation_id])))
+    assert sorted(results) == sorted(invocations.items())
+    assert streamed == list(range(50))
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_error(create, executor):
+
+    ipcMain, ipcRenderer = create(executor=executor)
+    ipcMain.registry("boom", boom)
+    errors, results = [], []
+    ipcRenderer.on_error("boom", errors.append)
+    ipcRenderer.on("boom", results.append)
+
+    invocation_id = ipcMain.start("boom", 1)
+    assert wait_until(lambda: errors and not ipcMain.is_running(invocation_id))
+    assert errors[0].type == "ValueError"
+    assert "bad 1" in errors[0].message
+    assert not errors[0].timeout
+    assert results == []
+
+
+def test_retries(create):
+
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("boom", boom, retries=2, backoff=0.01)
+    errors = []
+    ipcRenderer.on_error("boom", errors.append)
+
+    invocation_id = ipcMain.start("boom", 1)
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    assert len(errors) == 1 and errors[0].attempts == 3
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_timeout(create, executor):
+
+    ipcMain, ipcRenderer = create(executor=executor)
+    ipcMain.registry("hang", hang, timeout=0.3)
+    errors, results = [], []
+    ipcRenderer.on_error("hang", errors.append)
+    ipcRenderer.on("hang", results.append)
+
+    t0 = time.monotonic()
+    invocation_id = ipcMain.start("hang")
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id), timeout=2.5)
+    assert time.monotonic() - t0 < 2.5
+    assert len(errors) == 1 and errors[0].timeout
+    # 超时后立即释放并发名额, 可再次启动
+    assert ipcMain.start("hang") is not None
+    assert results == []
+
+
+def test_cron_without_fire_time_is_rejected(create):
+
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("slow", slow)
+
+    assert ipcMain.schedule("slow", cron="0 0 31 2 *", args=("never",)) is None
+    # 未占用调用, 可以重新注册
+    ipcMain.registry("slow", slow, concurrency=2)
+    assert ipcMain.queue_depth("slow")["running"] == 0
+
+
+def test_schedule_failing_in_manager_ends_invocation(create, monkeypatch):
+
+    monkeypatch.setattr(importlib.import_module("pyqt_ipc.main"), "Cron", FailsInManager)
+    ipcMain, ipcRenderer = create()
+    ipcMain.registry("slow", slow)
+    errors, results = [], []
+    ipcRenderer.on_error("slow", errors.append)
+    ipcRenderer.on("slow", results.append)
+
+    invocation_id = ipcMain.schedule("slow", cron="* * * * *", args=("never",))
+    assert invocation_id is not None
+    assert wait_until(lambda: not ipcMain.is_running(invocation_id))
+    assert len(errors) == 1 and errors[0].type == "ValueError"
+    # 任务管理进程内未残留该定时调用, 任务可再次启动
+    ipcMain.start("slow", "plain")
+    assert wait_until(lambda: results == ["plain"])
@@ -0,0 +1,105 @@
+"""
+日志等级与后台输出的测试
+"""
+import logging
+import importlib
+import threading
+
+import pytest
+from logging.handlers import QueueHandler
+
+from pyqt_ipc.logger import logger, log_in_background, log_directly, parse_level
+
+
+logger_module = importlib.import_module("pyqt_ipc.logger")
+
+
+class Probe:
+    """
+    记录被格式化的次数
+    """
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "probe"
+
+
+class Capture(logging.Handler):
+    """
+    收集格式化后的日志及执行输出的线程
+    """
+
+    def __init__(self):
+        super(Capture, self).__init__(logging.DEBUG)
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+@pytest.fixture
+def capture(monkeypatch):
+    """
+    以Capture替换日志对象的处理器, 测试结束后恢复处理器及等级; 后台输出的监听线程由测试自行结束
+    """
+    handlers, level = logger.handlers[:], logger.level
+    monkeypatch.setattr(logger_module, "_listener", None)
+    handler = Capture()
+    for h in handlers:
+        logger.removeHandler(h)
+    logger.addHandler(handler)
+    yield handler
+    for h in logger.handlers[:]:
+        logger.removeHandler(h)
+    for h in handlers:
+        logger.addHandler(h)
+    logger.setLevel(level)
+
+
+def test_parse_level():
+
+    assert parse_level("warning") == logging.WARNING
+    assert parse_level(logging.INFO) == logging.INFO
+    assert parse_level("nope") is None
+    assert parse_level(True) is None
+
+
+def test_lazy_messages_not_formatted_below_level(capture):
+
+    logger.setLevel(logging.WARNING)
+    probe = Probe()
+    logger.debug("[%s]: 结果已回传", probe)
+    logger.info("[%s]: 结果已回传", probe)
+    assert probe.formatted == 0
+    assert capture.messages == []
+
+    logger.warning("[%s]: 结果已回传", probe)
+    assert probe.formatted >= 1
+    assert capture.messages == ["[probe]: 结果已回传"]
+
+
+def test_log_in_background_reaches_handler(capture):
+
+    logger.setLevel(logging.DEBUG)
+    listener = log_in_background()
+    assert listener is not None
+    # 已开启时不重复开启
+    assert log_in_background() is None
+
+    probe = Probe()
+    logger.info("[%s]: 任务已经结束", probe)
+    listener.stop()
+    assert capture.messages == ["[probe]: 任务已经结束"]
+    # 格式化与输出在监听线程中执行
+    assert threading.current_thread().name not in capture.threads
+
+    log_directly()
+    assert capture in logger.handlers
+    assert not any(isinstance(h, QueueHandler) for h in logger.handlers)
+    logger.info("直接输出")
+    assert capture.messages[-1] == "直接输出"
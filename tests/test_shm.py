@@ -0,0 +1,73 @@
+"""
+共享内存结果的生命周期测试
+"""
+import os
+import gc
+
+import pytest
+
+from pyqt_ipc.shm import share_result, attach_result, discard_result, SharedBuffer
+
+
+numpy = pytest.importorskip("numpy")
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="需要/proc/self/maps")
+
+
+def mapped():
+    """
+    当前进程映射的共享内存段数
+    """
+    with open("/proc/self/maps") as f:
+        return sum("/dev/shm/psm_" in line for line in f)
+
+
+def test_release_refused_while_array_alive():
+
+    gc.collect()
+    before = mapped()
+    buffer = SharedBuffer(share_result(numpy.arange(1000.0).reshape(10, 100), 10))
+    row = buffer.array[3]
+    view = buffer.view
+    assert not buffer.release()
+    assert row[0] == 300.0
+
+    del row
+    gc.collect()
+    assert buffer.release()
+    # release后通过view获取的memoryview不可再使用
+    with pytest.raises(ValueError):
+        view[0]
+    assert buffer.release()
+    assert mapped() == before
+
+
+def test_dropped_buffer_unmaps_after_last_export():
+
+    gc.collect()
+    before = mapped()
+    buffer = SharedBuffer(share_result(numpy.arange(1000.0), 10))
+    array, view = buffer.array, buffer.view
+    del buffer
+    gc.collect()
+    # 对象被回收后导出的数组与memoryview仍可使用
+    assert array[5] == 5.0 and len(view) == 8000
+    assert mapped() == before + 1
+
+    del array
+    gc.collect()
+    assert mapped() == before + 1
+    del view
+    gc.collect()
+    assert mapped() == before
+
+
+def test_discard_unreceived_and_attached():
+
+    gc.collect()
+    before = mapped()
+    unreceived = share_result((b"x" * 5000, 1), 10)
+    attached = attach_result((share_result(b"y" * 5000, 10), 2))
+    discard_result(unreceived)
+    discard_result(attached)
+    assert not os.path.exists(f"/dev/shm/{unreceived[0].name}")
+    assert mapped() == before